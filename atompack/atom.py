@@ -1,74 +1,108 @@
 """A dict-like abstraction for individual atoms."""
 
+import copy
 from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
 
 import numpy as np
 import orjson
 
+# keys which are stored in dedicated slots rather than as extra properties
+_REQUIRED_KEYS = ("specie", "position")
+
 
 class Atom(MutableMapping):
     """Dict like object containing arbitrary atomic properties.
 
     Note:
         End users should not construct Atom objects directly.
+
+    Note:
+        The specie and position are held in fixed slots and a dict
+        is only allocated once an extra property is set.
     
     Args:
         specie: Atomic specie.
         position: 3D position in cartesian space.
     """
 
+    __slots__ = ("_specie", "_position", "_extras")
+
     def __init__(self, specie: str, position: np.ndarray, **kwargs) -> None:
-        self._attrs = {k: v for k, v in kwargs.items()}
-        self._attrs["specie"] = specie
-        self._attrs["position"] = position
+        self._specie = specie
+        self._position = position
+        self._extras: Optional[Dict[str, Any]] = kwargs or None
 
     ######################
     #    Constructors    #
     ######################
 
     @classmethod
-    def from_json(cls, s: str) -> 'Atom':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'Atom':
+        """Initializes from a dict."""
         # validate type
-        _type = data.pop("type")
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
         # process specie
-        specie = data.pop("specie")
+        specie = data.get("specie")
         if specie is None:
             raise ValueError("`specie` is a required attribute")
 
         # process position
-        position = data.pop("position")
+        position = data.get("position")
         if position is None:
             raise ValueError("`position` is a required attribute")
         position = np.array(position)
 
         # return instance
-        return cls(specie, position, **data)
+        return cls(specie, position, **{k: v for k, v in data.items() if k not in ("type", "specie", "position")})
+
+    @classmethod
+    def from_json(cls, s: str) -> 'Atom':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
 
     #######################################
     #    MutableMapping Implementation    #
     #######################################
 
     def __getitem__(self, key):
-        return self._attrs[key]
+        if key == "specie":
+            return self._specie
+        if key == "position":
+            return self._position
+        if self._extras is None:
+            raise KeyError(key)
+        return self._extras[key]
 
     def __setitem__(self, key, value):
-        self._attrs[key] = value
+        if key == "specie":
+            self._specie = value
+        elif key == "position":
+            self._position = value
+        elif self._extras is None:
+            self._extras = {key: value}
+        else:
+            self._extras[key] = value
 
     def __delitem__(self, key):
-        del self._attrs[key]
-
-    def __iter__(self):
-        return iter(self._attrs)
+        if key in _REQUIRED_KEYS:
+            raise KeyError(f"`{key}` is a required attribute")
+        if self._extras is None:
+            raise KeyError(key)
+        del self._extras[key]
+        if not self._extras:
+            self._extras = None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _REQUIRED_KEYS
+        if self._extras is not None:
+            yield from self._extras
 
     def __len__(self):
-        return len(self._attrs)
+        return len(_REQUIRED_KEYS) + (0 if self._extras is None else len(self._extras))
 
     ####################
     #    Properties    #
@@ -77,27 +111,41 @@ class Atom(MutableMapping):
     @property
     def specie(self) -> str:
         """Returns the atomic specie."""
-        return self._attrs["specie"]
+        return self._specie
 
     @specie.setter
     def specie(self, value: str) -> None:
-        self._attrs["specie"] = value
+        self._specie = value
 
     @property
     def position(self) -> np.ndarray:
         """Returns the atom's position."""
-        return self._attrs["position"]
+        return self._position
 
     @position.setter
     def position(self, value: np.ndarray) -> None:
-        self._attrs["position"] = value
+        self._position = value
 
     ########################
     #    Public Methods    #
     ########################
 
+    def copy(self) -> 'Atom':
+        """Returns an independent copy with its own position array and copies of any extra properties."""
+        res = type(self).__new__(type(self))
+        res._specie = self._specie
+        res._position = self._position.copy()
+        res._extras = None if self._extras is None else copy.deepcopy(self._extras)
+        return res
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        _attrs = dict(self._extras) if self._extras is not None else {}
+        _attrs["specie"] = self._specie
+        _attrs["position"] = self._position
+        _attrs["type"] = type(self).__name__
+        return _attrs
+
     def to_json(self) -> str:
         """Returns the JSON serialized representation."""
-        _attrs = self._attrs.copy()
-        _attrs["type"] = type(self).__name__
-        return orjson.dumps(_attrs, option=orjson.OPT_SERIALIZE_NUMPY)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
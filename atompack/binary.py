@@ -0,0 +1,116 @@
+"""A compact binary container for atomic structures.
+
+The layout is a fixed preamble followed by a JSON header and three raw array blocks:
+
+| Field     | Type                     | Description                                  |
+|-----------|--------------------------|----------------------------------------------|
+| magic     | 8 bytes                  | `b"ATOMPACK"`                                |
+| version   | little-endian uint32     | Format version.                              |
+| reserved  | 4 bytes                  | Zero padding.                                |
+| length    | little-endian uint64     | Length of the JSON header in bytes.          |
+| header    | UTF-8 JSON               | Structure metadata and the specie table.     |
+| positions | little-endian float64    | `(n_atoms, 3)` cartesian positions.          |
+| species   | little-endian int32      | `(n_atoms,)` index of each atom's specie.    |
+| bonds     | little-endian int64      | `(n_bonds, 2)` index of each bonded atom.    |
+
+Every block starts on an 8 byte boundary so each can be read with `np.frombuffer` without copying.
+Containers may be concatenated, each starting where the previous one ends (see `size`).
+"""
+
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import orjson
+
+MAGIC = b"ATOMPACK"
+"""Leading bytes of every binary container."""
+
+VERSION = 1
+"""Current binary format version."""
+
+_PREAMBLE = struct.Struct("<8sI4xQ")
+
+_POSITIONS_DTYPE = np.dtype("<f8")
+_SPECIES_DTYPE = np.dtype("<i4")
+_BONDS_DTYPE = np.dtype("<i8")
+
+
+def _padding(length: int) -> int:
+    return -length % 8
+
+
+def encode(header: Dict[str, Any], positions: np.ndarray, species: np.ndarray, bonds: np.ndarray) -> bytes:
+    """Returns the binary container of a structure.
+
+    Args:
+        header: JSON serializable metadata. `n_atoms` and `n_bonds` are added automatically.
+        positions: `(N, 3)` cartesian positions.
+        species: `(N,)` specie indices.
+        bonds: `(M, 2)` bonded atom indices.
+    """
+    positions = np.ascontiguousarray(positions, dtype=_POSITIONS_DTYPE).reshape(-1, 3)
+    species = np.ascontiguousarray(species, dtype=_SPECIES_DTYPE).reshape(-1)
+    bonds = np.ascontiguousarray(bonds, dtype=_BONDS_DTYPE).reshape(-1, 2)
+    if len(species) != len(positions):
+        raise ValueError("`positions` and `species` must describe the same number of atoms")
+    header = dict(header, n_atoms=len(positions), n_bonds=len(bonds))
+    _header = orjson.dumps(header, option=orjson.OPT_SERIALIZE_NUMPY)
+    _header += b" " * _padding(_PREAMBLE.size + len(_header))
+    _species = species.tobytes()
+    return b"".join([
+        _PREAMBLE.pack(MAGIC, VERSION, len(_header)),
+        _header,
+        positions.tobytes(),
+        _species,
+        b"\0" * _padding(len(_species)),
+        bonds.tobytes(),
+    ])
+
+
+def decode(buffer: Any) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the header, positions, species and bonds of a binary container.
+    The arrays are views into `buffer` and are read-only if the buffer is immutable.
+
+    Args:
+        buffer: Any object supporting the buffer protocol such as `bytes`, `bytearray` or `mmap.mmap`.
+    """
+    view = memoryview(buffer).cast("B")
+    if len(view) < _PREAMBLE.size:
+        raise ValueError("buffer is too small to be a binary container")
+    magic, version, length = _PREAMBLE.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("buffer is not a binary container")
+    if version > VERSION:
+        raise ValueError(f"unsupported binary format version `{version}`")
+    offset = _PREAMBLE.size
+    header = orjson.loads(bytes(view[offset:offset + length]))
+    offset += length
+    n_atoms = header["n_atoms"]
+    n_bonds = header["n_bonds"]
+    positions = np.frombuffer(view, dtype=_POSITIONS_DTYPE, count=3 * n_atoms, offset=offset).reshape(n_atoms, 3)
+    offset += positions.nbytes
+    species = np.frombuffer(view, dtype=_SPECIES_DTYPE, count=n_atoms, offset=offset)
+    offset += species.nbytes + _padding(species.nbytes)
+    bonds = np.frombuffer(view, dtype=_BONDS_DTYPE, count=2 * n_bonds, offset=offset).reshape(n_bonds, 2)
+    return header, positions, species, bonds
+
+
+def size(buffer: Any) -> int:
+    """Returns the length in bytes of the binary container at the start of `buffer`.
+
+    Args:
+        buffer: Any object supporting the buffer protocol such as `bytes`, `bytearray` or `mmap.mmap`.
+    """
+    view = memoryview(buffer).cast("B")
+    if len(view) < _PREAMBLE.size:
+        raise ValueError("buffer is too small to be a binary container")
+    magic, _, length = _PREAMBLE.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("buffer is not a binary container")
+    header = orjson.loads(bytes(view[_PREAMBLE.size:_PREAMBLE.size + length]))
+    n_atoms = header["n_atoms"]
+    n_bonds = header["n_bonds"]
+    species = n_atoms * _SPECIES_DTYPE.itemsize
+    return (_PREAMBLE.size + length + n_atoms * 3 * _POSITIONS_DTYPE.itemsize + species + _padding(species) +
+            n_bonds * 2 * _BONDS_DTYPE.itemsize)
@@ -1,7 +1,8 @@
 """A dict-like abstraction for a bond between atoms."""
 
+import copy
 from collections.abc import MutableMapping
-from typing import Tuple
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 import orjson
 
@@ -12,56 +13,81 @@ class Bond(MutableMapping):
     Note:
         End users should not construct Bond objects directly.
 
+    Note:
+        The indices are held in a fixed slot and a dict
+        is only allocated once an extra property is set.
+
     Args:
         indices: Index of each atom in the bond.
     """
 
+    __slots__ = ("_indices", "_extras")
+
     def __init__(self, indices: Tuple[int, int], **kwargs) -> None:
-        self._attrs = {k: v for k, v in kwargs.items()}
-        self._attrs["indices"] = indices
+        self._indices = indices
+        self._extras: Optional[Dict[str, Any]] = kwargs or None
 
     ######################
     #    Constructors    #
     ######################
 
     @classmethod
-    def from_json(cls, s: str) -> 'Bond':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'Bond':
+        """Initializes from a dict."""
         # validate type
-        _type = data.pop("type")
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
         # process indices
-        indices = data.pop("indices")
+        indices = data.get("indices")
         if indices is None:
             raise ValueError("`indices` is a required attribute")
         indices = (indices[0], indices[1])
 
         # return instance
-        return cls(indices, **data)
+        return cls(indices, **{k: v for k, v in data.items() if k not in ("type", "indices")})
+
+    @classmethod
+    def from_json(cls, s: str) -> 'Bond':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
 
     #######################################
     #    MutableMapping Implementation    #
     #######################################
 
     def __getitem__(self, key):
-        return self._attrs[key]
+        if key == "indices":
+            return self._indices
+        if self._extras is None:
+            raise KeyError(key)
+        return self._extras[key]
 
     def __setitem__(self, key, value):
-        self._attrs[key] = value
+        if key == "indices":
+            self._indices = value
+        elif self._extras is None:
+            self._extras = {key: value}
+        else:
+            self._extras[key] = value
 
     def __delitem__(self, key):
-        del self._attrs[key]
-
-    def __iter__(self):
-        return iter(self._attrs)
+        if key == "indices":
+            raise KeyError("`indices` is a required attribute")
+        if self._extras is None:
+            raise KeyError(key)
+        del self._extras[key]
+        if not self._extras:
+            self._extras = None
+
+    def __iter__(self) -> Iterator[str]:
+        yield "indices"
+        if self._extras is not None:
+            yield from self._extras
 
     def __len__(self):
-        return len(self._attrs)
+        return 1 + (0 if self._extras is None else len(self._extras))
 
     ####################
     #    Properties    #
@@ -70,14 +96,26 @@ class Bond(MutableMapping):
     @property
     def indices(self) -> Tuple[int, int]:
         """Returns the index of each atom in the bond."""
-        return self._attrs["indices"]
+        return self._indices
 
     ########################
     #    Public Methods    #
     ########################
 
+    def copy(self) -> 'Bond':
+        """Returns an independent copy with copies of any extra properties."""
+        res = type(self).__new__(type(self))
+        res._indices = self._indices
+        res._extras = None if self._extras is None else copy.deepcopy(self._extras)
+        return res
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        _attrs = dict(self._extras) if self._extras is not None else {}
+        _attrs["indices"] = self._indices
+        _attrs["type"] = type(self).__name__
+        return _attrs
+
     def to_json(self) -> str:
         """Returns the JSON serialized representation."""
-        _attrs = self._attrs.copy()
-        _attrs["type"] = type(self).__name__
-        return orjson.dumps(_attrs, option=orjson.OPT_SERIALIZE_NUMPY)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
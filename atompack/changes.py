@@ -0,0 +1,153 @@
+"""Change tracking for data derived from the atoms of a topology."""
+
+import itertools
+from collections import deque
+from typing import Deque, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# maximum number of atom indices held by a change log
+_CAPACITY = 1 << 16
+
+INSERTED = "inserted"
+"""Kind of change recorded for inserted atoms."""
+
+REMOVED = "removed"
+"""Kind of change recorded for removed atoms."""
+
+MOVED = "moved"
+"""Kind of change recorded for atoms whose position changed."""
+
+
+class Changes(object):
+    """Net changes to the atoms of a topology between two versions.
+
+    An index which was removed and then reused by a new atom is listed as both removed and inserted,
+    so consumers should apply removals before insertions.
+
+    Args:
+        inserted: Sorted indices of atoms which did not exist at the earlier version.
+        removed: Sorted indices of atoms which no longer exist or were replaced.
+        moved: Sorted indices of atoms which existed at both versions but changed position.
+    """
+
+    def __init__(self, inserted: np.ndarray, removed: np.ndarray, moved: np.ndarray) -> None:
+        self._inserted = inserted
+        self._removed = removed
+        self._moved = moved
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def inserted(self) -> np.ndarray:
+        """Returns the indices of inserted atoms."""
+        return self._inserted
+
+    @property
+    def removed(self) -> np.ndarray:
+        """Returns the indices of removed atoms."""
+        return self._removed
+
+    @property
+    def moved(self) -> np.ndarray:
+        """Returns the indices of moved atoms."""
+        return self._moved
+
+    #########################
+    #    Special Methods    #
+    #########################
+
+    def __len__(self) -> int:
+        return len(self._inserted) + len(self._removed) + len(self._moved)
+
+
+class ChangeLog(object):
+    """Versioned journal of the atoms inserted, removed and moved in a topology.
+
+    Every recorded change advances `version` so derived data built at an earlier version
+    can be brought up to date by only processing the atoms touched since then.
+    The journal holds a bounded number of indices and forgets the oldest changes first.
+
+    Example:
+        >>> from atompack.changes import INSERTED, MOVED, ChangeLog
+        >>> import numpy as np
+        >>>
+        >>> log = ChangeLog()
+        >>> log.record(INSERTED, np.array([0, 1, 2]))
+        >>> log.record(MOVED, np.array([1, 2]))
+        >>> changes = log.since(1)
+        >>> assert changes.moved.tolist() == [1, 2] and len(changes.inserted) == 0
+        >>> assert log.since(0).inserted.tolist() == [0, 1, 2] and len(log.since(0).moved) == 0
+    """
+
+    def __init__(self) -> None:
+        self._version = 0
+        # oldest version the journal can be replayed from
+        self._start = 0
+        self._entries: Deque[Tuple[str, np.ndarray]] = deque()
+        self._size = 0
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def version(self) -> int:
+        """Returns the number of changes recorded so far."""
+        return self._version
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def record(self, kind: str, indices: Union[Sequence[int], np.ndarray]) -> None:
+        """Records a change to one or more atoms.
+
+        Args:
+            kind: One of `INSERTED`, `REMOVED` or `MOVED`.
+            indices: Indices of the changed atoms.
+        """
+        if kind not in (INSERTED, REMOVED, MOVED):
+            raise ValueError(f"unknown kind of change `{kind}`")
+        indices = np.array(indices, dtype=np.intp).reshape(-1)
+        if len(indices) > _CAPACITY:
+            # changes this large are cheaper to handle with a rebuild
+            self.reset()
+            return
+        self._version += 1
+        self._entries.append((kind, indices))
+        self._size += len(indices)
+        while self._size > _CAPACITY:
+            _, forgotten = self._entries.popleft()
+            self._size -= len(forgotten)
+            self._start += 1
+
+    def reset(self) -> None:
+        """Records a change which cannot be described by indices and forgets every earlier change."""
+        self._version += 1
+        self._start = self._version
+        self._entries = deque()
+        self._size = 0
+
+    def since(self, version: int) -> Optional[Changes]:
+        """Returns the net changes since `version` or None if they are no longer known."""
+        if version > self._version:
+            raise ValueError(f"version {version} is newer than the log")
+        if version < self._start:
+            return None
+        inserted, removed, moved = set(), set(), set()
+        for kind, indices in itertools.islice(self._entries, version - self._start, None):
+            for index in indices.tolist():
+                if kind == INSERTED:
+                    inserted.add(index)
+                elif kind == REMOVED:
+                    if index in inserted:
+                        inserted.remove(index)
+                    else:
+                        removed.add(index)
+                        moved.discard(index)
+                elif index not in inserted:
+                    moved.add(index)
+        return Changes(*[np.array(sorted(indices), dtype=np.intp) for indices in (inserted, removed, moved)])
@@ -0,0 +1,438 @@
+"""A columnar (structure-of-arrays) store for per-atom properties."""
+
+import copy
+from collections.abc import Sequence as _Sequence
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from atompack.atom import _REQUIRED_KEYS, Atom
+
+if TYPE_CHECKING:
+    from atompack.topology import Topology
+
+# dtype kinds which are stored in typed columns (bool, int, uint, float)
+_TYPED_KINDS = "biuf"
+
+
+def _column_dtype(values: Sequence[Any]) -> np.dtype:
+    """Returns the narrowest column dtype able to hold all the values."""
+    try:
+        arr = np.asarray(values)
+    except ValueError:
+        return np.dtype(object)
+    if arr.ndim != 1 or arr.dtype.kind not in _TYPED_KINDS:
+        return np.dtype(object)
+    return arr.dtype
+
+
+class AtomColumns(object):
+    """Contiguous per-atom storage indexed by row.
+
+    Positions are kept in a single `(N, 3)` float64 array, species are interned
+    into an integer array and any extra properties are kept in typed columns.
+
+    Note:
+        End users should not construct AtomColumns objects directly.
+
+    Args:
+        capacity: Number of rows to preallocate.
+    """
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._size = 0
+        self._positions = np.zeros((capacity, 3), dtype=np.float64)
+        self._species = np.zeros(capacity, dtype=np.int32)
+        self._specie_table: List[str] = []
+        self._specie_codes: Dict[str, int] = {}
+        self._properties: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    ######################
+    #    Constructors    #
+    ######################
+
+    @classmethod
+    def from_arrays(cls, positions: np.ndarray, species: np.ndarray, specie_table: List[str]) -> 'AtomColumns':
+        """Initializes by adopting existing position and specie arrays without copying them.
+
+        Args:
+            positions: `(N, 3)` float64 positions.
+            species: `(N,)` int32 indices into `specie_table`.
+            specie_table: Specie names.
+        """
+        if positions.dtype != np.float64 or species.dtype != np.int32:
+            raise TypeError("`positions` must be float64 and `species` must be int32")
+        if positions.shape != (len(species), 3):
+            raise ValueError("`positions` and `species` must describe the same number of atoms")
+        res = cls()
+        res._positions = positions
+        res._species = species
+        res._size = len(species)
+        for specie in specie_table:
+            res.intern(specie)
+        return res
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def properties(self) -> List[str]:
+        """Returns the names of all extra property columns."""
+        return list(self._properties)
+
+    @property
+    def size(self) -> int:
+        """Returns the number of rows in use (including vacant rows)."""
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Returns the number of allocated rows."""
+        return len(self._positions)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Returns a writable view of the position column."""
+        return self._positions[:self._size]
+
+    @property
+    def species(self) -> np.ndarray:
+        """Returns a writable view of the interned specie column."""
+        return self._species[:self._size]
+
+    @property
+    def specie_table(self) -> List[str]:
+        """Returns the specie names indexed by their interned code."""
+        return self._specie_table
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def copy(self) -> 'AtomColumns':
+        """Returns an independent copy of the rows in use."""
+        res = AtomColumns()
+        res._size = self._size
+        res._positions = self._positions[:self._size].copy()
+        res._species = self._species[:self._size].copy()
+        res._specie_table = list(self._specie_table)
+        res._specie_codes = dict(self._specie_codes)
+        for name, (values, present) in self._properties.items():
+            values = values[:self._size]
+            values = copy.deepcopy(values) if values.dtype.kind == "O" else values.copy()
+            res._properties[name] = (values, present[:self._size].copy())
+        return res
+
+    def take(self, rows: np.ndarray) -> 'AtomColumns':
+        """Returns an independent store holding a copy of each row in order."""
+        rows = np.asarray(rows, dtype=np.intp)
+        res = AtomColumns()
+        res._size = len(rows)
+        res._positions = self._positions[rows]
+        res._species = self._species[rows]
+        res._specie_table = list(self._specie_table)
+        res._specie_codes = dict(self._specie_codes)
+        for name, (values, present) in self._properties.items():
+            values = values[rows]
+            res._properties[name] = (copy.deepcopy(values) if values.dtype.kind == "O" else values, present[rows])
+        return res
+
+    def encode(self, species: Sequence[str]) -> np.ndarray:
+        """Returns the integer code of every specie, registering new species as necessary."""
+        unique, inverse = np.unique(np.asarray(species, dtype=str), return_inverse=True)
+        codes = np.array([self.intern(specie) for specie in unique.tolist()], dtype=np.int32)
+        return codes[inverse].reshape(-1)
+
+    def intern(self, specie: str) -> int:
+        """Returns the integer code of a specie, registering it if necessary."""
+        code = self._specie_codes.get(specie)
+        if code is None:
+            code = len(self._specie_table)
+            self._specie_table.append(specie)
+            self._specie_codes[specie] = code
+        return code
+
+    def reserve(self, size: int) -> None:
+        """Grows the allocated storage to hold at least `size` rows."""
+        if size <= self.capacity:
+            return
+        capacity = max(size, 2 * self.capacity)
+        positions = np.zeros((capacity, 3), dtype=np.float64)
+        positions[:self._size] = self._positions[:self._size]
+        self._positions = positions
+        species = np.zeros(capacity, dtype=np.int32)
+        species[:self._size] = self._species[:self._size]
+        self._species = species
+        for name, (values, present) in self._properties.items():
+            _values = np.zeros(capacity, dtype=values.dtype)
+            _values[:self._size] = values[:self._size]
+            _present = np.zeros(capacity, dtype=bool)
+            _present[:self._size] = present[:self._size]
+            self._properties[name] = (_values, _present)
+
+    def allocate(self, rows: np.ndarray) -> None:
+        """Marks rows as in use, growing the allocated storage if necessary."""
+        size = int(np.max(rows)) + 1
+        if size > self._size:
+            self.reserve(size)
+            self._size = size
+
+    def write(self, rows: np.ndarray, atoms: Sequence[Atom]) -> None:
+        """Writes the contents of each atom into the corresponding row."""
+        rows = np.asarray(rows, dtype=np.intp)
+        if len(rows) == 0:
+            return
+        self.allocate(rows)
+        self._positions[rows] = np.array([atom.position for atom in atoms], dtype=np.float64).reshape(-1, 3)
+        self._species[rows] = [self.intern(atom.specie) for atom in atoms]
+        # group extra properties by name so each column is written once
+        extras: Dict[str, Tuple[List[int], List[Any]]] = {}
+        for row, atom in zip(rows.tolist(), atoms):
+            for key in atom:
+                if key in _REQUIRED_KEYS:
+                    continue
+                _rows, _values = extras.setdefault(key, ([], []))
+                _rows.append(row)
+                _values.append(atom[key])
+        for name in self._properties:
+            self._properties[name][1][rows] = False
+        for name, (_rows, _values) in extras.items():
+            self.set_property(name, _rows, _values)
+
+    def copy_rows(self, src: np.ndarray, dst: np.ndarray) -> None:
+        """Copies the contents of the `src` rows into the `dst` rows."""
+        src = np.asarray(src, dtype=np.intp)
+        dst = np.asarray(dst, dtype=np.intp)
+        if len(dst) == 0:
+            return
+        self.allocate(dst)
+        self._positions[dst] = self._positions[src]
+        self._species[dst] = self._species[src]
+        for values, present in self._properties.values():
+            values[dst] = values[src]
+            present[dst] = present[src]
+
+    def clear_rows(self, rows: np.ndarray) -> None:
+        """Marks the extra properties of vacated rows as absent."""
+        rows = np.asarray(rows, dtype=np.intp)
+        for _, present in self._properties.values():
+            present[rows] = False
+
+    def property_rows(self, name: str) -> np.ndarray:
+        """Returns the rows on which an extra property is set."""
+        return np.flatnonzero(self._properties[name][1][:self._size])
+
+    def keys(self, row: int) -> List[str]:
+        """Returns the names of all properties set on a row."""
+        return list(_REQUIRED_KEYS) + [name for name, (_, present) in self._properties.items() if present[row]]
+
+    def get_property(self, name: str, row: int) -> Any:
+        """Returns the value of an extra property on a row."""
+        column = self._properties.get(name)
+        if column is None or not column[1][row]:
+            raise KeyError(name)
+        values = column[0]
+        if values.dtype.kind in _TYPED_KINDS:
+            return values[row].item()
+        return values[row]
+
+    def set_property(self, name: str, rows: Sequence[int], values: Sequence[Any]) -> None:
+        """Sets the value of an extra property on one or more rows."""
+        dtype = _column_dtype(values)
+        column = self._properties.get(name)
+        if column is None:
+            column = (np.zeros(self.capacity, dtype=dtype), np.zeros(self.capacity, dtype=bool))
+        elif column[0].dtype != dtype:
+            if column[0].dtype.kind in _TYPED_KINDS and dtype.kind in _TYPED_KINDS:
+                dtype = np.result_type(column[0].dtype, dtype)
+            else:
+                dtype = np.dtype(object)
+            column = (column[0].astype(dtype), column[1])
+        self._properties[name] = column
+        if dtype.kind == "O":
+            # assign element-wise so sequence values are not broadcast
+            for row, value in zip(rows, values):
+                column[0][row] = value
+        else:
+            column[0][rows] = values
+        column[1][rows] = True
+
+    def delete_property(self, name: str, row: int) -> None:
+        """Removes an extra property from a row."""
+        column = self._properties.get(name)
+        if column is None or not column[1][row]:
+            raise KeyError(name)
+        column[1][row] = False
+
+    def detach(self, row: int) -> Atom:
+        """Returns an independent `Atom` holding a copy of a row."""
+        extras = {name: self.get_property(name, row) for name in self.keys(row)[len(_REQUIRED_KEYS):]}
+        return Atom(self._specie_table[self._species[row]], self._positions[row].copy(), **extras)
+
+    def to_dicts(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Returns the dict representation of the atom in each row.
+        Every column is gathered once rather than visiting the rows one property at a time.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        species = np.array(self._specie_table, dtype=object)[self._species[rows]].tolist()
+        res = [{"specie": specie, "position": position} for specie, position in zip(species, self._positions[rows])]
+        for name, (values, present) in self._properties.items():
+            indices = np.flatnonzero(present[rows])
+            _values = values[rows[indices]]
+            _values = _values.tolist() if _values.dtype.kind in _TYPED_KINDS else list(_values)
+            for i, value in zip(indices.tolist(), _values):
+                res[i][name] = value
+        for atom in res:
+            atom["type"] = Atom.__name__
+        return res
+
+
+class AtomView(Atom):
+    """Atom which reads and writes a single row of an `AtomColumns` store.
+
+    Note:
+        End users should not construct AtomView objects directly.
+        Arrays returned by `position` are views which become stale if the store is reallocated.
+        A view bound to a topology reads the topology's current store and gives the topology
+        a private copy of shared storage before writing. Its `position` is read-only while the storage is shared.
+
+    Args:
+        columns: Columnar store holding the atom.
+        row: Row of the atom within the store.
+        owner: Topology holding the store.
+    """
+
+    __slots__ = ("_columns", "_row", "_owner")
+
+    def __init__(self, columns: AtomColumns, row: int, owner: Optional['Topology'] = None) -> None:
+        self._columns = columns
+        self._row = row
+        self._owner = owner
+
+    #######################################
+    #    MutableMapping Implementation    #
+    #######################################
+
+    def __getitem__(self, key):
+        if key == "specie":
+            return self.specie
+        if key == "position":
+            return self.position
+        return self._store().get_property(key, self._row)
+
+    def __setitem__(self, key, value):
+        if key == "specie":
+            self.specie = value
+        elif key == "position":
+            self.position = value
+        else:
+            self._writable_store().set_property(key, [self._row], [value])
+
+    def __delitem__(self, key):
+        if key in _REQUIRED_KEYS:
+            raise KeyError(f"`{key}` is a required attribute")
+        self._writable_store().delete_property(key, self._row)
+
+    def __iter__(self):
+        return iter(self._store().keys(self._row))
+
+    def __len__(self):
+        return len(self._store().keys(self._row))
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def specie(self) -> str:
+        """Returns the atomic specie."""
+        columns = self._store()
+        return columns._specie_table[columns._species[self._row]]
+
+    @specie.setter
+    def specie(self, value: str) -> None:
+        columns = self._writable_store()
+        columns._species[self._row] = columns.intern(value)
+
+    @property
+    def position(self) -> np.ndarray:
+        """Returns the atom's position."""
+        res = self._store()._positions[self._row]
+        if self._owner is not None:
+            res = self._owner._expose(res)
+        return res
+
+    @position.setter
+    def position(self, value: np.ndarray) -> None:
+        self._writable_store()._positions[self._row] = value
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def copy(self) -> Atom:
+        """Returns an independent `Atom` holding a copy of the row."""
+        return self._store().detach(self._row)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return self._store().to_dicts(np.array([self._row]))[0]
+
+    #########################
+    #    Private Methods    #
+    #########################
+
+    def _store(self) -> AtomColumns:
+        """Returns the store currently holding the atom."""
+        if self._owner is None:
+            return self._columns
+        columns = self._owner._columns
+        assert columns is not None
+        return columns
+
+    def _writable_store(self) -> AtomColumns:
+        """Returns the store holding the atom after giving its topology a private copy of shared storage."""
+        if self._owner is not None:
+            self._owner._unshare()
+        return self._store()
+
+
+class AtomSequence(_Sequence):
+    """Read-only sequence of atoms which creates `AtomView` objects on access.
+
+    Note:
+        End users should not construct AtomSequence objects directly.
+
+    Args:
+        columns: Columnar store holding the atoms.
+        rows: Row of each atom within the store. Defaults to every row in order.
+        owner: Topology holding the store which the views are bound to (see `AtomView`).
+    """
+
+    def __init__(
+        self,
+        columns: AtomColumns,
+        rows: Optional[np.ndarray] = None,
+        owner: Optional['Topology'] = None,
+    ) -> None:
+        self._columns = columns
+        self._rows = rows
+        self._owner = owner
+
+    #################################
+    #    Sequence Implementation    #
+    #################################
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("atom index out of range")
+        row = index if self._rows is None else int(self._rows[index])
+        return AtomView(self._columns, row, self._owner)
+
+    def __len__(self):
+        return self._columns.size if self._rows is None else len(self._rows)
@@ -1,6 +1,16 @@
 """Abstractions for generating and modifying atomic structures with long range order."""
 
+from typing import Any
+
 from atompack.crystal.components import (Basis, LatticeParameters, LatticeVectors)
 from atompack.crystal.crystal import Crystal, UnitCell
-from atompack.crystal.spatial import MillerIndex, Orientation, Plane
-from atompack.crystal.transform import Transform
+from atompack.crystal.spatial import MillerIndex, Plane
+from atompack.crystal.transform import Transform, TransformPlan
+
+
+def __getattr__(name: str) -> Any:
+    # scipy is slow to import so `Orientation` is only imported on first access
+    if name == "Orientation":
+        from atompack.crystal.orientation import Orientation
+        return Orientation
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,105 @@
+"""Parallel construction of many unit cells and crystals.
+
+Structures are built on a process pool and returned to the calling process in the
+compact binary representation rather than as pickled graphs.
+"""
+
+import multiprocessing
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from atompack.crystal.components import Basis, LatticeParameters
+from atompack.crystal.crystal import Crystal, UnitCell
+from atompack.crystal.transform import Transform
+from atompack.symmetry import Spacegroup
+
+Spec = Tuple[Basis, LatticeParameters, Spacegroup]
+"""Basis, lattice parameters and spacegroup of a unit cell."""
+
+# task sent to a worker: (basis, lattice parameters, spacegroup number, transform, build a crystal)
+_Task = Tuple[Dict[str, Any], Dict[str, Any], int, Optional[Transform], bool]
+
+
+def build_unit_cells(
+    specs: Iterable[Spec],
+    processes: Optional[int] = None,
+    chunksize: int = 16,
+    columnar: bool = False,
+    binary: bool = False,
+) -> Iterator[Union[UnitCell, bytes]]:
+    """Builds a unit cell from each spec on a process pool and yields them in order.
+
+    Args:
+        specs: Basis, lattice parameters and spacegroup of each unit cell.
+        processes: Number of worker processes. Defaults to the number of CPUs.
+            A single process builds every unit cell in the calling process.
+        chunksize: Number of unit cells sent to a worker at a time.
+        columnar: Determines whether atoms of the returned unit cells are stored in columns.
+        binary: Determines whether the compact binary representation is yielded instead of unit cells.
+
+    Example:
+        >>> from atompack.crystal.batch import build_unit_cells
+        >>> from atompack.crystal.components import Basis, LatticeParameters
+        >>> from atompack.symmetry import Spacegroup
+        >>>
+        >>> specs = [(Basis.primitive("X"), LatticeParameters.cubic(a), Spacegroup(225)) for a in (3.0, 3.5, 4.0)]
+        >>> unit_cells = list(build_unit_cells(specs, processes=2))
+        >>> assert [len(unit_cell.atoms) for unit_cell in unit_cells] == [4, 4, 4]
+    """
+    tasks = (_task(spec, None, False) for spec in specs)
+    for res in _run(tasks, processes, chunksize):
+        yield res if binary else UnitCell.from_bytes(res, columnar=columnar)
+
+
+def build_crystals(
+    specs: Iterable[Spec],
+    transform: Optional[Transform] = None,
+    processes: Optional[int] = None,
+    chunksize: int = 16,
+    columnar: bool = False,
+    binary: bool = False,
+) -> Iterator[Union[Crystal, bytes]]:
+    """Builds a crystal from each spec on a process pool and yields them in order.
+
+    Args:
+        specs: Basis, lattice parameters and spacegroup of each crystal's unit cell.
+        transform: Transform applied to every crystal by the workers.
+        processes: Number of worker processes. Defaults to the number of CPUs.
+            A single process builds every crystal in the calling process.
+        chunksize: Number of crystals sent to a worker at a time.
+        columnar: Determines whether atoms of the returned crystals are stored in columns.
+        binary: Determines whether the compact binary representation is yielded instead of crystals.
+    """
+    tasks = (_task(spec, transform, True) for spec in specs)
+    for res in _run(tasks, processes, chunksize):
+        yield res if binary else Crystal.from_bytes(res, columnar=columnar)
+
+
+def _task(spec: Spec, transform: Optional[Transform], crystal: bool) -> _Task:
+    """Returns a lightweight picklable description of a structure."""
+    basis, lattice_parameters, spacegroup = spec
+    return basis.to_dict(), lattice_parameters.to_dict(), spacegroup.international_number, transform, crystal
+
+
+def _run(tasks: Iterable[_Task], processes: Optional[int], chunksize: int) -> Iterator[bytes]:
+    """Yields the binary representation of each task's structure in order."""
+    if processes == 1:
+        yield from map(_build, tasks)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(_build, tasks, chunksize=chunksize)
+
+
+def _build(task: _Task) -> bytes:
+    """Builds a structure in a worker process and returns its binary representation."""
+    basis, lattice_parameters, spacegroup, transform, crystal = task
+    # columnar storage is the cheapest to build and serialize
+    unit_cell = UnitCell(Basis.from_dict(basis),
+                         LatticeParameters.from_dict(lattice_parameters),
+                         Spacegroup(spacegroup),
+                         columnar=True)
+    if not crystal:
+        return unit_cell.to_bytes()
+    res = Crystal(unit_cell)
+    if transform is not None:
+        res = transform.apply(res)
+    return res.to_bytes()
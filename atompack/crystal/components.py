@@ -1,7 +1,7 @@
 """The data types required to represent a crystal."""
 
 from collections.abc import MutableSequence
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 import numpy as np
 import orjson
@@ -10,6 +10,20 @@ from atompack.constants import DEG90, DEG120
 from atompack.symmetry import Spacegroup
 
 
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+def _cached(cache: Dict[str, Any], key: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+    """Returns a read-only array from `cache`, computing it on a miss."""
+    res = cache.get(key)
+    if res is None:
+        res = _readonly(np.array(compute()))
+        cache[key] = res
+    return res
+
+
 class Basis(MutableSequence):
     """Crystalline basis.
 
@@ -64,13 +78,10 @@ class Basis(MutableSequence):
         return cls([(specie, np.zeros(3))])
 
     @classmethod
-    def from_json(cls, s) -> 'Basis':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'Basis':
+        """Initializes from a dict."""
         # validate type
-        _type = data["type"]
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
@@ -84,55 +95,58 @@ class Basis(MutableSequence):
         # return instance
         return cls(basis)
 
+    @classmethod
+    def from_json(cls, s) -> 'Basis':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
+
     ########################
     #    Public Methods    #
     ########################
 
-    def apply_spacegroup(self, spacegroup: Spacegroup) -> List[Tuple[str, np.ndarray]]:
+    def apply_spacegroup(self, spacegroup: Spacegroup, tol: float = 1E-6) -> List[Tuple[str, np.ndarray]]:
         """Returns a list of specie/site pairs generated by applying a spacegroup's
-        symmetry operations to the atomic basis."""
-        # search tolerance
-        tolerance = 1E-6
+        symmetry operations to the atomic basis.
 
+        Args:
+            spacegroup: Spacegroup whose symmetry operations are applied.
+            tol: Sites which snap to the same point of a periodic grid with this spacing are considered equivalent.
+        """
         # skip process if no sites exist
         if len(self) == 0:
             return []
 
-        res = [self._basis[0]]
-        # iterate over basis
-        for specie, site in self._basis:
-            # iterate through the spacegroup's general position expressions
-            for genpos in spacegroup.genpos:
-                # convert string expressions to arrays
-                genpos = "[{}]".format(genpos)
-                # x, y, and z are created here to be used in the eval statement
-                x, y, z = site[0], site[1], site[2]
-                new_site = np.array(eval(genpos))
-                # wrap all values between 0-1
-                for i in range(len(new_site)):
-                    if new_site[i] < 0:
-                        new_site[i] += 1
-                # check if equivalent site exists
-                is_occupied = False
-                for _, _site in res:
-                    if np.linalg.norm(new_site - _site) < tolerance:
-                        is_occupied = True
-                # store unique sites
-                if not is_occupied:
-                    res.append((specie, new_site))
-        return res
+        # apply every symmetry operation to every site in one batch
+        rotations, translations = spacegroup.operations
+        sites = np.array([site for _, site in self._basis], dtype=float)
+        new_sites = np.einsum("oij,sj->soi", rotations, sites) + translations
+        species = np.repeat(np.arange(len(self)), len(rotations))
+        new_sites = new_sites.reshape(-1, 3)
+
+        # wrap all values between 0-1 so images differing by a lattice translation coincide
+        new_sites = np.mod(new_sites, 1)
+        new_sites[new_sites > 1 - tol] = 0.0
+
+        # snap to the periodic tolerance grid and keep the first occurrence of each grid point
+        n_points = int(round(1 / tol))
+        keys = np.mod(np.round(new_sites * n_points).astype(np.int64), n_points)
+        _, indices = np.unique(keys, axis=0, return_index=True)
+        indices.sort()
+        return [(self._basis[species[i]][0], new_sites[i]) for i in indices]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return {
+            "type": type(self).__name__,
+            "basis": [{
+                "specie": specie,
+                "site": site
+            } for specie, site in self._basis],
+        }
 
     def to_json(self) -> str:
         """Returns a JSON serialized representation."""
-        return orjson.dumps(
-            {
-                "type": type(self).__name__,
-                "basis": [{
-                    "specie": specie,
-                    "site": site
-                } for specie, site in self._basis],
-            },
-            option=orjson.OPT_SERIALIZE_NUMPY)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
 
 
 class LatticeParameters(object):
@@ -154,9 +168,11 @@ class LatticeParameters(object):
         >>> params = LatticeParameters.cubic(10)
         >>> assert params.a == params.b == params.c == 10
         >>> assert params.alpha == params.beta == params.gamma == np.pi / 2
+        >>> assert np.isclose(params.volume, 1000)
     """
 
     def __init__(self, a: float, b: float, c: float, alpha: float, beta: float, gamma: float) -> None:
+        self._cache: Dict[str, Any] = {}
         self.a = a
         self.b = b
         self.c = c
@@ -214,37 +230,152 @@ class LatticeParameters(object):
         return cls(a, a, a, DEG90, DEG90, DEG90)
 
     @classmethod
-    def from_json(cls, s: str) -> 'LatticeParameters':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatticeParameters':
+        """Initializes from a dict."""
         # validate type
-        _type = data.pop("type")
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
         # return instance
-        return cls(**data)
+        return cls(data["a"], data["b"], data["c"], data["alpha"], data["beta"], data["gamma"])
+
+    @classmethod
+    def from_json(cls, s: str) -> 'LatticeParameters':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
 
     ####################
     #    Properties    #
     ####################
 
+    # NOTE: Derived quantities are cached and the cache is cleared whenever
+    #   one of the six parameters is assigned. Cached arrays are read-only.
+
+    @property
+    def a(self) -> float:
+        """Returns the length of the x lattice vector."""
+        return self._a
+
+    @a.setter
+    def a(self, value: float) -> None:
+        self._a = value
+        self._cache.clear()
+
+    @property
+    def b(self) -> float:
+        """Returns the length of the y lattice vector."""
+        return self._b
+
+    @b.setter
+    def b(self, value: float) -> None:
+        self._b = value
+        self._cache.clear()
+
+    @property
+    def c(self) -> float:
+        """Returns the length of the z lattice vector."""
+        return self._c
+
+    @c.setter
+    def c(self, value: float) -> None:
+        self._c = value
+        self._cache.clear()
+
+    @property
+    def alpha(self) -> float:
+        """Returns the angle between the y and z directions (radians)."""
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, value: float) -> None:
+        self._alpha = value
+        self._cache.clear()
+
+    @property
+    def beta(self) -> float:
+        """Returns the angle between the x and z directions (radians)."""
+        return self._beta
+
+    @beta.setter
+    def beta(self, value: float) -> None:
+        self._beta = value
+        self._cache.clear()
+
+    @property
+    def gamma(self) -> float:
+        """Returns the angle between the x and y directions (radians)."""
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, value: float) -> None:
+        self._gamma = value
+        self._cache.clear()
+
     @property
     def metric_tensor(self) -> np.ndarray:
         """Returns the metric tensor defined by the lattice parameters."""
-        return np.array([[self.a * self.a, self.a * self.b * np.cos(self.gamma), self.a * self.c * np.cos(self.beta)],
-                         [self.a * self.b * np.cos(self.gamma), self.b * self.b, self.b * self.c * np.cos(self.alpha)],
-                         [self.a * self.c * np.cos(self.beta), self.b * self.c * np.cos(self.alpha), self.c * self.c]])
+        res = self._cache.get("metric_tensor")
+        if res is None:
+            a, b, c = self.a, self.b, self.c
+            cos_alpha, cos_beta, cos_gamma = np.cos([self.alpha, self.beta, self.gamma])
+            res = _readonly(np.array([[a * a, a * b * cos_gamma, a * c * cos_beta],
+                                      [a * b * cos_gamma, b * b, b * c * cos_alpha],
+                                      [a * c * cos_beta, b * c * cos_alpha, c * c]]))
+            self._cache["metric_tensor"] = res
+        return res
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Returns the row-major matrix of lattice vectors in the standard orientation.
+        The x lattice vector lies along the x axis and the y lattice vector lies in the xy plane.
+        """
+        res = self._cache.get("matrix")
+        if res is None:
+            cos_alpha, cos_beta, cos_gamma = np.cos([self.alpha, self.beta, self.gamma])
+            sin_gamma = np.sin(self.gamma)
+            cx = self.c * cos_beta
+            cy = self.c * (cos_alpha - cos_beta * cos_gamma) / sin_gamma
+            cz = np.sqrt(max(self.c * self.c - cx * cx - cy * cy, 0.0))
+            res = _readonly(
+                np.array([[self.a, 0.0, 0.0], [self.b * cos_gamma, self.b * sin_gamma, 0.0], [cx, cy, cz]]))
+            self._cache["matrix"] = res
+        return res
+
+    @property
+    def inverse(self) -> np.ndarray:
+        """Returns the inverse of `matrix`."""
+        return _cached(self._cache, "inverse", lambda: np.linalg.inv(self.matrix))
+
+    @property
+    def reciprocal(self) -> np.ndarray:
+        """Returns the row-major matrix of reciprocal lattice vectors (without the factor of 2 pi)."""
+        return _cached(self._cache, "reciprocal", lambda: self.inverse.T)
+
+    @property
+    def volume(self) -> float:
+        """Returns the volume of the unit cell."""
+        res = self._cache.get("volume")
+        if res is None:
+            res = float(np.sqrt(max(np.linalg.det(self.metric_tensor), 0.0)))
+            self._cache["volume"] = res
+        return res
 
     ########################
     #    Public Methods    #
     ########################
 
-    def to_json(self) -> str:
-        """Returns the JSON serialized representation."""
-        return orjson.dumps({
+    def to_fractional(self, points: np.ndarray) -> np.ndarray:
+        """Returns cartesian points with shape `(3,)` or `(N, 3)` in fractional coordinates of `matrix`."""
+        return np.matmul(points, self.inverse)
+
+    def to_cartesian(self, points: np.ndarray) -> np.ndarray:
+        """Returns fractional points with shape `(3,)` or `(N, 3)` in cartesian coordinates of `matrix`."""
+        return np.matmul(points, self.matrix)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return {
             "type": type(self).__name__,
             "a": self.a,
             "b": self.b,
@@ -252,17 +383,36 @@ class LatticeParameters(object):
             "alpha": self.alpha,
             "beta": self.beta,
             "gamma": self.gamma
-        })
+        }
+
+    def to_json(self) -> str:
+        """Returns the JSON serialized representation."""
+        return orjson.dumps(self.to_dict())
 
 
 class LatticeVectors(object):
     """Representation of the vectors that define the size and shape of a crystalline system.
-    
+
+    Note:
+        Derived quantities are cached until `vectors` is assigned.
+        `vectors` is stored as a read-only copy, so it is changed by assigning a new array
+        (e.g. `lattice_vectors.vectors = lattice_vectors.vectors * 2`) and writes to it in place raise a `ValueError`.
+
     Args:
         vectors: Row-major matrix of lattice vectors.
+
+    Example:
+        >>> from atompack.crystal import LatticeVectors
+        >>> import numpy as np
+        >>>
+        >>> vectors = LatticeVectors(np.identity(3) * 2)
+        >>> assert np.allclose(vectors.to_fractional(np.ones(3)), [0.5, 0.5, 0.5])
+        >>> vectors.vectors = vectors.vectors * 2
+        >>> assert np.isclose(vectors.volume, 64)
     """
 
     def __init__(self, vectors: np.ndarray) -> None:
+        self._cache: Dict[str, Any] = {}
         self.vectors = vectors
 
     ######################
@@ -271,16 +421,14 @@ class LatticeVectors(object):
 
     @classmethod
     def from_lattice_parameters(cls, lattice_parameters: LatticeParameters) -> 'LatticeVectors':
-        return cls(np.sqrt(np.abs(lattice_parameters.metric_tensor)))
+        """Initializes from lattice parameters in the standard orientation."""
+        return cls(lattice_parameters.matrix.copy())
 
     @classmethod
-    def from_json(cls, s: str) -> 'LatticeVectors':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatticeVectors':
+        """Initializes from a dict."""
         # validate type
-        _type = data.pop("type")
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
@@ -290,41 +438,109 @@ class LatticeVectors(object):
         # return instance
         return cls(vectors)
 
+    @classmethod
+    def from_json(cls, s: str) -> 'LatticeVectors':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Returns the row-major matrix of lattice vectors."""
+        return self._vectors
+
+    @vectors.setter
+    def vectors(self, value: np.ndarray) -> None:
+        self._vectors = _readonly(np.array(value, dtype=float))
+        self._cache.clear()
+
+    @property
+    def inverse(self) -> np.ndarray:
+        """Returns the inverse of `vectors`."""
+        return _cached(self._cache, "inverse", lambda: np.linalg.inv(self.vectors))
+
+    @property
+    def reciprocal(self) -> np.ndarray:
+        """Returns the row-major matrix of reciprocal lattice vectors (without the factor of 2 pi)."""
+        return _cached(self._cache, "reciprocal", lambda: self.inverse.T)
+
+    @property
+    def metric_tensor(self) -> np.ndarray:
+        """Returns the metric tensor defined by the lattice vectors."""
+        return _cached(self._cache, "metric_tensor", lambda: np.matmul(self.vectors, self.vectors.T))
+
+    @property
+    def volume(self) -> float:
+        """Returns the volume enclosed by the lattice vectors."""
+        res = self._cache.get("volume")
+        if res is None:
+            res = float(abs(np.linalg.det(self.vectors)))
+            self._cache["volume"] = res
+        return res
+
     ########################
     #    Public Methods    #
     ########################
 
-    def contain(self, point: np.ndarray, tol: float = 1E-6) -> bool:
-        """Returns True if the point is within the bounding volume."""
-        bounds = np.linalg.norm(self.vectors, axis=0)
-        for i in range(3):
-            if point[i] > (bounds[i] + tol):
-                return False
-            if point[i] < -tol:
-                return False
-        return True
-
-    def wrap(self, point: np.ndarray, tol: float = 1E-6) -> np.ndarray:
-        """Wraps a point into the bounding volume. 
-        The `point` argument is mutated and returned.
+    def to_fractional(self, points: np.ndarray) -> np.ndarray:
+        """Returns cartesian points with shape `(3,)` or `(N, 3)` in fractional coordinates."""
+        return np.matmul(points, self.inverse)
+
+    def to_cartesian(self, points: np.ndarray) -> np.ndarray:
+        """Returns fractional points with shape `(3,)` or `(N, 3)` in cartesian coordinates."""
+        return np.matmul(points, self.vectors)
+
+    def contain(self, points: np.ndarray, tol: float = 1E-6) -> Union[bool, np.ndarray]:
+        """Returns True if a point is within the bounding volume.
+
+        Args:
+            points: A single point with shape `(3,)` or an array of points with shape `(N, 3)`.
+            tol: Distance beyond the faces of the volume which is still considered inside.
+
+        Returns:
+            A single boolean for a single point or a boolean array with shape `(N,)`.
         """
-        bounds = np.linalg.norm(self.vectors, axis=0)
-        for i in range(3):
-            bound = bounds[i]
-            tmpval = point[i]
-            if tmpval > (bound + tol):
-                tmpval -= bound * (tmpval // bound)
-            if tmpval < -tol:
-                tmpval += bound * (1 + (-tmpval // bound))
-            point[i] = tmpval
-        return point
+        points = np.asarray(points, dtype=float)
+        fractional = self.to_fractional(np.atleast_2d(points))
+        ftol = tol / np.linalg.norm(self.vectors, axis=1)
+        res = np.all((fractional >= -ftol) & (fractional <= 1 + ftol), axis=1)
+        if points.ndim == 1:
+            return bool(res[0])
+        return res
+
+    def wrap(self, points: np.ndarray, tol: float = 1E-6) -> np.ndarray:
+        """Wraps points into the bounding volume.
+        The `points` argument is mutated in place and returned.
+
+        Points are wrapped along the lattice vectors rather than the cartesian axes
+        so non-orthogonal volumes are handled correctly.
+        Points already inside the volume (within `tol`) are left untouched.
+
+        Args:
+            points: A single float point with shape `(3,)` or an array of float points with shape `(N, 3)`.
+            tol: Distance beyond the faces of the volume which is still considered inside.
+        """
+        _points = np.atleast_2d(points)
+        # the fractional coordinates are reused as the buffer for the cartesian shifts
+        shifts = self.to_fractional(_points)
+        ftol = tol / np.linalg.norm(self.vectors, axis=1)
+        inside = (shifts >= -ftol) & (shifts <= 1 + ftol)
+        np.floor(shifts, out=shifts)
+        shifts[inside] = 0.0
+        np.matmul(shifts, self.vectors, out=shifts)
+        _points -= shifts
+        return points
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return {
+            "type": type(self).__name__,
+            "vectors": self.vectors,
+        }
 
     def to_json(self) -> str:
         """Returns the JSON serialized representation."""
-        return orjson.dumps(
-            {
-                "type": type(self).__name__,
-                "vectors": self.vectors,
-            },
-            option=orjson.OPT_SERIALIZE_NUMPY,
-        )
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
@@ -2,17 +2,21 @@
 Unit cells act as templates to create crystals with arbitrary transformations applied to them."""
 
 import copy
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import numpy as np
 import orjson
 from retworkx import PyGraph
 
+from atompack import binary
 from atompack.atom import Atom
 from atompack.bond import Bond
+from atompack.columns import AtomColumns
 from atompack.crystal.components import (Basis, LatticeParameters, LatticeVectors)
+from atompack.grid import SpatialGrid
+from atompack.neighbors import NeighborList
 from atompack.symmetry import Spacegroup
-from atompack.topology import Topology
+from atompack.topology import Topology, _from_binary
 
 
 class UnitCell(Topology):
@@ -22,6 +26,8 @@ class UnitCell(Topology):
         basis: Atomic basis.
         lattice_parameters: Lattice parameters object.
         spacegroup: Spacegroup object.
+        columnar: Determines whether atoms are stored in columns rather than as individual objects.
+            Crystals built from the unit cell inherit its storage.
 
     Example:
         >>> # primitive basis of iron
@@ -43,51 +49,87 @@ class UnitCell(Topology):
         basis: Basis,
         lattice_parameters: LatticeParameters,
         spacegroup: Spacegroup,
+        columnar: bool = False,
         _graph: Optional[PyGraph] = None,
+        _columns: Optional[AtomColumns] = None,
     ) -> None:
+        # check for prebuilt graph
+        prebuilt = _graph is not None or _columns is not None
+        if columnar and _columns is None:
+            _columns = AtomColumns()
+
         # initialize superclass
-        super().__init__()
+        super().__init__(_graph, _columns)
 
         # set attributes
         self._basis = basis
         self._lattice_parameters = lattice_parameters
         self._spacegroup = spacegroup
 
-        # check for prebuilt graph
-        if _graph is None:
+        if not prebuilt:
             self._build()
-        else:
-            self._graph = _graph
 
     ######################
     #    Constructors    #
     ######################
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UnitCell':
+        """Initializes from a dict."""
+        # validate type
+        _type = data.get("type")
+        if _type != cls.__name__:
+            raise TypeError(f"cannot deserialize from type `{_type}`")
+
+        # process topology
+        topology = Topology.from_dict(data["topology"])
+
+        # process basis
+        basis = Basis.from_dict(data["basis"])
+
+        # process lattice parameters
+        lattice_parameters = LatticeParameters.from_dict(data["lattice_parameters"])
+
+        # process spacegroup
+        spacegroup = Spacegroup.from_dict(data["spacegroup"])
+
+        # return instance
+        return cls(basis, lattice_parameters, spacegroup, _graph=topology._graph)
+
     @classmethod
     def from_json(cls, s: str) -> 'UnitCell':
         """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
+        return cls.from_dict(orjson.loads(s))
+
+    @classmethod
+    def from_bytes(cls, b: Any, columnar: bool = False) -> 'UnitCell':
+        """Initializes from the compact binary representation.
+
+        Args:
+            b: Binary representation. Any object supporting the buffer protocol is accepted.
+            columnar: Determines whether atoms are stored in columns rather than as individual objects.
+        """
+        header, positions, species, bonds = binary.decode(b)
 
         # validate type
-        _type = data.pop("type")
+        _type = header["type"]
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
         # process topology
-        topology = Topology.from_json(orjson.dumps(data["topology"]))
+        graph, columns = _from_binary(header, positions, species, bonds, columnar)
 
         # process basis
-        basis = Basis.from_json(orjson.dumps(data["basis"]))
+        basis = Basis.from_dict(header["basis"])
 
         # process lattice parameters
-        lattice_parameters = LatticeParameters.from_json(orjson.dumps(data["lattice_parameters"]))
+        lattice_parameters = LatticeParameters.from_dict(header["lattice_parameters"])
 
         # process spacegroup
-        spacegroup = Spacegroup.from_json(orjson.dumps(data["spacegroup"]))
+        spacegroup = Spacegroup.from_dict(header["spacegroup"])
 
         # return instance
-        return cls(basis, lattice_parameters, spacegroup, _graph=topology._graph)
+        return cls(basis, lattice_parameters, spacegroup, _graph=graph, _columns=columns)
 
     ####################
     #    Properties    #
@@ -112,32 +154,61 @@ class UnitCell(Topology):
     #    Public Methods    #
     ########################
 
+    def clone(self) -> 'UnitCell':
+        """Returns an independent copy of the unit cell.
+        The basis and spacegroup are shared with the original rather than copied.
+        """
+        res = super().clone()
+        lattice_parameters = self._lattice_parameters
+        res._lattice_parameters = LatticeParameters(lattice_parameters.a, lattice_parameters.b, lattice_parameters.c,
+                                                    lattice_parameters.alpha, lattice_parameters.beta,
+                                                    lattice_parameters.gamma)
+        return res
+
+    def to_bytes(self) -> bytes:
+        """Returns the compact binary representation."""
+        return self._to_binary({
+            "type": type(self).__name__,
+            "basis": self.basis.to_dict(),
+            "lattice_parameters": self.lattice_parameters.to_dict(),
+            "spacegroup": self.spacegroup.to_dict(),
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return {
+            "type": type(self).__name__,
+            "topology": self._topology_dict(),
+            "basis": self.basis.to_dict(),
+            "lattice_parameters": self.lattice_parameters.to_dict(),
+            "spacegroup": self.spacegroup.to_dict(),
+        }
+
     def to_json(self) -> str:
         """Returns the JSON serialized representation."""
-        return orjson.dumps(
-            {
-                "type": type(self).__name__,
-                "topology": orjson.loads(Topology(self._graph).to_json()),
-                "basis": orjson.loads(self.basis.to_json()),
-                "lattice_parameters": orjson.loads(self.lattice_parameters.to_json()),
-                "spacegroup": orjson.loads(self.spacegroup.to_json()),
-            },
-            option=orjson.OPT_SERIALIZE_NUMPY)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
 
     #########################
     #    Private Methods    #
     #########################
 
     def _build(self) -> None:
-        vectors = LatticeVectors.from_lattice_parameters(self.lattice_parameters).vectors
-        for specie, site in self.basis.apply_spacegroup(self.spacegroup):
-            position = site * np.linalg.norm(vectors, axis=0)
-            self.insert_atoms(Atom(specie, position))
+        pairs = self.basis.apply_spacegroup(self.spacegroup)
+        if len(pairs) == 0:
+            return
+        positions = self.lattice_parameters.to_cartesian(np.array([site for _, site in pairs]))
+        self.insert_atoms(*[Atom(specie, position) for (specie, _), position in zip(pairs, positions)])
 
 
 class Crystal(Topology):
     """Atomic structure with long range order.
-    
+
+    Note:
+        A new crystal shares the atoms of its unit cell copy-on-write.
+        Either structure copies the shared atoms before it is first mutated,
+        so building many crystals from one unit cell is cheap and never modifies the unit cell.
+        Reading the atoms, bonds or positions of either structure does not copy them.
+
     Args:
         unit_cell: Minimal representation of a crystalline structure.
     """
@@ -147,6 +218,7 @@ class Crystal(Topology):
         unit_cell: UnitCell,
         _lattice_vectors: Optional[np.ndarray] = None,
         _graph: Optional[PyGraph] = None,
+        _columns: Optional[AtomColumns] = None,
     ) -> None:
         # initialize superclass
         super().__init__()
@@ -160,36 +232,68 @@ class Crystal(Topology):
         self._lattice_vectors = _lattice_vectors
 
         # check for prebuilt graph
-        if _graph is None:
-            _graph = self._unit_cell._graph
-        self._graph = _graph
+        if _graph is None and _columns is None:
+            # share the unit cell's atoms until either structure is mutated
+            self._unit_cell._share(self)
+        else:
+            self._graph = _graph
+            self._columns = _columns
 
     ######################
     #    Constructors    #
     ######################
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Crystal':
+        """Initializes from a dict."""
+        # validate type
+        _type = data.get("type")
+        if _type != cls.__name__:
+            raise TypeError(f"cannot deserialize from type `{_type}`")
+
+        # process topology
+        topology = Topology.from_dict(data["topology"])
+
+        # process unit cell
+        unit_cell = UnitCell.from_dict(data["unit_cell"])
+
+        # process lattice vectors
+        lattice_vectors = LatticeVectors.from_dict(data["lattice_vectors"])
+
+        # return instance
+        return cls(unit_cell, lattice_vectors, topology._graph)
+
     @classmethod
     def from_json(cls, s: str) -> 'Crystal':
         """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
+        return cls.from_dict(orjson.loads(s))
+
+    @classmethod
+    def from_bytes(cls, b: Any, columnar: bool = False) -> 'Crystal':
+        """Initializes from the compact binary representation.
+
+        Args:
+            b: Binary representation. Any object supporting the buffer protocol is accepted.
+            columnar: Determines whether atoms are stored in columns rather than as individual objects.
+        """
+        header, positions, species, bonds = binary.decode(b)
 
         # validate type
-        _type = data.pop("type")
+        _type = header["type"]
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
         # process topology
-        topology = Topology.from_json(orjson.dumps(data["topology"]))
+        graph, columns = _from_binary(header, positions, species, bonds, columnar)
 
-        # process unit cell
-        unit_cell = UnitCell.from_json(orjson.dumps(data["unit_cell"]))
+        # process unit cell, whose container follows the crystal's
+        unit_cell = UnitCell.from_bytes(memoryview(b).cast("B")[binary.size(b):], columnar=columnar)
 
         # process lattice vectors
-        lattice_vectors = LatticeVectors.from_json(orjson.dumps(data["lattice_vectors"]))
+        lattice_vectors = LatticeVectors.from_dict(header["lattice_vectors"])
 
         # return instance
-        return cls(unit_cell, lattice_vectors, topology._graph)
+        return cls(unit_cell, lattice_vectors, graph, columns)
 
     ####################
     #    Properties    #
@@ -205,17 +309,55 @@ class Crystal(Topology):
         """Returns the unit cell."""
         return self._unit_cell
 
+    @property
+    def spatial_grid(self) -> SpatialGrid:
+        """Returns a periodic spatial grid over the atoms reporting their indices.
+        The grid is also rebuilt after the lattice vectors change.
+        """
+        return self._updated_grid(self.lattice_vectors.vectors)
+
     ########################
     #    Public Methods    #
     ########################
 
+    def clone(self) -> 'Crystal':
+        """Returns an independent copy of the crystal and its unit cell.
+        The basis and spacegroup are shared with the original rather than copied.
+        """
+        unit_cell = self._unit_cell.clone()
+        if self._owners is not None and self._owners is self._unit_cell._owners:
+            # an unmodified crystal shares the atoms of the copied unit cell
+            res = copy.copy(self)
+            res._reset_tracking()
+            unit_cell._share(res)
+        else:
+            res = super().clone()
+        res._unit_cell = unit_cell
+        res._lattice_vectors = LatticeVectors(self._lattice_vectors.vectors.copy())
+        return res
+
+    def neighbor_list(self, cutoff: float) -> NeighborList:
+        """Returns the neighbors of every atom within `cutoff` under periodic boundary conditions."""
+        return NeighborList.from_positions(self._positions(), cutoff, self.lattice_vectors.vectors)
+
+    def to_bytes(self) -> bytes:
+        """Returns the compact binary representation.
+        The unit cell's binary representation follows the crystal's so loading it does not rebuild the unit cell.
+        """
+        return self._to_binary({
+            "type": type(self).__name__,
+            "lattice_vectors": self.lattice_vectors.to_dict(),
+        }) + self.unit_cell.to_bytes()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return {
+            "type": type(self).__name__,
+            "topology": self._topology_dict(),
+            "unit_cell": self.unit_cell.to_dict(),
+            "lattice_vectors": self.lattice_vectors.to_dict(),
+        }
+
     def to_json(self) -> str:
         """Returns the JSON serialized representation."""
-        return orjson.dumps(
-            {
-                "type": type(self).__name__,
-                "topology": orjson.loads(Topology(self._graph).to_json()),
-                "unit_cell": orjson.loads(self.unit_cell.to_json()),
-                "lattice_vectors": orjson.loads(self.lattice_vectors.to_json()),
-            },
-            option=orjson.OPT_SERIALIZE_NUMPY)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
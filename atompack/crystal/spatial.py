@@ -1,9 +1,19 @@
-"""Data types that represent spatial features or transformations."""
+"""Data types that represent spatial features or transformations.
 
-from typing import Tuple
+`Orientation` is defined in `atompack.crystal.orientation` and is only imported
+on first access because scipy is slow to import.
+"""
+
+from typing import Any, Tuple
 
 import numpy as np
-from scipy.spatial.transform import Rotation
+
+
+def __getattr__(name: str) -> Any:
+    if name == "Orientation":
+        from atompack.crystal.orientation import Orientation
+        return Orientation
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class MillerIndex(object):
@@ -54,50 +64,6 @@ class MillerIndex(object):
         return self.hkl == other.hkl
 
 
-class Orientation(Rotation):
-    """Representation of a crystallographic orientation.
-    This class inherits from scipy's Rotation class for 
-    efficient conversion between possible representations.
-    """
-
-    ######################
-    #    Constructors    #
-    ######################
-
-    @classmethod
-    def from_miller_indices(cls, plane: MillerIndex, direction: MillerIndex) -> 'Orientation':
-        """Initialize from Miller Indices.
-        
-        Args:
-            plane: Indices of the plane.
-            direction: Indices of the direction.
-        """
-        hkl = np.array(plane.hkl)
-        uvw = np.array(direction.hkl)
-        b_hat = uvw / np.linalg.norm(uvw)
-        n_hat = hkl / np.linalg.norm(hkl)
-        n_cross_b = np.cross(n_hat, b_hat)
-        t_hat = n_cross_b / np.linalg.norm(n_cross_b)
-        matrix = np.vstack((b_hat, t_hat))
-        matrix = np.vstack((matrix, n_hat))
-        return super().from_rotvec(matrix.T)
-
-    ########################
-    #    Public Methods    #
-    ########################
-
-    def as_miller_indices(self, tol: float = 1E-6) -> Tuple[MillerIndex, MillerIndex]:
-        """Represent as Miller Indices."""
-        matrix = self.as_rotvec()
-        hkl = matrix[:, 2]
-        uvw = matrix[:, 0]
-        min_nonzero = lambda arr: np.min(arr[np.abs(arr) > tol])
-        normalize = lambda arr: np.array([x / min_nonzero(arr) for x in arr])
-        hkl = tuple(np.round(normalize(hkl)).astype(int))
-        uvw = tuple(np.round(normalize(uvw)).astype(int))
-        return MillerIndex(hkl), MillerIndex(uvw)
-
-
 class Plane(object):
     """Representation of a crystallographic plane.
     
@@ -1,82 +1,111 @@
 """Abstraction for a collection of transformations that can be applied together on any crystal."""
 
 import copy
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from atompack.atom import Atom
+from atompack.bond import Bond
 from atompack.crystal.crystal import Crystal
-from atompack.crystal.spatial import Orientation, Plane
+from atompack.crystal.spatial import Plane
+
+if TYPE_CHECKING:
+    from atompack.crystal.orientation import Orientation
+
+# absolute tolerance of distances and fractional coordinates
+_TOLERANCE = 1E-6
 
 
 class Transform(object):
-    """Representation of a complex crystalline transformation."""
+    """Representation of a complex crystalline transformation.
+
+    Transformations are recorded in the order they are added and nothing is computed until the transform is applied.
+    The recorded steps are then compiled into a `TransformPlan` which generates the transformed crystal in a single
+    pass, so atoms removed by a cut are never created even if the cut follows a supercell.
+    The plan for the most recent lattice vectors is kept so applying one transform to many identical crystals compiles
+    it once.
+
+    Example:
+        >>> from atompack.crystal import Basis, Crystal, LatticeParameters, MillerIndex, Plane, Transform, UnitCell
+        >>> from atompack.symmetry import Spacegroup
+        >>>
+        >>> unit_cell = UnitCell(Basis.primitive("Fe"), LatticeParameters.cubic(2.85), Spacegroup(229))
+        >>> plane = Plane.from_miller_index(MillerIndex((1, 1, 1)))
+        >>> transform = Transform().supercell((4, 4, 4)).cut(plane)
+        >>> crystals = [transform.apply(Crystal(unit_cell)) for _ in range(3)]
+        >>> assert len(crystals[0].atoms) < 128
+    """
 
     def __init__(self) -> None:
         # initialize private attributes
-        self._cut_plane: Optional[Plane] = None
-        self._supercell_size: Optional[Tuple[int, int, int]] = None
-        self._orientation: Optional[Orientation] = None
-        self._orthogonalize: Optional[bool] = None
-        self._projection_plane: Optional[Plane] = None
+        self._steps: List[Tuple[str, Any]] = []
+        # plan compiled for the most recent lattice vectors
+        self._plan: Optional[Tuple[bytes, 'TransformPlan']] = None
 
     ########################
     #    Public Methods    #
     ########################
 
     def apply(self, crystal: Crystal) -> 'Crystal':
-        """Applies all active transforms to the crystal.
+        """Applies all transforms to the crystal in the order they were added.
 
         Args:
-            crystal: The initial crystal object.
-            copy: Determines whether the transform is applied to the initial crystal or a copy of it.
+            crystal: The initial crystal object which is modified in place.
         """
-        # TODO: find optimal order
-        self._cut(crystal)
-        self._orient(crystal)
-        self._project(crystal)
-        self._supercell(crystal)
-        return crystal
+        return self.compile(crystal.lattice_vectors.vectors).apply(crystal)
+
+    def compile(self, lattice_vectors: np.ndarray) -> 'TransformPlan':
+        """Returns the plan which applies the transform to crystals with the given lattice vectors.
+        Only the plan for the most recently compiled lattice vectors is kept until the transform is modified.
+
+        Args:
+            lattice_vectors: Row-major matrix of lattice vectors.
+        """
+        lattice_vectors = np.array(lattice_vectors, dtype=float)
+        key = lattice_vectors.tobytes()
+        if self._plan is None or self._plan[0] != key:
+            self._plan = (key, self._compile(lattice_vectors))
+        return self._plan[1]
 
     def reset(self) -> None:
         """Resets all transform settings."""
-        self._cut_plane = None
-        self._supercell_size = None
-        self._orientation = None
-        self._orthogonalize = None
-        self._projection_plane = None
+        self._steps = []
+        self._plan = None
 
     def cut(self, plane: Plane) -> 'Transform':
         """Cuts a crystal along a plane.
+        Atoms on the far side of the plane from the origin are removed.
+        If the plane passes through the origin the atoms on the side its normal points to are removed.
 
         Args:
-            plane: Crystallographic plane to cut along.
+            plane: Crystallographic plane to cut along in units of the crystal's lattice vectors.
         """
-        self._cut_plane = plane
-        return self
+        return self._add("cut", plane)
 
-    def orient(self, orientation: Orientation) -> 'Transform':
+    def orient(self, orientation: 'Orientation') -> 'Transform':
         """Changes a crystal's orientation.
 
         Args:
             orientation: Crystallographic orientation.
         """
-        self._orientation = orientation
-        return self
+        return self._add("orient", orientation)
 
     def project(self, plane: Plane, orthogonalize: bool = False) -> 'Transform':
         """Projects a crystal onto a plane.
+        The crystal is rebuilt on a cell whose first two lattice vectors are the shortest lattice vectors
+        in the plane and is rotated so the plane lies in the xy-plane.
 
         Args:
-            plane: Projection plane.
+            plane: Projection plane in units of the crystal's lattice vectors.
             orthogonalize: Determines whether or not the projection is represented as an orthogonal lattice.
+                The smallest orthogonal supercell is found by lattice reduction. Otherwise the cell
+                has the same volume as the original and its third vector is as close to the plane normal as possible.
 
         Note:
             Setting `orthogonalize` to True may result in very large structures for acute projections.
         """
-        self._projection_plane = plane
-        self._orthogonalize = orthogonalize
-        return self
+        return self._add("project", (plane, orthogonalize))
 
     def supercell(self, supercell_size: Tuple[int, int, int]) -> 'Transform':
         """Creates a supercell by duplicating the crystal in 3 dimensions.
@@ -84,44 +113,339 @@ class Transform(object):
         Args:
             supercell_size: Number of repeat units in each direction.
         """
-        self._supercell_size = supercell_size
+        if any(size < 1 for size in supercell_size):
+            raise ValueError("`supercell_size` must be positive")
+        return self._add("supercell", tuple(supercell_size))
+
+    #########################
+    #    Private Methods    #
+    #########################
+
+    def _add(self, name: str, args: Any) -> 'Transform':
+        self._steps.append((name, args))
+        self._plan = None
         return self
 
+    def _compile(self, lattice_vectors: np.ndarray) -> 'TransformPlan':
+        # every step is reduced to an integer change of cell, a rotation or a cut
+        matrix = np.identity(3, dtype=np.int64)
+        rotation = np.identity(3)
+        cuts = []
+        for name, args in self._steps:
+            # lattice vectors of the current cell in the original cartesian frame
+            vectors = np.matmul(matrix, lattice_vectors)
+            if name == "cut":
+                normal, d = _cartesian_plane(args, vectors)
+                # orient the normal away from the origin
+                if d < 0:
+                    normal, d = -normal, -d
+                cuts.append((matrix, normal, d))
+            elif name == "orient":
+                rotation = np.matmul(args.as_matrix(), rotation)
+            elif name == "project":
+                plane, orthogonalize = args
+                normal, _ = _cartesian_plane(plane, vectors)
+                matrix = np.matmul(_projection_matrix(vectors, normal, orthogonalize), matrix)
+                rotation = _standard_rotation(np.matmul(matrix, lattice_vectors))
+            elif name == "supercell":
+                matrix = np.array(args, dtype=np.int64)[:, np.newaxis] * matrix
+        return TransformPlan(lattice_vectors, matrix, rotation, cuts)
+
+
+class TransformPlan(object):
+    """A transform compiled for crystals with particular lattice vectors.
+
+    Every atom of the transformed crystal is an image of an original atom translated by an integer
+    combination of the original lattice vectors. The plan broadcasts the translations of the new cell
+    against the original positions, masks out the images removed by cuts and builds the survivors in bulk.
+
+    Note:
+        End users should not construct TransformPlan objects directly. See `Transform.compile`.
+
+    Args:
+        lattice_vectors: Lattice vectors of the crystals the plan applies to.
+        matrix: Integer matrix of the new lattice vectors in terms of the original ones.
+        rotation: Rotation matrix applied to every position and lattice vector.
+        cuts: Cell matrix at the time of each cut with the unit normal and offset of its plane in cartesian space.
+    """
+
+    def __init__(
+        self,
+        lattice_vectors: np.ndarray,
+        matrix: np.ndarray,
+        rotation: np.ndarray,
+        cuts: List[Tuple[np.ndarray, np.ndarray, float]],
+    ) -> None:
+        self._lattice_vectors = lattice_vectors
+        self._matrix = matrix
+        self._rotation = rotation
+        self._cuts = cuts
+        self._inverse = np.linalg.inv(lattice_vectors)
+        # diagonal cells are filled exactly by the original atoms at every translation
+        # while any other cell needs wrapped atoms and a test for the images inside it
+        self._exact = all(_is_diagonal(m) for m in [matrix] + [m for m, _, _ in cuts])
+        if self._exact:
+            self._lower = np.zeros(3, dtype=np.int64)
+            self._shape = np.diag(matrix)
+        else:
+            corners = np.matmul(np.indices((2, 2, 2)).reshape(3, -1).T, matrix)
+            self._lower = corners.min(axis=0)
+            self._shape = corners.max(axis=0) - self._lower + 1
+        # translations in (x, y, z) loop order
+        self._grid = np.indices(self._shape).reshape(3, -1).T + self._lower
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Returns the integer matrix of the new lattice vectors in terms of the original ones."""
+        return self._matrix
+
+    @property
+    def rotation(self) -> np.ndarray:
+        """Returns the rotation matrix applied to every position and lattice vector."""
+        return self._rotation
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def apply(self, crystal: Crystal) -> Crystal:
+        """Applies the plan to a crystal in place.
+        Bonds are replicated along with the atoms they connect.
+
+        Args:
+            crystal: Crystal with the lattice vectors the plan was compiled for.
+        """
+        if not np.allclose(crystal.lattice_vectors.vectors, self._lattice_vectors, atol=_TOLERANCE):
+            raise ValueError("the plan was compiled for different lattice vectors")
+
+        # fractional coordinates of the original atoms
+        original = crystal._positions()
+        fractional = np.matmul(original, self._inverse)
+        n_atoms = len(fractional)
+        shifts = np.zeros((n_atoms, 3), dtype=np.int64)
+        if not self._exact:
+            shifts = np.floor(fractional + _TOLERANCE).astype(np.int64)
+            fractional = fractional - shifts
+
+        # broadcast every translation against every atom and keep the images which survive
+        candidates = (self._grid[:, np.newaxis, :] + fractional[np.newaxis, :, :]).reshape(-1, 3)
+        ids = np.arange(len(candidates))
+        if not self._exact:
+            cell = np.matmul(candidates, np.linalg.inv(self._matrix))
+            ids = np.flatnonzero(np.all((cell >= -_TOLERANCE) & (cell < 1 - _TOLERANCE), axis=1))
+            expected = n_atoms * int(round(abs(np.linalg.det(self._matrix))))
+            if len(self._cuts) == 0 and len(ids) != expected:
+                raise RuntimeError(f"transform generated {len(ids)} atoms rather than {expected}")
+        for matrix, normal, d in self._cuts:
+            distances = np.matmul(self._stage(candidates, ids, n_atoms, matrix), np.matmul(self._lattice_vectors,
+                                                                                         normal)) - d
+            ids = ids[distances <= _TOLERANCE]
+        # without a change of cell or orientation the rejected atoms are removed in place
+        unchanged = np.array_equal(self._matrix, np.identity(3)) and np.array_equal(self._rotation, np.identity(3))
+        if unchanged:
+            rejected = np.ones(n_atoms, dtype=bool)
+            rejected[ids] = False
+            if np.any(rejected):
+                crystal._discard_atoms(crystal._rows()[rejected])
+            return crystal
+
+        # translate the original positions so atoms at the origin are reproduced exactly
+        sources = ids % n_atoms
+        translations = self._grid[ids // n_atoms] - shifts[sources]
+        positions = original[sources] + np.matmul(translations, self._lattice_vectors)
+        vectors = np.matmul(self._matrix, self._lattice_vectors)
+        if not np.array_equal(self._rotation, np.identity(3)):
+            positions = np.matmul(positions, self._rotation.T)
+            vectors = np.matmul(vectors, self._rotation.T)
+        bonds = self._bonds(crystal, ids, shifts, len(candidates))
+
+        # replace the atoms in bulk
+        if crystal._columns is not None:
+            columns = crystal._columns.take(crystal._rows()[sources])
+            columns.positions[:] = positions
+            crystal._reset_storage(columns)
+        else:
+            atoms = _replicate(crystal._atoms(), sources, positions)
+            crystal._reset_storage()
+            crystal._graph.add_nodes_from(atoms)
+        if len(bonds) > 0:
+            crystal._graph.add_edges_from([(bond.indices[0], bond.indices[1], bond) for bond in bonds])
+        crystal.lattice_vectors.vectors = vectors
+        return crystal
+
     #########################
     #    Private Methods    #
     #########################
 
-    # TODO
-    def _cut(self, crystal: Crystal) -> None:
-        plane = self._cut_plane
-        if plane is None:
-            return
-
-    # TODO
-    def _orient(self, crystal: Crystal) -> None:
-        orientation = self._orientation
-        if orientation is None:
-            return
-
-    # TODO
-    def _project(self, crystal: Crystal) -> None:
-        plane = self._projection_plane
-        if plane is None:
-            return
-
-    def _supercell(self, crystal: Crystal) -> None:
-        size = self._supercell_size
-        if size is None:
-            return
-        existing_atoms = crystal.atoms.copy()
-        for x in range(size[0]):
-            for y in range(size[1]):
-                for z in range(size[2]):
-                    if x == y == z == 0:
-                        continue
-                    offset = np.matmul(np.array([x, y, z]), crystal.lattice_vectors.vectors)
-                    for atom in existing_atoms:
-                        _atom = copy.deepcopy(atom)
-                        _atom.position += offset
-                        crystal.insert_atoms(_atom)
-        crystal.lattice_vectors.vectors *= size
+    def _stage(self, candidates: np.ndarray, ids: np.ndarray, n_atoms: int, matrix: np.ndarray) -> np.ndarray:
+        """Returns the original fractional coordinates each candidate had in the cell of an earlier step."""
+        points = candidates if len(ids) == len(candidates) else candidates[ids]
+        if np.array_equal(matrix, self._matrix):
+            # the candidates are already inside the final cell
+            return points
+        if self._exact:
+            # the image inside a smaller diagonal cell is found by wrapping the translation
+            translations = self._grid[ids // n_atoms]
+            return points - translations + np.mod(translations, np.diag(matrix))
+        fractional = np.matmul(points, np.linalg.inv(matrix))
+        return np.matmul(fractional - np.floor(fractional + _TOLERANCE), matrix)
+
+    def _bonds(self, crystal: Crystal, ids: np.ndarray, shifts: np.ndarray, n_candidates: int) -> List[Bond]:
+        """Returns a copy of every bond between images of bonded atoms which were generated by the same translation."""
+        bonds = crystal._bonds()
+        if len(bonds) == 0:
+            return []
+        n_atoms = len(shifts)
+        endpoints = np.searchsorted(crystal._rows(), np.array(crystal._graph.edge_list(), dtype=np.int64))
+        indices = np.full(n_candidates, -1, dtype=np.int64)
+        indices[ids] = np.arange(len(ids))
+        # translation of the second atom which places it in the same image as the first
+        i, j = endpoints[:, 0], endpoints[:, 1]
+        partners = self._grid[:, np.newaxis, :] + (shifts[j] - shifts[i])[np.newaxis, :, :] - self._lower
+        valid = np.all((partners >= 0) & (partners < self._shape), axis=2)
+        t, b = np.nonzero(valid)
+        partners = np.ravel_multi_index(tuple(partners[t, b].T), self._shape)
+        first = indices[t * n_atoms + i[b]]
+        second = indices[partners * n_atoms + j[b]]
+        keep = (first >= 0) & (second >= 0)
+        res = []
+        for bond, a, c in zip((bonds[k] for k in b[keep].tolist()), first[keep].tolist(), second[keep].tolist()):
+            extras = {} if bond is None else {k: v for k, v in bond.items() if k != "indices"}
+            res.append(Bond((a, c), **copy.deepcopy(extras)))
+        return res
+
+
+def _is_diagonal(matrix: np.ndarray) -> bool:
+    return np.array_equal(matrix, np.diag(np.diag(matrix))) and np.all(np.diag(matrix) > 0)
+
+
+def _projection_matrix(vectors: np.ndarray, normal: np.ndarray, orthogonalize: bool) -> np.ndarray:
+    """Returns the integer coefficients of the lattice vectors of a cell with its first two vectors in a plane."""
+    a, b = _orthogonal_sublattice(vectors, normal[np.newaxis])
+    if orthogonalize:
+        b = _orthogonal_sublattice(vectors, np.array([normal, _unit(np.matmul(a, vectors))]))[0]
+        in_plane = np.matmul(np.array([a, b]), vectors)
+        c = _orthogonal_sublattice(vectors, in_plane / np.linalg.norm(in_plane, axis=1)[:, np.newaxis])[0]
+        if np.linalg.det(np.array([a, b, c])) < 0:
+            c = -c
+    else:
+        c = _complete_basis(a, b, vectors)
+    return np.array([a, b, c])
+
+
+def _standard_rotation(vectors: np.ndarray) -> np.ndarray:
+    """Returns the rotation which aligns the first lattice vector with x and the second with the xy-plane."""
+    x_hat = _unit(vectors[0])
+    z_hat = _unit(np.cross(vectors[0], vectors[1]))
+    return np.array([x_hat, np.cross(z_hat, x_hat), z_hat])
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    return vector / np.linalg.norm(vector)
+
+
+def _cartesian_plane(plane: Plane, vectors: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Returns the unit normal and offset of a plane in lattice units expressed in cartesian space."""
+    points = np.matmul(np.asarray(plane.coplanar_points, dtype=float), vectors)
+    coefficients = Plane(points).coefficients
+    norm = np.linalg.norm(coefficients[:3])
+    if norm < _TOLERANCE:
+        raise ValueError("the points of the plane must not be collinear")
+    return coefficients[:3] / norm, coefficients[3] / norm
+
+
+def _replicate(atoms: Sequence[Atom], sources: np.ndarray, positions: np.ndarray) -> List[Atom]:
+    """Returns a copy of `atoms[source]` at each position."""
+    templates = [(type(atom), atom.specie, {k: v for k, v in atom.items() if k not in ("specie", "position")})
+                 for atom in atoms]
+    return [
+        _type(specie, position, **copy.deepcopy(extras)) if extras else _type(specie, position)
+        for (_type, specie, extras), position in zip((templates[i] for i in sources.tolist()), positions)
+    ]
+
+
+def _lll(basis: np.ndarray, delta: float = 0.75) -> np.ndarray:
+    """Returns the integer matrix which transforms the rows of `basis` into an LLL reduced basis."""
+    basis = np.array(basis, dtype=float)
+    n = len(basis)
+    transform = np.identity(n, dtype=np.int64)
+
+    def gram_schmidt():
+        ortho = basis.copy()
+        mu = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i):
+                mu[i, j] = np.dot(basis[i], ortho[j]) / np.dot(ortho[j], ortho[j])
+                ortho[i] -= mu[i, j] * ortho[j]
+        return ortho, mu
+
+    ortho, mu = gram_schmidt()
+    k = 1
+    while k < n:
+        # size reduction
+        for j in range(k - 1, -1, -1):
+            q = int(round(mu[k, j]))
+            if q != 0:
+                basis[k] -= q * basis[j]
+                transform[k] -= q * transform[j]
+                ortho, mu = gram_schmidt()
+        # Lovasz condition
+        if np.dot(ortho[k], ortho[k]) >= (delta - mu[k, k - 1]**2) * np.dot(ortho[k - 1], ortho[k - 1]):
+            k += 1
+        else:
+            basis[[k - 1, k]] = basis[[k, k - 1]]
+            transform[[k - 1, k]] = transform[[k, k - 1]]
+            ortho, mu = gram_schmidt()
+            k = max(k - 1, 1)
+    return transform
+
+
+def _orthogonal_sublattice(vectors: np.ndarray, directions: np.ndarray) -> np.ndarray:
+    """Returns the integer coefficients of a short basis of the lattice vectors orthogonal to every direction,
+    shortest first.
+
+    Components along `directions` are appended to the lattice vectors with a large weight
+    so lattice reduction drives them to zero rather than enumerating integer combinations.
+    """
+    projections = np.matmul(vectors, directions.T)
+    transform = _lll(np.hstack((vectors, projections / _TOLERANCE)))
+    rank = len(vectors) - len(directions)
+    mask = np.all(np.abs(np.matmul(transform, projections)) < _TOLERANCE, axis=1)
+    if np.count_nonzero(mask) < rank:
+        raise ValueError("the lattice has no vectors orthogonal to the requested directions")
+    res = transform[mask]
+    order = np.argsort(np.linalg.norm(np.matmul(res, vectors), axis=1), kind="stable")
+    return res[order][:rank]
+
+
+def _complete_basis(a: np.ndarray, b: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Returns the integer coefficients of the lattice vector `c` closest to perpendicular to `a` and `b`
+    for which `(a, b, c)` is a right handed basis of the whole lattice.
+    """
+    # solve c . (a x b) = 1 with the extended Euclidean algorithm
+    normal = np.cross(a, b)
+    g, x, y = _egcd(int(normal[0]), int(normal[1]))
+    h, s, t = _egcd(g, int(normal[2]))
+    if h != 1:
+        raise ValueError("the in-plane vectors are not a basis of the plane")
+    c = np.array([s * x, s * y, t], dtype=np.int64)
+    # remove the in-plane component of c as far as the lattice allows
+    in_plane = np.matmul(np.array([a, b]), vectors)
+    shift = np.linalg.lstsq(in_plane.T, np.matmul(c, vectors), rcond=None)[0]
+    return c - np.matmul(np.round(shift).astype(np.int64), np.array([a, b]))
+
+
+def _egcd(a: int, b: int) -> Tuple[int, int, int]:
+    """Returns the non-negative `gcd(a, b)` and integers `x` and `y` such that `a * x + b * y == gcd(a, b)`."""
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b != 0:
+        q, a, b = a // b, b, a % b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    if a < 0:
+        return -a, -x0, -y0
+    return a, x0, y0
@@ -0,0 +1,335 @@
+"""Uniform grid spatial index for range and nearest neighbor queries."""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# average number of atoms per grid bin
+_OCCUPANCY = 2.0
+
+# minimum number of inserted atoms held outside of the bins before the grid is rebuilt
+_BUFFER_SIZE = 256
+
+
+class SpatialGrid(object):
+    """Uniform grid over atomic positions answering range and nearest neighbor queries.
+
+    Atoms are sorted into bins once so each query only visits the bins which overlap it
+    and its cost grows with the size of the result rather than with the number of atoms.
+    With lattice vectors the grid is periodic: positions are wrapped into the cell and
+    box, sphere and nearest neighbor queries consider every periodic image of every atom.
+
+    The grid is updated in place by `insert` and `remove`. Removed atoms are masked and
+    inserted atoms are held in a small buffer which is searched exhaustively until it
+    grows large enough that the grid is rebuilt.
+
+    Args:
+        positions: Cartesian positions with shape `(N, 3)`.
+        lattice_vectors: Row-major matrix of lattice vectors.
+        indices: Index reported for each position. Defaults to the order of `positions`.
+
+    Example:
+        >>> from atompack.grid import SpatialGrid
+        >>> import numpy as np
+        >>>
+        >>> # three atoms along the z axis of a 10 unit cubic cell
+        >>> positions = np.array([[0.0, 0.0, 0.5], [0.0, 0.0, 5.0], [0.0, 0.0, 9.0]])
+        >>> grid = SpatialGrid(positions, np.identity(3) * 10)
+        >>> assert grid.sphere([0.0, 0.0, 0.0], 1.5).tolist() == [0, 2]
+        >>> assert grid.slab([0.0, 0.0, 1.0], 4.0, 10.0).tolist() == [1, 2]
+        >>> # the image of the first atom is nearer than the last atom
+        >>> indices, distances = grid.nearest([0.0, 0.0, 9.8], 2)
+        >>> assert indices.tolist() == [0, 2] and np.allclose(distances, [0.7, 0.8])
+        >>>
+        >>> # move the last atom next to the middle one
+        >>> grid.remove([2])
+        >>> grid.insert([[0.0, 0.0, 5.5]], [2])
+        >>> assert grid.sphere([0.0, 0.0, 5.0], 1.0).tolist() == [1, 2]
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        lattice_vectors: Optional[np.ndarray] = None,
+        indices: Optional[np.ndarray] = None,
+    ) -> None:
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        indices = np.arange(len(positions)) if indices is None else np.asarray(indices)
+        if len(indices) != len(positions):
+            raise ValueError("`indices` must have the same length as `positions`")
+        self._lattice_vectors: Optional[np.ndarray] = None
+        if lattice_vectors is not None:
+            self._lattice_vectors = np.array(lattice_vectors, dtype=np.float64)
+            if abs(np.linalg.det(self._lattice_vectors)) < 1E-12:
+                raise ValueError("`lattice_vectors` must span a nonzero volume")
+        # atoms inserted since the last build, set by `_build`
+        self._buffer_positions: np.ndarray
+        self._buffer_indices: np.ndarray
+        self._build(positions, indices)
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def lattice_vectors(self) -> Optional[np.ndarray]:
+        """Returns the lattice vectors of a periodic grid or None."""
+        return self._lattice_vectors
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def box(self, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+        """Returns the sorted indices of atoms inside an axis-aligned box.
+
+        Args:
+            lower: Minimum cartesian coordinates of the box.
+            upper: Maximum cartesian coordinates of the box.
+        """
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        corners = np.where(np.indices((2, 2, 2)).reshape(3, -1).T, upper, lower)
+        fractional = np.matmul(corners - self._origin, self._inverse)
+        indices, points = self._candidates(fractional.min(axis=0), fractional.max(axis=0))
+        inside = np.all((points >= lower) & (points <= upper), axis=1)
+        return np.unique(indices[inside])
+
+    def sphere(self, center: np.ndarray, radius: float) -> np.ndarray:
+        """Returns the sorted indices of atoms within `radius` of `center`."""
+        indices, _ = self._sphere(np.asarray(center, dtype=np.float64), radius)
+        return np.sort(indices)
+
+    def slab(self, normal: np.ndarray, lower: float, upper: float) -> np.ndarray:
+        """Returns the sorted indices of atoms between two parallel planes.
+        Periodic images are not considered so only the atoms inside the cell are tested.
+
+        Args:
+            normal: Direction normal to the planes.
+            lower: Minimum projection of a position onto the unit normal.
+            upper: Maximum projection of a position onto the unit normal.
+        """
+        normal = np.asarray(normal, dtype=np.float64)
+        normal = normal / np.linalg.norm(normal)
+        # change in projection across one bin along each axis
+        steps = np.matmul(self._matrix, normal) / self._n_bins
+        low = np.minimum(steps, 0).sum() + np.dot(self._origin, normal)
+        high = np.maximum(steps, 0).sum() + np.dot(self._origin, normal)
+
+        # scan bins along the steepest axis and solve for the overlapping range of each column
+        axis = int(np.argmax(np.abs(steps)))
+        others = [i for i in range(3) if i != axis]
+        columns = np.indices(self._n_bins[others]).reshape(2, -1)
+        rest = np.matmul(steps[others], columns)
+        bounds = np.sort([(lower - rest - high) / steps[axis], (upper - rest - low) / steps[axis]], axis=0)
+        first = np.maximum(np.floor(bounds[0]), 0).astype(np.int64)
+        last = np.minimum(np.ceil(bounds[1]), self._n_bins[axis] - 1).astype(np.int64)
+        counts = np.maximum(last - first + 1, 0)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        bins = np.empty((len(offsets), 3), dtype=np.int64)
+        bins[:, axis] = np.repeat(first, counts) + offsets
+        bins[:, others] = np.repeat(columns.T, counts, axis=0)
+
+        slots, _ = self._expand(np.ravel_multi_index(bins.T, self._n_bins))
+        slots = self._live(slots)
+        indices = np.concatenate((self._indices[slots], self._buffer_indices))
+        projections = np.matmul(np.concatenate((self._positions[slots], self._buffer_positions)), normal)
+        inside = (projections >= lower) & (projections <= upper)
+        return np.sort(indices[inside])
+
+    def nearest(self, point: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the indices of the `k` atoms nearest to a point and their distances in ascending order.
+        In periodic grids the distance to an atom is the distance to its nearest image.
+        """
+        if k > len(self):
+            raise ValueError(f"cannot find {k} nearest atoms among {len(self)} atoms")
+        point = np.asarray(point, dtype=np.float64)
+        # grow a sphere until it holds enough atoms
+        radius = self._spacing * max(k / _OCCUPANCY, 1)**(1 / 3)
+        while True:
+            indices, distances = self._sphere(point, radius)
+            if len(indices) >= k:
+                break
+            radius *= 2
+        nearest = np.argsort(distances, kind="stable")[:k]
+        return indices[nearest], np.sqrt(distances[nearest])
+
+    def insert(self, positions: np.ndarray, indices: np.ndarray) -> None:
+        """Inserts atoms which are not already in the grid.
+
+        Args:
+            positions: Cartesian positions with shape `(N, 3)`.
+            indices: Index reported for each position.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        indices = np.asarray(indices).reshape(-1)
+        if len(indices) != len(positions):
+            raise ValueError("`indices` must have the same length as `positions`")
+        slots = self._find(indices)
+        if np.any(slots >= 0) or np.any(np.isin(indices, self._buffer_indices)):
+            raise ValueError("atoms are already in the grid")
+        if self._lattice_vectors is not None:
+            fractional = np.matmul(positions, self._inverse)
+            positions = np.matmul(fractional - np.floor(fractional), self._matrix)
+        self._buffer_positions = np.concatenate((self._buffer_positions, positions))
+        self._buffer_indices = np.concatenate((self._buffer_indices, indices))
+        if len(self._buffer_indices) > max(_BUFFER_SIZE, len(self._indices) // 64):
+            self._rebuild()
+
+    def remove(self, indices: np.ndarray) -> None:
+        """Removes atoms from the grid by the index reported for them."""
+        indices = np.asarray(indices).reshape(-1)
+        buffered = np.isin(indices, self._buffer_indices)
+        if np.any(buffered):
+            kept = ~np.isin(self._buffer_indices, indices[buffered])
+            self._buffer_positions = self._buffer_positions[kept]
+            self._buffer_indices = self._buffer_indices[kept]
+        slots = self._find(indices[~buffered])
+        if np.any(slots < 0):
+            raise ValueError(f"no atom with index {indices[~buffered][slots < 0][0]} is in the grid")
+        self._alive[slots] = False
+        self._n_removed += len(slots)
+        if self._n_removed > len(self._indices) // 2:
+            self._rebuild()
+
+    #########################
+    #    Special Methods    #
+    #########################
+
+    def __len__(self) -> int:
+        return len(self._indices) - self._n_removed + len(self._buffer_indices)
+
+    #########################
+    #    Private Methods    #
+    #########################
+
+    def _build(self, positions: np.ndarray, indices: np.ndarray) -> None:
+        """Sorts atoms into bins sized for their number and extent."""
+        n_atoms = len(positions)
+
+        # express positions in fractional coordinates of the binned volume
+        if self._lattice_vectors is not None:
+            self._origin = np.zeros(3)
+            self._matrix = self._lattice_vectors
+            fractional = np.matmul(positions, np.linalg.inv(self._matrix))
+            fractional -= np.floor(fractional)
+            positions = np.matmul(fractional, self._matrix)
+            # perpendicular distance between opposite faces of the cell
+            a, b, c = self._matrix
+            volume = abs(np.linalg.det(self._matrix))
+            widths = volume / np.linalg.norm([np.cross(b, c), np.cross(c, a), np.cross(a, b)], axis=1)
+            active = np.ones(3, dtype=bool)
+        else:
+            self._origin = positions.min(axis=0) if n_atoms > 0 else np.zeros(3)
+            extents = positions.max(axis=0) - self._origin if n_atoms > 0 else np.zeros(3)
+            # axes along which every atom has the same coordinate are not binned
+            active = extents > 1E-9
+            widths = np.where(active, extents, 1.0)
+            self._matrix = np.diag(widths)
+            fractional = (positions - self._origin) / widths
+        self._inverse = np.linalg.inv(self._matrix)
+
+        # bins are cubes of roughly equal edge length holding `_OCCUPANCY` atoms on average
+        self._spacing = 1.0
+        self._n_bins = np.ones(3, dtype=np.int64)
+        if n_atoms > 0 and np.any(active):
+            self._spacing = (np.prod(widths[active]) * _OCCUPANCY / n_atoms)**(1 / np.count_nonzero(active))
+            self._n_bins[active] = np.maximum(np.floor(widths[active] / self._spacing), 1)
+
+        # sort atoms by bin
+        bins = np.clip(np.floor(fractional * self._n_bins).astype(np.int64), 0, self._n_bins - 1)
+        bin_ids = np.ravel_multi_index(bins.T, self._n_bins)
+        order = np.argsort(bin_ids, kind="stable")
+        self._positions = positions[order]
+        self._indices = indices[order]
+        self._counts = np.bincount(bin_ids, minlength=np.prod(self._n_bins))
+        self._starts = np.cumsum(self._counts) - self._counts
+
+        # updates
+        self._alive = np.ones(n_atoms, dtype=bool)
+        self._n_removed = 0
+        self._buffer_positions = np.zeros((0, 3))
+        self._buffer_indices = np.zeros(0, dtype=self._indices.dtype)
+        # slot of each index, created by the first update
+        self._slots: Optional[np.ndarray] = None
+
+    def _rebuild(self) -> None:
+        """Sorts the buffered atoms into bins and drops removed atoms."""
+        self._build(np.concatenate((self._positions[self._alive], self._buffer_positions)),
+                    np.concatenate((self._indices[self._alive], self._buffer_indices)))
+
+    def _find(self, indices: np.ndarray) -> np.ndarray:
+        """Returns the slot of each binned atom which has not been removed or -1."""
+        if self._slots is None:
+            size = int(self._indices.max()) + 1 if len(self._indices) > 0 else 0
+            self._slots = np.full(size, -1, dtype=np.int64)
+            self._slots[self._indices] = np.arange(len(self._indices))
+        res = np.full(len(indices), -1, dtype=np.int64)
+        known = (indices >= 0) & (indices < len(self._slots))
+        res[known] = self._slots[indices[known]]
+        found = res >= 0
+        res[found] = np.where(self._alive[res[found]], res[found], -1)
+        return res
+
+    def _live(self, slots: np.ndarray) -> np.ndarray:
+        """Returns the slots of atoms which have not been removed."""
+        if self._n_removed == 0:
+            return slots
+        return slots[self._alive[slots]]
+
+    def _sphere(self, center: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the index and squared distance of the nearest image of every atom within a sphere."""
+        # the fractional extent of a sphere along each axis
+        fractional = np.matmul(center - self._origin, self._inverse)
+        extent = radius * np.linalg.norm(self._inverse, axis=0)
+        indices, points = self._candidates(fractional - extent, fractional + extent)
+        vectors = points - center
+        distances = np.einsum("ij,ij->i", vectors, vectors)
+        inside = np.flatnonzero(distances <= radius * radius)
+        indices, distances = indices[inside], distances[inside]
+        if self._lattice_vectors is not None:
+            # keep only the nearest image of each atom
+            order = np.argsort(distances, kind="stable")
+            _, first = np.unique(indices[order], return_index=True)
+            indices, distances = indices[order[first]], distances[order[first]]
+        return indices, distances
+
+    def _candidates(self, lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the index and image position of every atom which may lie in a fractional box."""
+        first = np.floor(lower * self._n_bins).astype(np.int64)
+        last = np.floor(upper * self._n_bins).astype(np.int64)
+        periodic = self._lattice_vectors is not None
+        if not periodic:
+            first = np.maximum(first, 0)
+            last = np.minimum(last, self._n_bins - 1)
+        if np.all(last >= first):
+            bins = np.indices(last - first + 1).reshape(3, -1).T + first
+            # bins beyond a periodic cell hold translated images
+            shifts = np.floor_divide(bins, self._n_bins)
+            slots, owners = self._expand(np.ravel_multi_index((bins - shifts * self._n_bins).T, self._n_bins))
+            if self._n_removed > 0:
+                live = self._alive[slots]
+                slots, owners = slots[live], owners[live]
+            indices, points = self._indices[slots], self._positions[slots]
+            if periodic:
+                points += np.matmul(shifts, self._matrix)[owners]
+        else:
+            indices, points = self._buffer_indices[:0], np.zeros((0, 3))
+        if len(self._buffer_indices) == 0:
+            return indices, points
+
+        # buffered atoms are tested exhaustively against every image overlapping the box
+        buffer_indices, buffer_positions = self._buffer_indices, self._buffer_positions
+        if periodic:
+            cells = np.floor(lower).astype(np.int64)
+            cells = np.indices(np.floor(upper).astype(np.int64) - cells + 1).reshape(3, -1).T + cells
+            buffer_indices = np.repeat(buffer_indices, len(cells))
+            buffer_positions = (buffer_positions[:, None] + np.matmul(cells, self._matrix)).reshape(-1, 3)
+        return np.concatenate((indices, buffer_indices)), np.concatenate((points, buffer_positions))
+
+    def _expand(self, bin_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the slot of every atom in the given bins and the position of its bin in `bin_ids`."""
+        counts = self._counts[bin_ids]
+        owners = np.repeat(np.arange(len(bin_ids)), counts)
+        slots = np.arange(counts.sum()) + (self._starts[bin_ids] - (np.cumsum(counts) - counts))[owners]
+        return slots, owners
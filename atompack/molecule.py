@@ -1,10 +1,15 @@
 """A simple abstraction for covalently bonded chemical compounds."""
 
+from atompack.columns import AtomColumns
 from atompack.topology import Topology
 
 
 class Molecule(Topology):
-    """Minimal representation of a chemical compound."""
+    """Minimal representation of a chemical compound.
 
-    def __init__(self) -> None:
-        super().__init__()
+    Args:
+        columnar: Determines whether atoms are stored in columns rather than as individual objects.
+    """
+
+    def __init__(self, columnar: bool = False) -> None:
+        super().__init__(columns=AtomColumns() if columnar else None)
@@ -0,0 +1,240 @@
+"""Cell list neighbor search for periodic and non-periodic structures."""
+
+import itertools
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# number of atoms processed together to bound the size of temporary arrays
+_CHUNK_SIZE = 1 << 16
+
+
+class NeighborList(object):
+    """Neighbors of every atom within a cutoff radius in compressed sparse row (CSR) format.
+
+    The neighbors of atom `i` are `indices[indptr[i]:indptr[i + 1]]` and the vectors
+    pointing from atom `i` to each of those neighbors are `vectors[indptr[i]:indptr[i + 1]]`.
+    Atoms are indexed by their order in `Topology.atoms`.
+    In periodic structures every image within the cutoff is listed, so a neighbor
+    may appear more than once and an atom may neighbor its own images.
+
+    Args:
+        indptr: Offset of each atom's neighbors with shape `(N + 1,)`.
+        indices: Index of each neighbor with shape `(M,)`.
+        vectors: Vector from each atom to each of its neighbors with shape `(M, 3)`.
+
+    Example:
+        >>> from atompack.neighbors import NeighborList
+        >>> import numpy as np
+        >>>
+        >>> # two atoms 1 unit apart in a 10 unit cubic cell
+        >>> positions = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 9.0]])
+        >>> neighbors = NeighborList.from_positions(positions, 1.5, np.identity(3) * 10)
+        >>> assert list(neighbors.neighbors(0)) == [1]
+        >>> assert np.allclose(neighbors.vectors[0], [0.0, 0.0, -1.0])
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, vectors: np.ndarray) -> None:
+        self._indptr = indptr
+        self._indices = indices
+        self._vectors = vectors
+
+    ######################
+    #    Constructors    #
+    ######################
+
+    @classmethod
+    def from_positions(
+        cls,
+        positions: np.ndarray,
+        cutoff: float,
+        lattice_vectors: Optional[np.ndarray] = None,
+    ) -> 'NeighborList':
+        """Initializes from an array of positions.
+
+        Args:
+            positions: Cartesian positions with shape `(N, 3)`.
+            cutoff: Neighbor search radius.
+            lattice_vectors: Row-major matrix of lattice vectors.
+                The search is periodic in all three directions if provided.
+        """
+        if cutoff <= 0:
+            raise ValueError("`cutoff` must be positive")
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        if lattice_vectors is not None:
+            lattice_vectors = np.asarray(lattice_vectors, dtype=np.float64)
+            if abs(np.linalg.det(lattice_vectors)) < 1E-12:
+                raise ValueError("`lattice_vectors` must span a nonzero volume")
+        return cls(*_search(positions, cutoff, lattice_vectors))
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def indptr(self) -> np.ndarray:
+        """Returns the offset of each atom's neighbors."""
+        return self._indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        """Returns the index of each neighbor."""
+        return self._indices
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Returns the vector from each atom to each of its neighbors."""
+        return self._vectors
+
+    @property
+    def distances(self) -> np.ndarray:
+        """Returns the distance from each atom to each of its neighbors."""
+        return np.sqrt(np.einsum("ij,ij->i", self._vectors, self._vectors))
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def neighbors(self, index: int) -> np.ndarray:
+        """Returns the indices of an atom's neighbors."""
+        return self._indices[self._indptr[index]:self._indptr[index + 1]]
+
+    def pairs(self) -> np.ndarray:
+        """Returns every `(i, j)` neighbor pair with shape `(M, 2)`."""
+        sources = np.repeat(np.arange(len(self)), np.diff(self._indptr))
+        return np.column_stack((sources, self._indices))
+
+    #########################
+    #    Special Methods    #
+    #########################
+
+    def __len__(self) -> int:
+        return len(self._indptr) - 1
+
+
+def _search(positions: np.ndarray, cutoff: float,
+            lattice_vectors: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the CSR arrays of a cell list search."""
+    n_atoms = len(positions)
+    if n_atoms == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+
+    # express positions in fractional coordinates of the binned volume
+    if lattice_vectors is not None:
+        fractional = np.matmul(positions, np.linalg.inv(lattice_vectors))
+        fractional -= np.floor(fractional)
+        positions = np.matmul(fractional, lattice_vectors)
+        # perpendicular distance between opposite faces of the cell
+        a, b, c = lattice_vectors
+        volume = abs(np.linalg.det(lattice_vectors))
+        widths = volume / np.linalg.norm([np.cross(b, c), np.cross(c, a), np.cross(a, b)], axis=1)
+    else:
+        origin = positions.min(axis=0)
+        widths = np.maximum(positions.max(axis=0) - origin, cutoff)
+        fractional = (positions - origin) / widths
+
+    # bins are at least `cutoff` wide unless that requires more bins than atoms
+    n_bins = np.maximum(np.floor(widths / cutoff), 1).astype(np.int64)
+    while np.prod(n_bins) > 2 * n_atoms and np.any(n_bins > 1):
+        n_bins = np.maximum(n_bins // 2, 1)
+    reach = np.ceil(cutoff * n_bins / widths - 1E-12).astype(np.int64)
+
+    # sort atoms by bin
+    bins = np.minimum(np.floor(fractional * n_bins).astype(np.int64), n_bins - 1)
+    bins = np.maximum(bins, 0)
+    bin_ids = np.ravel_multi_index(bins.T, n_bins)
+    order = np.argsort(bin_ids, kind="stable")
+    sorted_positions = positions[order]
+    counts = np.bincount(bin_ids, minlength=np.prod(n_bins))
+    starts = np.cumsum(counts) - counts
+
+    stencil = np.array(list(itertools.product(*[range(-r, r + 1) for r in reach])), dtype=np.int64)
+    cutoff_sq = cutoff * cutoff
+    indptr = np.zeros(n_atoms + 1, dtype=np.int64)
+    indices: List[np.ndarray] = []
+    vectors: List[np.ndarray] = []
+    for lo in range(0, n_atoms, _CHUNK_SIZE):
+        hi = min(lo + _CHUNK_SIZE, n_atoms)
+        passes = [
+            _scan(positions[lo:hi], bins[lo:hi], lo, offset, n_bins, sorted_positions, order, counts, starts,
+                  lattice_vectors, cutoff_sq) for offset in stencil
+        ]
+        _indices, _vectors = _merge(passes, lo, hi, indptr)
+        indices.append(_indices)
+        vectors.append(_vectors)
+    indptr = np.cumsum(indptr)
+    return indptr, np.concatenate(indices), np.concatenate(vectors)
+
+
+def _scan(
+    positions: np.ndarray,
+    bins: np.ndarray,
+    lo: int,
+    offset: np.ndarray,
+    n_bins: np.ndarray,
+    sorted_positions: np.ndarray,
+    order: np.ndarray,
+    counts: np.ndarray,
+    starts: np.ndarray,
+    lattice_vectors: Optional[np.ndarray],
+    cutoff_sq: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the neighbors found in the bin at `offset` from each atom of a chunk."""
+    sources = np.arange(lo, lo + len(bins))
+    targets = bins + offset
+    shifts = np.floor_divide(targets, n_bins)
+    if lattice_vectors is None:
+        # bins beyond the edge of a non-periodic volume are empty
+        inside = ~np.any(shifts, axis=1)
+        sources, positions, targets, shifts = sources[inside], positions[inside], targets[inside], shifts[inside]
+    targets -= shifts * n_bins
+    target_ids = np.ravel_multi_index(targets.T, n_bins)
+
+    # expand each source atom against every atom of its target bin
+    # candidates are gathered from the bin-sorted positions so each bin is read contiguously
+    n_candidates = counts[target_ids]
+    total = int(n_candidates.sum())
+    first = np.cumsum(n_candidates) - n_candidates
+    slots = np.arange(total) - np.repeat(first - starts[target_ids], n_candidates)
+    origins = positions
+    if lattice_vectors is not None:
+        origins = positions - np.matmul(shifts, lattice_vectors)
+    vector = sorted_positions[slots]
+    vector -= np.repeat(origins, n_candidates, axis=0)
+
+    # discard atoms beyond the cutoff and each atom's pairing with itself
+    kept = np.flatnonzero(np.einsum("ij,ij->i", vector, vector) < cutoff_sq)
+    owners = np.searchsorted(first + n_candidates, kept, side="right")
+    i = sources[owners]
+    j = order[slots[kept]]
+    keep = (i != j) | np.any(shifts[owners], axis=1)
+    return i[keep], j[keep], vector[kept[keep]]
+
+
+def _merge(
+    passes: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    lo: int,
+    hi: int,
+    indptr: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Interleaves the per-offset results of a chunk so neighbors are grouped by atom.
+    The neighbor count of each atom is written into `indptr[lo + 1:hi + 1]`.
+    """
+    # neighbors found by each pass for each atom of the chunk
+    pass_counts = np.array([np.bincount(i - lo, minlength=hi - lo) for i, _, _ in passes])
+    row_counts = pass_counts.sum(axis=0)
+    indptr[lo + 1:hi + 1] = row_counts
+    row_starts = np.cumsum(row_counts) - row_counts
+    pass_starts = np.cumsum(pass_counts, axis=0) - pass_counts
+
+    total = int(row_counts.sum())
+    indices = np.empty(total, dtype=np.int64)
+    vectors = np.empty((total, 3))
+    for (i, j, vector), _pass_counts, _pass_starts in zip(passes, pass_counts, pass_starts):
+        # each pass is sorted by source atom so ranks within a group are contiguous
+        rows = i - lo
+        group_starts = np.cumsum(_pass_counts) - _pass_counts
+        destinations = row_starts[rows] + _pass_starts[rows] + np.arange(len(i)) - group_starts[rows]
+        indices[destinations] = j
+        vectors[destinations] = vector
+    return indices, vectors
@@ -1,25 +1,141 @@
 """An abstraction for crystallographic spacegroups."""
 
-from typing import List, Union
-
+import importlib.resources
+import os
+import re
+import sys
+from fractions import Fraction
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
 import orjson
-import pkg_resources
 
 SPACEGROUPS = None
 
+# international numbers keyed by full, normalized and normalized short Hermann Mauguin symbols
+_INDEX: Optional[Dict[str, int]] = None
+
+# pre-parsed general positions stored as `(N, 3, 4)` affine matrices keyed by international number
+_OPERATIONS_FILE = "spacegroups.npz"
+_OPERATIONS_ARCHIVE: Optional[Any] = None
+_OPERATIONS: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+# a signed term of a general position expression such as `-x`, `+y` or `+1/2`
+_GENPOS_TERM = re.compile(r"([+-]?)(x|y|z|\d+(?:/\d+)?)")
+
+_GENPOS_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+def _open_data(name: str) -> IO[bytes]:
+    """Opens a file of the `atompack.data` package in binary mode."""
+    if sys.version_info >= (3, 9):
+        return importlib.resources.files("atompack.data").joinpath(name).open("rb")
+    return importlib.resources.open_binary("atompack.data", name)
+
 
 def _load_spacegroups():
     global SPACEGROUPS
     if SPACEGROUPS is None:
-        SPACEGROUPS = orjson.loads(pkg_resources.resource_string(__name__, "data/spacegroups.json"))
+        with _open_data("spacegroups.json") as f:
+            SPACEGROUPS = orjson.loads(f.read())
     return SPACEGROUPS
 
 
+def _normalize_symbol(symbol: str) -> str:
+    """Returns a Hermann Mauguin symbol without whitespace, underscores or case."""
+    return re.sub(r"[\s_]", "", symbol).lower()
+
+
+def _short_symbol(symbol: str) -> str:
+    """Returns the short form of a full monoclinic symbol such as `P 1 21/c 1`.
+    Other symbols are returned unchanged.
+    """
+    tokens = symbol.split()
+    if len(tokens) == 4 and tokens[1] == tokens[3] == "1":
+        return tokens[0] + " " + tokens[2]
+    return symbol
+
+
+def _load_index() -> Dict[str, int]:
+    global _INDEX
+    if _INDEX is None:
+        index: Dict[str, int] = {}
+        for group in _load_spacegroups():
+            symbol = group["hermann_mauguin"]
+            number = group["international_number"]
+            index[symbol] = number
+            index.setdefault(_normalize_symbol(symbol), number)
+            index.setdefault(_normalize_symbol(_short_symbol(symbol)), number)
+        _INDEX = index
+    return _INDEX
+
+
+def _load_operations(number: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the read-only rotation matrices and translation vectors of a spacegroup.
+    Only the requested group is decompressed and the result is shared by every instance.
+    """
+    global _OPERATIONS_ARCHIVE
+    res = _OPERATIONS.get(number)
+    if res is None:
+        if _OPERATIONS_ARCHIVE is None:
+            _OPERATIONS_ARCHIVE = np.load(_open_data(_OPERATIONS_FILE))
+        affine = _OPERATIONS_ARCHIVE[str(number)]
+        rotations = np.ascontiguousarray(affine[:, :, :3])
+        translations = np.ascontiguousarray(affine[:, :, 3])
+        rotations.flags.writeable = False
+        translations.flags.writeable = False
+        res = (rotations, translations)
+        _OPERATIONS[number] = res
+    return res
+
+
+def _compile_operations(path: Optional[str] = None) -> None:
+    """Parses the general positions of every spacegroup and writes them to `data/spacegroups.npz`.
+    This must be rerun whenever `data/spacegroups.json` changes.
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(__file__), "data", _OPERATIONS_FILE)
+    arrays = {}
+    for group in _load_spacegroups():
+        pairs = [_parse_genpos(genpos) for genpos in group["genpos"]]
+        arrays[str(group["international_number"])] = np.array(
+            [np.column_stack((rotation, translation)) for rotation, translation in pairs])
+    np.savez_compressed(path, **arrays)
+
+
+def _parse_genpos(genpos: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the rotation matrix and translation vector of a general position expression."""
+    rotation = np.zeros((3, 3))
+    translation = np.zeros(3)
+    components = genpos.replace(" ", "").split(",")
+    if len(components) != 3:
+        raise ValueError(f"invalid general position expression `{genpos}`")
+    for i, component in enumerate(components):
+        terms = _GENPOS_TERM.findall(component)
+        if "".join(sign + term for sign, term in terms) != component:
+            raise ValueError(f"invalid general position expression `{genpos}`")
+        for sign, term in terms:
+            value = -1 if sign == "-" else 1
+            if term in _GENPOS_AXES:
+                rotation[i, _GENPOS_AXES[term]] += value
+            else:
+                translation[i] += value * float(Fraction(term))
+    return rotation, translation
+
+
 class Spacegroup(object):
     """Representation of a spacegroup.
 
     Args:
         spg: Hermann Mauguin symbol or International spacegroup number.
+            Symbols are matched regardless of spacing, underscores and case,
+            and monoclinic groups also match their short symbol.
+
+    Example:
+        >>> from atompack.symmetry import Spacegroup
+        >>>
+        >>> assert Spacegroup("Fm-3m") == Spacegroup("F m -3 m") == Spacegroup(225)
+        >>> assert Spacegroup("P2_1/c").hermann_mauguin == "P 1 21/c 1"
     """
 
     def __init__(self, spg: Union[int, str]) -> None:
@@ -30,12 +146,13 @@ class Spacegroup(object):
                 raise ValueError("`spg` must be in range 1..230")
             group = spgs[spg - 1]  # type: ignore
         elif type(spg) is str:
-            for i, _group in enumerate(spgs):
-                if _group["hermann_mauguin"] == spg:
-                    group = spgs[i]
-                    break
-            if group is None:
+            index = _load_index()
+            number = index.get(spg)
+            if number is None:
+                number = index.get(_normalize_symbol(spg))
+            if number is None:
                 raise ValueError("`spg` is not a valid Hermann Mauguin spacegroup symbol")
+            group = spgs[number - 1]
         else:
             raise TypeError("`spg` must be of type int or str")
 
@@ -43,25 +160,28 @@ class Spacegroup(object):
         self._international_number = group["international_number"]
         self._hermann_mauguin = group["hermann_mauguin"]
         self._genpos = group["genpos"]
+        self._operations: Optional[Tuple[np.ndarray, np.ndarray]] = None
 
     ######################
     #    Constructors    #
     ######################
 
     @classmethod
-    def from_json(cls, s: str) -> 'Spacegroup':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'Spacegroup':
+        """Initializes from a dict."""
         # validate type
-        _type = data.pop("type")
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
         # return instance
         return cls(data["international_number"])
 
+    @classmethod
+    def from_json(cls, s: str) -> 'Spacegroup':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
+
     ####################
     #    Properties    #
     ####################
@@ -86,19 +206,32 @@ class Spacegroup(object):
         """Returns the general position expressions."""
         return self._genpos
 
+    @property
+    def operations(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the general positions as `(N, 3, 3)` rotation matrices and `(N, 3)` translation vectors.
+        The pre-parsed operations are loaded on first access and cached.
+        """
+        if self._operations is None:
+            self._operations = _load_operations(self.international_number)
+        return self._operations
+
     ########################
     #    Public Methods    #
     ########################
 
-    def to_json(self) -> str:
-        """Returns the JSON serialized representation."""
-        return orjson.dumps({
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation."""
+        return {
             "type": type(self).__name__,
             "bravais_lattice": self.bravais_lattice,
             "international_number": self.international_number,
             "hermann_mauguin": self.hermann_mauguin,
             "genpos": self.genpos,
-        })
+        }
+
+    def to_json(self) -> str:
+        """Returns the JSON serialized representation."""
+        return orjson.dumps(self.to_dict())
 
     #########################
     #    Special Methods    #
@@ -1,12 +1,25 @@
 """The internal abstraction for a network of optionally bonded atoms."""
 
-from typing import List, Optional, Tuple
+import copy
+import mmap as _mmap
+from collections.abc import Sequence as _Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
 
+import numpy as np
 import orjson
 from retworkx import PyGraph
 
+from atompack import binary
 from atompack.atom import Atom
 from atompack.bond import Bond
+from atompack.changes import INSERTED, MOVED, REMOVED, ChangeLog, Changes
+from atompack.columns import AtomColumns, AtomSequence, AtomView
+from atompack.constants import COVALENT_RADII
+from atompack.grid import SpatialGrid
+from atompack.neighbors import NeighborList
+
+# type of a topology subclass, so methods returning a new instance keep the subclass
+_T = TypeVar("_T", bound="Topology")
 
 
 class Topology(object):
@@ -14,25 +27,45 @@ class Topology(object):
     
     Note:
         End users should not construct Topology objects directly.
+
+    Args:
+        graph: Prebuilt graph of atoms and bonds.
+        columns: Columnar atom storage.
+            When provided, the graph only tracks indices and bonds while atomic
+            properties live in the columns and atoms are returned as row views.
+            If no graph is provided alongside the columns it is created on first use.
+
+    Note:
+        Topologies may share their storage copy-on-write (see `Crystal`).
+        Every method which mutates the topology first gives it a private copy of shared storage.
+        Atoms and bonds read from shared storage only claim a copy when they are modified,
+        and arrays viewing shared storage are read-only. References handed out before the
+        storage is shared are detached from it.
     """
 
-    def __init__(self, graph: Optional[PyGraph] = None) -> None:
-        if graph is None:
+    def __init__(self, graph: Optional[PyGraph] = None, columns: Optional[AtomColumns] = None) -> None:
+        if graph is None and columns is None:
             graph = PyGraph()
-        self._graph = graph
+        # the graph of columnar storage may be created on first use (see `_graph`)
+        self.__graph: Optional[PyGraph] = graph
+        self._columns = columns
+        # number of topologies sharing the storage, shared between all of them
+        self._owners: Optional[List[int]] = None
+        # whether mutable references to the storage may have been handed out
+        self._exposed = False
+        self._changes = ChangeLog()
+        # spatial grid and the version of the atoms it was last updated to
+        self._spatial_grid: Optional[Tuple[int, SpatialGrid]] = None
 
     ######################
     #    Constructors    #
     ######################
 
     @classmethod
-    def from_json(cls, s: str) -> 'Topology':
-        """Initializes from a JSON string."""
-        # load dict from JSON string
-        data = orjson.loads(s)
-
+    def from_dict(cls, data: Dict[str, Any]) -> 'Topology':
+        """Initializes from a dict."""
         # validate type
-        _type = data.pop("type")
+        _type = data.get("type")
         if _type != cls.__name__:
             raise TypeError(f"cannot deserialize from type `{_type}`")
 
@@ -40,71 +73,782 @@ class Topology(object):
         graph = PyGraph()
 
         # process atoms
-        for atom in data["atoms"]:
-            graph.add_node(Atom.from_json(orjson.dumps(atom)))
+        graph.add_nodes_from([Atom.from_dict(atom) for atom in data["atoms"]])
 
         # process bonds
-        for bond in data["bonds"]:
-            bond = Bond.from_json(orjson.dumps(bond))
-            graph.add_edge(bond.indices[0], bond.indices[1], edge=bond)
+        bonds = [Bond.from_dict(bond) for bond in data["bonds"]]
+        graph.add_edges_from([(bond.indices[0], bond.indices[1], bond) for bond in bonds])
 
         # return instance
         return cls(graph)
 
+    @classmethod
+    def from_json(cls, s: str) -> 'Topology':
+        """Initializes from a JSON string."""
+        return cls.from_dict(orjson.loads(s))
+
+    @classmethod
+    def from_bytes(cls, b: Any, columnar: bool = False) -> 'Topology':
+        """Initializes from the compact binary representation.
+
+        Args:
+            b: Binary representation. Any object supporting the buffer protocol is accepted.
+            columnar: Determines whether atoms are stored in columns rather than as individual objects.
+                Columns adopt the arrays of a writable buffer without copying them.
+        """
+        header, positions, species, bonds = binary.decode(b)
+
+        # validate type
+        _type = header["type"]
+        if _type != cls.__name__:
+            raise TypeError(f"cannot deserialize from type `{_type}`")
+
+        # return instance
+        return cls(*_from_binary(header, positions, species, bonds, columnar))
+
+    @classmethod
+    def from_file(cls, path: str, columnar: bool = False, mmap: bool = False) -> 'Topology':
+        """Initializes from a file written by `to_file`.
+
+        Args:
+            path: Path to the file.
+            columnar: Determines whether atoms are stored in columns rather than as individual objects.
+            mmap: Determines whether the file is memory mapped rather than read.
+                Memory mapping implies columnar storage. Pages are only read from disk
+                when the atoms on them are accessed and modifications are never written back.
+        """
+        with open(path, "rb") as f:
+            if not mmap:
+                return cls.from_bytes(f.read(), columnar=columnar)
+            buffer = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_COPY)
+        return cls.from_bytes(buffer, columnar=True)
+
     ####################
     #    Properties    #
     ####################
 
     @property
-    def atoms(self) -> List[Atom]:
-        """Returns a list of all atoms in the topology."""
-        return self._graph.nodes()
+    def atoms(self) -> Sequence[Atom]:
+        """Returns a sequence of all atoms in the topology.
+        With columnar storage the atoms are created lazily as they are accessed.
+        """
+        if self._columns is None:
+            if self._owners is not None:
+                return _LazySequence(len(self._graph), self._shared_atoms)
+            return _LazySequence(len(self._graph), self._claim_atoms)
+        return AtomSequence(self._columns, None if self._is_dense() else self._rows(), self)
 
     @property
-    def bonds(self) -> List[Bond]:
-        """Returns a list of all bonds in the topology."""
-        return self._graph.edges()
+    def bonds(self) -> Sequence[Bond]:
+        """Returns a sequence of all bonds in the topology."""
+        if self.__graph is None:
+            return []
+        if self._owners is not None:
+            return _LazySequence(self.__graph.num_edges(), self._shared_bonds)
+        return _LazySequence(self.__graph.num_edges(), self._claim_bonds)
+
+    @property
+    def columnar(self) -> bool:
+        """Returns True if atoms are stored in columns."""
+        return self._columns is not None
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Returns an (N, 3) array of atomic positions.
+        With columnar storage and no vacant rows the array is a view, which is read-only while the storage is shared.
+        """
+        if self._is_dense():
+            return self._expose(self._positions())
+        return self._positions()
+
+    @positions.setter
+    def positions(self, value: np.ndarray) -> None:
+        self._unshare()
+        rows = self._rows()
+        if self._columns is None:
+            for atom, position in zip(self._atoms(), np.asarray(value, dtype=float)):
+                atom.position = position.copy()
+        elif self._is_dense():
+            self._columns.positions[:] = value
+        else:
+            self._columns.positions[rows] = value
+        self._changes.record(MOVED, rows)
+
+    @property
+    def spatial_grid(self) -> SpatialGrid:
+        """Returns a spatial grid over the atoms reporting their indices.
+        The grid is built on first use and afterwards only updated for the atoms changed since it was last used.
+        Positions modified in place through atoms or the array returned by `positions` are not detected.
+        """
+        return self._updated_grid(None)
+
+    @property
+    def version(self) -> int:
+        """Returns the number of changes recorded for the atoms (see `changes`)."""
+        return self._changes.version
+
+    @property
+    def species(self) -> np.ndarray:
+        """Returns an array of atomic species."""
+        if self._columns is None:
+            return np.array([atom.specie for atom in self._atoms()], dtype=str)
+        table = np.array(self._columns.specie_table, dtype=str)
+        if self._is_dense():
+            return table[self._columns.species]
+        return table[self._columns.species[self._rows()]]
 
     ########################
     #    Public Methods    #
     ########################
 
+    def changes(self, since: int) -> Optional[Changes]:
+        """Returns the atoms inserted, removed or moved since an earlier `version`.
+        Changes which are too old or were too large to track are reported as None so derived data should be rebuilt.
+        Positions modified in place through atoms or the array returned by `positions` are not tracked.
+        """
+        return self._changes.since(since)
+
+    def clone(self: _T) -> _T:
+        """Returns an independent copy of the topology.
+        Atoms and bonds are copied in bulk rather than traversed generically like `copy.deepcopy`.
+        """
+        res = copy.copy(self)
+        res._reset_tracking()
+        res._owners = None
+        res._exposed = False
+        res._graph, res._columns = _copy_storage(self.__graph, self._columns)
+        return res
+
+    def insert_arrays(self, positions: np.ndarray, species: Union[str, Sequence[str]]) -> np.ndarray:
+        """Inserts atoms from arrays and returns their indices.
+
+        Args:
+            positions: `(N, 3)` cartesian positions.
+            species: Specie of each atom or a single specie shared by all of them.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        names = np.broadcast_to(np.asarray(species, dtype=str), (len(positions),))
+        if self._columns is None:
+            self._unshare()
+            atoms = [Atom(specie, position) for specie, position in zip(names.tolist(), positions.copy())]
+            indices = np.array(self._graph.add_nodes_from(atoms), dtype=np.intp)
+            self._changes.record(INSERTED, indices)
+            return indices
+        rows = self._insert_rows(len(positions))
+        self._columns.positions[rows] = positions
+        self._columns.species[rows] = self._columns.encode(names)
+        return rows
+
     def insert_atoms(self, *atoms: Atom) -> List[int]:
         """Inserts one or more atoms and returns their indices."""
-        return list(self._graph.add_nodes_from(atoms))
+        self._unshare()
+        if self._columns is None:
+            indices = list(self._graph.add_nodes_from(atoms))
+        else:
+            indices = list(self._graph.add_nodes_from([None] * len(atoms)))
+            self._columns.write(np.array(indices, dtype=np.intp), atoms)
+        self._changes.record(INSERTED, indices)
+        return indices
 
     def remove_atoms(self, *indices: int) -> List[Atom]:
         """Removes and returns one or more atoms."""
-        res = [self._graph.get_node_data(index) for index in indices]
+        self._unshare()
+        if self._columns is None:
+            res = [self._graph.get_node_data(index) for index in indices]
+        else:
+            self._check_indices(indices)
+            res = [self._columns.detach(index) for index in indices]
         self._graph.remove_nodes_from(indices)
+        if self._columns is not None:
+            self._columns.clear_rows(np.array(indices, dtype=np.intp))
+        self._changes.record(REMOVED, indices)
+        return res
+
+    def move_atoms(self, selection: np.ndarray, positions: np.ndarray) -> None:
+        """Assigns new positions to atoms.
+
+        Args:
+            selection: Array of atom indices or a boolean mask over the atoms in the order of `atoms`.
+            positions: `(N, 3)` cartesian positions of the selected atoms.
+        """
+        indices = self._select(selection)
+        positions = np.broadcast_to(np.asarray(positions, dtype=np.float64), (len(indices), 3))
+        self._unshare()
+        if self._columns is None:
+            for index, position in zip(indices.tolist(), positions):
+                self._graph[index].position = position.copy()
+        else:
+            self._columns.positions[indices] = positions
+        self._changes.record(MOVED, indices)
+
+    def remove_arrays(self, selection: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Removes atoms and returns their positions and species as arrays.
+
+        Args:
+            selection: Array of atom indices or a boolean mask over the atoms in the order of `atoms`.
+        """
+        indices = self._select(selection)
+        res = self._gather(indices)
+        self._discard_atoms(indices)
         return res
 
+    def select_arrays(self, selection: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns copies of the positions and species of atoms as arrays without creating atom objects.
+
+        Args:
+            selection: Array of atom indices or a boolean mask over the atoms in the order of `atoms`.
+        """
+        return self._gather(self._select(selection))
+
     def select_atoms(self, *indices: int) -> List[Atom]:
         """Returns a reference to one or more atoms."""
-        return [self._graph.get_node_data(index) for index in indices]
+        if self._columns is None:
+            self._claim()
+            return [self._graph.get_node_data(index) for index in indices]
+        self._check_indices(indices)
+        return [AtomView(self._columns, index, self) for index in indices]
 
     # TODO: update these upon new retworkx release.
 
     def insert_bond(self, bond: Bond) -> None:
         """Inserts a bond."""
+        self._unshare()
         self._graph.add_edge(*bond.indices, edge=bond)
 
     def remove_bond(self, indices: Tuple[int, int]) -> Bond:
         """Removes and returns bonds."""
+        self._unshare()
         res = self._graph.get_edge_data(*indices)
         self._graph.remove_edge(*indices)
         return res
 
     def select_bond(self, indices: Tuple[int, int]) -> Bond:
         """Returns a mutable reference to a bond."""
+        self._claim()
         return self._graph.get_edge_data(*indices)
 
+    def neighbor_list(self, cutoff: float) -> NeighborList:
+        """Returns the neighbors of every atom within `cutoff`."""
+        return NeighborList.from_positions(self._positions(), cutoff)
+
+    def perceive_bonds(self, tolerance: float = 0.45, radii: Optional[Dict[str, float]] = None) -> int:
+        """Inserts a bond between every pair of atoms closer than the sum of their covalent radii
+        plus `tolerance` and returns the number of bonds inserted.
+        Pairs which are already bonded are skipped.
+
+        Args:
+            tolerance: Distance added to the sum of covalent radii.
+            radii: Covalent radius of each specie. Defaults to `constants.COVALENT_RADII`.
+        """
+        if radii is None:
+            radii = COVALENT_RADII
+        species, inverse = np.unique(self.species, return_inverse=True)
+        if len(species) == 0:
+            return 0
+        try:
+            specie_radii = np.array([radii[specie] for specie in species], dtype=float)
+        except KeyError as err:
+            raise ValueError(f"no covalent radius is defined for specie `{err.args[0]}`")
+        atom_radii = specie_radii[inverse]
+
+        # search out to the largest possible bond length then filter each pair by its own
+        neighbor_list = self.neighbor_list(2 * specie_radii.max() + tolerance)
+        pairs = neighbor_list.pairs()
+        i, j = pairs[:, 0], pairs[:, 1]
+        keep = (i < j) & (neighbor_list.distances < atom_radii[i] + atom_radii[j] + tolerance)
+        pairs = np.unique(pairs[keep], axis=0)
+
+        # convert positions in the atom list to graph indices and bulk insert
+        self._unshare()
+        rows = self._rows()
+        existing = {(min(a, b), max(a, b)) for a, b in self._graph.edge_list()}
+        edges = [(a, b) for a, b in rows[pairs].tolist() if (a, b) not in existing]
+        self._graph.add_edges_from([(a, b, Bond((a, b))) for a, b in edges])
+        return len(edges)
+
+    def to_bytes(self) -> bytes:
+        """Returns the compact binary representation.
+        Bond indices are renumbered to match the order of `atoms`.
+        """
+        return self._to_binary({"type": type(self).__name__})
+
+    def to_file(self, path: str) -> None:
+        """Writes the compact binary representation to a file."""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation.
+        Bond indices are renumbered to match the order of `atoms`.
+        """
+        rows = self._rows()
+        if self._columns is None:
+            atoms = [atom.to_dict() for atom in self._atoms()]
+        else:
+            atoms = self._columns.to_dicts(rows)
+        bonds = [bond.to_dict() for bond in self._bonds()]
+        if len(rows) > 0 and rows[-1] != len(rows) - 1:
+            # close the gaps left by removed atoms
+            for bond in bonds:
+                bond["indices"] = tuple(np.searchsorted(rows, bond["indices"]).tolist())
+        return {
+            "type": type(self).__name__,
+            "atoms": atoms,
+            "bonds": bonds,
+        }
+
     def to_json(self) -> str:
         """Returns the JSON serialized representation."""
-        return orjson.dumps(
-            {
-                "type": type(self).__name__,
-                "atoms": [orjson.loads(atom.to_json()) for atom in self.atoms],
-                "bonds": [orjson.loads(bond.to_json()) for bond in self.bonds],
-            },
-            option=orjson.OPT_SERIALIZE_NUMPY)
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_SERIALIZE_NUMPY)
+
+    #########################
+    #    Private Methods    #
+    #########################
+
+    @property
+    def _graph(self) -> PyGraph:
+        if self.__graph is None:
+            # only columnar storage creates its graph on first use
+            assert self._columns is not None
+            # create one payload-free node for every stored row
+            self.__graph = PyGraph()
+            self.__graph.add_nodes_from([None] * self._columns.size)
+        return self.__graph
+
+    @_graph.setter
+    def _graph(self, value: Optional[PyGraph]) -> None:
+        self.__graph = value
+
+    def _atoms(self) -> Sequence[Atom]:
+        """Returns the atoms without claiming private storage. The atoms must not be mutated."""
+        if self._columns is None:
+            return self._graph.nodes()
+        return AtomSequence(self._columns, None if self._is_dense() else self._rows())
+
+    def _bonds(self) -> List[Bond]:
+        """Returns the bonds without claiming private storage. The bonds must not be mutated."""
+        if self.__graph is None:
+            return []
+        return self._graph.edges()
+
+    def _positions(self) -> np.ndarray:
+        """Returns the positions without claiming private storage. The array must not be mutated."""
+        if self._columns is None:
+            return np.array([atom.position for atom in self._atoms()], dtype=float).reshape(-1, 3)
+        if self._is_dense():
+            return self._columns.positions
+        return self._columns.positions[self._rows()]
+
+    def _share(self, other: 'Topology') -> None:
+        """Makes `other` share this topology's storage until either of them claims a private copy."""
+        if self._exposed:
+            # references handed out earlier keep the old storage while both topologies share a copy
+            self.__graph, self._columns = _copy_storage(self.__graph, self._columns)
+            self._exposed = False
+        if self._owners is None:
+            self._owners = [1]
+        self._owners[0] += 1
+        other._graph = self.__graph
+        other._columns = self._columns
+        other._owners = self._owners
+        other._exposed = False
+
+    def _unshare(self) -> None:
+        """Gives this topology a private copy of storage shared with other topologies."""
+        owners = self._owners
+        if owners is None:
+            return
+        self._owners = None
+        owners[0] -= 1
+        if owners[0] == 0:
+            # every other topology has already made its own copy
+            return
+        self.__graph, self._columns = _copy_storage(self.__graph, self._columns)
+
+    def _reset_storage(self, columns: Optional[AtomColumns] = None) -> None:
+        """Drops every atom and bond, releasing shared storage without copying it.
+        The topology is left empty or holding the atoms of `columns`.
+        """
+        owners = self._owners
+        if owners is not None:
+            owners[0] -= 1
+            self._owners = None
+        self._exposed = False
+        self._graph = PyGraph() if columns is None else None
+        self._columns = columns
+        self._changes.reset()
+
+    def _claim(self) -> None:
+        """Gives the topology a private copy of shared storage before mutable references to it are handed out."""
+        self._unshare()
+        self._exposed = True
+
+    def _claim_atoms(self) -> Sequence[Atom]:
+        self._claim()
+        return self._atoms()
+
+    def _claim_bonds(self) -> List[Bond]:
+        self._claim()
+        return self._bonds()
+
+    def _shared_atoms(self) -> List[Atom]:
+        return [_SharedAtom(self, index) for index in self._graph.node_indexes()]
+
+    def _shared_bonds(self) -> List[Bond]:
+        return [_SharedBond(self, indices) for indices in self._graph.edge_list()]
+
+    def _expose(self, array: np.ndarray) -> np.ndarray:
+        """Returns a view of storage which is read-only while the storage is shared.
+        Otherwise the writable view is handed out and the storage is copied before it is next shared.
+        """
+        if self._owners is None:
+            self._exposed = True
+            return array
+        res = array.view()
+        res.flags.writeable = False
+        return res
+
+    def _reset_tracking(self) -> None:
+        """Gives a shallow copy its own change log and drops data derived from the original's atoms."""
+        self._changes = ChangeLog()
+        self._spatial_grid = None
+
+    def _updated_grid(self, lattice_vectors: Optional[np.ndarray]) -> SpatialGrid:
+        """Returns the spatial grid after applying the changes since it was last used.
+        The grid is rebuilt if the changes are unknown, large or the lattice vectors differ.
+        """
+        version = self._changes.version
+        if self._spatial_grid is not None:
+            grid_version, grid = self._spatial_grid
+            if grid.lattice_vectors is None or lattice_vectors is None:
+                same_lattice = grid.lattice_vectors is lattice_vectors
+            else:
+                same_lattice = np.array_equal(grid.lattice_vectors, lattice_vectors)
+            changes = self._changes.since(grid_version) if same_lattice else None
+            if changes is not None and len(changes) <= len(grid) // 4:
+                if len(changes) > 0:
+                    grid.remove(np.concatenate((changes.removed, changes.moved)))
+                    indices = np.concatenate((changes.inserted, changes.moved))
+                    grid.insert(self._gather(indices)[0], indices)
+                self._spatial_grid = (version, grid)
+                return grid
+        grid = SpatialGrid(self._positions(), lattice_vectors, self._rows())
+        self._spatial_grid = (version, grid)
+        return grid
+
+    def _topology_dict(self) -> Dict[str, Any]:
+        """Returns the dict representation of only the atoms and bonds for embedding in a subclass."""
+        res = Topology.to_dict(self)
+        res["type"] = Topology.__name__
+        return res
+
+    def _is_dense(self) -> bool:
+        """Returns True if columnar storage has no vacant rows."""
+        return self._columns is not None and (self.__graph is None or len(self.__graph) == self._columns.size)
+
+    def _rows(self) -> np.ndarray:
+        """Returns the storage row of every atom in index order."""
+        columns = self._columns
+        if columns is not None and self._is_dense():
+            return np.arange(columns.size)
+        return np.array(self._graph.node_indexes(), dtype=np.intp)
+
+    def _to_binary(self, header: Dict[str, Any]) -> bytes:
+        """Returns the binary representation of the atoms and bonds with additional header entries."""
+        rows = self._rows()
+        atom_properties: Dict[str, Any] = {"indices": [], "values": []}
+        if self._columns is None:
+            atoms = self._atoms()
+            codes: Dict[str, int] = {}
+            positions = self._positions()
+            species = np.array([codes.setdefault(atom.specie, len(codes)) for atom in atoms], dtype=np.int32)
+            specie_table = list(codes)
+            for i, atom in enumerate(atoms):
+                if len(atom) > 2:
+                    atom_properties["indices"].append(i)
+                    atom_properties["values"].append({k: v for k, v in atom.items() if k not in ("specie", "position")})
+        else:
+            columns = self._columns
+            positions = self._positions()
+            species = columns.species if self._is_dense() else columns.species[rows]
+            specie_table = columns.specie_table
+            extras: Dict[int, Dict[str, Any]] = {}
+            for name in columns.properties:
+                for i in np.flatnonzero(np.isin(rows, columns.property_rows(name))).tolist():
+                    extras.setdefault(i, {})[name] = columns.get_property(name, int(rows[i]))
+            atom_properties["indices"] = sorted(extras)
+            atom_properties["values"] = [extras[i] for i in atom_properties["indices"]]
+
+        # renumber bonds by position in the atom list
+        bonds = self._bonds()
+        endpoints = np.zeros((0, 2), dtype=np.int64)
+        if len(bonds) > 0:
+            endpoints = np.array(self._graph.edge_list(), dtype=np.int64).reshape(-1, 2)
+        bond_properties: Dict[str, Any] = {"indices": [], "values": []}
+        for i, bond in enumerate(bonds):
+            if bond is not None and len(bond) > 1:
+                bond_properties["indices"].append(i)
+                bond_properties["values"].append({k: v for k, v in bond.items() if k != "indices"})
+
+        header = dict(
+            header,
+            specie_table=specie_table,
+            atom_properties=atom_properties,
+            bond_properties=bond_properties,
+        )
+        return binary.encode(header, positions, species, np.searchsorted(rows, endpoints))
+
+    def _check_indices(self, indices) -> None:
+        graph = self.__graph
+        for index in indices:
+            if graph is None:
+                # without a graph every allocated row holds an atom
+                valid = self._columns is not None and 0 <= index < self._columns.size
+            else:
+                valid = graph.has_node(index)
+            if not valid:
+                raise IndexError(f"no atom exists at index {index}")
+
+    def _select(self, selection: np.ndarray) -> np.ndarray:
+        """Returns the indices of the atoms described by an index array or a boolean mask."""
+        selection = np.asarray(selection)
+        rows = self._rows()
+        if selection.dtype == bool:
+            if selection.shape != rows.shape:
+                raise IndexError(f"boolean mask must have shape `{rows.shape}`")
+            return rows[selection]
+        indices = selection.astype(np.intp, copy=False).reshape(-1)
+        # atom indices are sorted so membership is a binary search
+        found = np.searchsorted(rows, indices)
+        invalid = found == len(rows)
+        invalid[~invalid] = rows[found[~invalid]] != indices[~invalid]
+        if np.any(invalid):
+            raise IndexError(f"no atom exists at index {indices[invalid][0]}")
+        return indices
+
+    def _gather(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns copies of the positions and species of atoms."""
+        if self._columns is None:
+            atoms = [self._graph[index] for index in indices.tolist()]
+            positions = np.array([atom.position for atom in atoms], dtype=np.float64).reshape(-1, 3)
+            return positions, np.array([atom.specie for atom in atoms], dtype=str)
+        table = np.array(self._columns.specie_table, dtype=str)
+        return self._columns.positions[indices], table[self._columns.species[indices]]
+
+    def _discard_atoms(self, indices: np.ndarray) -> None:
+        """Removes atoms with a single graph operation without returning them."""
+        self._unshare()
+        self._graph.remove_nodes_from(indices.tolist())
+        if self._columns is not None:
+            self._columns.clear_rows(indices)
+        self._changes.record(REMOVED, indices)
+
+    def _insert_rows(self, n: int) -> np.ndarray:
+        """Inserts `n` empty atoms into columnar storage and returns their rows."""
+        self._unshare()
+        assert self._columns is not None
+        rows = np.array(self._graph.add_nodes_from([None] * n), dtype=np.intp)
+        if n > 0:
+            self._columns.allocate(rows)
+        self._changes.record(INSERTED, rows)
+        return rows
+
+
+def _from_binary(
+    header: Dict[str, Any],
+    positions: np.ndarray,
+    species: np.ndarray,
+    bonds: np.ndarray,
+    columnar: bool,
+) -> Tuple[Optional[PyGraph], Optional[AtomColumns]]:
+    """Returns the graph and optional columns described by a decoded binary representation."""
+    graph = PyGraph()
+    columns: Optional[AtomColumns] = None
+    specie_table = header["specie_table"]
+    atom_properties = header["atom_properties"]
+    bond_properties = header["bond_properties"]
+
+    # process atoms
+    if columnar:
+        if not positions.flags.writeable:
+            positions = positions.copy()
+        if not species.flags.writeable:
+            species = species.copy()
+        columns = AtomColumns.from_arrays(positions, species.astype(np.int32, copy=False), specie_table)
+        for index, values in zip(atom_properties["indices"], atom_properties["values"]):
+            for name, value in values.items():
+                columns.set_property(name, [index], [value])
+        if len(bonds) == 0:
+            # the graph is only created once it is needed
+            return None, columns
+        graph.add_nodes_from([None] * len(positions))
+    else:
+        positions = np.array(positions, dtype=np.float64)
+        extras = dict(zip(atom_properties["indices"], atom_properties["values"]))
+        names = [specie_table[code] for code in species.tolist()]
+        graph.add_nodes_from([
+            Atom(specie, position, **extras.get(i, {})) for i, (specie, position) in enumerate(zip(names, positions))
+        ])
+
+    # process bonds
+    extras = dict(zip(bond_properties["indices"], bond_properties["values"]))
+    graph.add_edges_from([(a, b, Bond((a, b), **extras.get(i, {}))) for i, (a, b) in enumerate(bonds.tolist())])
+    return graph, columns
+
+
+def _copy_storage(graph: Optional[PyGraph],
+                  columns: Optional[AtomColumns]) -> Tuple[Optional[PyGraph], Optional[AtomColumns]]:
+    """Returns independent copies of a graph and its optional columns.
+    Node indices (including vacancies) are preserved.
+    """
+    if columns is not None:
+        columns = columns.copy()
+    if graph is None:
+        return graph, columns
+    atoms = [None] * len(graph) if columns is not None else [atom.copy() for atom in graph.nodes()]
+    bonds = [None if bond is None else bond.copy() for bond in graph.edges()]
+    indices = graph.node_indexes()
+    if len(indices) == 0 or indices[-1] == len(indices) - 1:
+        # without vacancies the graph is rebuilt with bulk inserts
+        res = PyGraph()
+        res.add_nodes_from(atoms)
+        res.add_edges_from([(a, b, bond) for (a, b), bond in zip(graph.edge_list(), bonds)])
+        return res, columns
+    res = graph.copy()
+    if columns is None:
+        for index, atom in zip(indices, atoms):
+            res[index] = atom
+    for index, bond in zip(res.edge_indices(), bonds):
+        res.update_edge_by_index(index, bond)
+    return res, columns
+
+
+class _LazySequence(_Sequence):
+    """Sequence of atoms or bonds which are only fetched from their topology once an element is accessed,
+    so taking the length does not copy shared storage.
+    """
+
+    def __init__(self, length: int, fetch: Callable[[], Sequence[Any]]) -> None:
+        self._length = length
+        self._fetch = fetch
+        self._items: Optional[Sequence[Any]] = None
+
+    def __getitem__(self, index):
+        return self._fetched()[index]
+
+    def __iter__(self):
+        return iter(self._fetched())
+
+    def __len__(self):
+        return self._length
+
+    def _fetched(self) -> Sequence[Any]:
+        if self._items is None:
+            self._items = self._fetch()
+        return self._items
+
+
+class _SharedAtom(Atom):
+    """Atom of a topology with shared graph storage.
+    Reads the atom currently stored at its index and gives the topology a private copy of shared storage before writing.
+    Its `position` is read-only while the storage is shared.
+    """
+
+    __slots__ = ("_owner", "_index")
+
+    def __init__(self, owner: Topology, index: int) -> None:
+        self._owner = owner
+        self._index = index
+
+    def __getitem__(self, key):
+        if key == "position":
+            return self.position
+        return self._stored()[key]
+
+    def __setitem__(self, key, value):
+        self._writable()[key] = value
+
+    def __delitem__(self, key):
+        del self._writable()[key]
+
+    def __iter__(self):
+        return iter(self._stored())
+
+    def __len__(self):
+        return len(self._stored())
+
+    @property
+    def specie(self) -> str:
+        return self._stored().specie
+
+    @specie.setter
+    def specie(self, value: str) -> None:
+        self._writable().specie = value
+
+    @property
+    def position(self) -> np.ndarray:
+        return self._owner._expose(self._stored().position)
+
+    @position.setter
+    def position(self, value: np.ndarray) -> None:
+        self._writable().position = value
+
+    def copy(self) -> Atom:
+        return self._stored().copy()
+
+    def to_dict(self) -> Dict[str, Any]:
+        res = self._stored().to_dict()
+        res["position"] = res["position"].copy()
+        return res
+
+    def _stored(self) -> Atom:
+        return self._owner._graph.get_node_data(self._index)
+
+    def _writable(self) -> Atom:
+        self._owner._unshare()
+        return self._stored()
+
+
+class _SharedBond(Bond):
+    """Bond of a topology with shared graph storage.
+    Reads the bond currently stored between its atoms and gives the topology a private copy of shared storage
+    before writing.
+    """
+
+    __slots__ = ("_owner", "_endpoints")
+
+    def __init__(self, owner: Topology, endpoints: Tuple[int, int]) -> None:
+        self._owner = owner
+        self._endpoints = endpoints
+
+    def __getitem__(self, key):
+        return self._stored()[key]
+
+    def __setitem__(self, key, value):
+        self._writable()[key] = value
+
+    def __delitem__(self, key):
+        del self._writable()[key]
+
+    def __iter__(self):
+        return iter(self._stored())
+
+    def __len__(self):
+        return len(self._stored())
+
+    @property
+    def indices(self) -> Tuple[int, int]:
+        return self._stored().indices
+
+    def copy(self) -> Bond:
+        return self._stored().copy()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._stored().to_dict()
+
+    def _stored(self) -> Bond:
+        return self._owner._graph.get_edge_data(*self._endpoints)
+
+    def _writable(self) -> Bond:
+        self._owner._unshare()
+        return self._stored()
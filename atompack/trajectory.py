@@ -0,0 +1,255 @@
+"""A streaming container for sequences of frames which share a single topology.
+
+The static structure is written once and each frame only stores what changes between snapshots:
+
+| Field     | Type                     | Description                                       |
+|-----------|--------------------------|---------------------------------------------------|
+| magic     | 8 bytes                  | `b"ATOMTRAJ"`                                     |
+| version   | little-endian uint32     | Format version.                                   |
+| reserved  | 4 bytes                  | Zero padding.                                     |
+| length    | little-endian uint64     | Length of the JSON header in bytes.               |
+| header    | UTF-8 JSON               | Structure type, atom count and block sizes.       |
+| structure | binary container         | Static structure written by `to_bytes`.           |
+| frames    | little-endian float64    | `(n_atoms, 3)` positions followed by the `(3, 3)` |
+|           |                          | lattice vectors of periodic structures per frame. |
+
+Every frame has the same size so the offset of any frame is computed from its index
+and a trajectory can be read while it is still being written.
+"""
+
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from atompack.crystal.crystal import Crystal, UnitCell
+from atompack.topology import Topology
+
+MAGIC = b"ATOMTRAJ"
+"""Leading bytes of every trajectory."""
+
+VERSION = 1
+"""Current trajectory format version."""
+
+_PREAMBLE = struct.Struct("<8sI4xQ")
+
+_FRAME_DTYPE = np.dtype("<f8")
+
+# structure types which can be rebuilt from their binary representation
+_TYPES = {cls.__name__: cls for cls in (Topology, UnitCell, Crystal)}
+
+
+def _padding(length: int) -> int:
+    return -length % 8
+
+
+class TrajectoryWriter(object):
+    """Appends frames of a structure to a trajectory file.
+
+    Args:
+        path: Path to the file. Any existing file is overwritten.
+        structure: Structure whose atoms, bonds and metadata are shared by every frame.
+            Frames of a `Crystal` also store its lattice vectors.
+
+    Example:
+        >>> from atompack.atom import Atom
+        >>> from atompack.topology import Topology
+        >>> from atompack.trajectory import TrajectoryReader, TrajectoryWriter
+        >>> import numpy as np
+        >>> import os, tempfile
+        >>>
+        >>> topology = Topology()
+        >>> _ = topology.insert_atoms(Atom("H", np.zeros(3)), Atom("H", np.ones(3)))
+        >>> path = os.path.join(tempfile.mkdtemp(), "traj.bin")
+        >>> with TrajectoryWriter(path, topology) as writer:
+        ...     for step in range(3):
+        ...         topology.positions = topology.positions + 0.1
+        ...         writer.write(topology)
+        >>>
+        >>> with TrajectoryReader(path) as reader:
+        ...     assert len(reader) == 3
+        ...     assert np.allclose(reader[-1].positions[0], [0.3, 0.3, 0.3])
+    """
+
+    def __init__(self, path: str, structure: Topology) -> None:
+        if type(structure).__name__ not in _TYPES:
+            raise TypeError(f"cannot write trajectories of type `{type(structure).__name__}`")
+        static = structure.to_bytes()
+        self._n_atoms = len(structure._atoms())
+        self._periodic = isinstance(structure, Crystal)
+        if self._n_atoms == 0 and not self._periodic:
+            raise ValueError("cannot write trajectories of a structure without atoms")
+        header = orjson.dumps({
+            "type": type(structure).__name__,
+            "n_atoms": self._n_atoms,
+            "periodic": self._periodic,
+            "structure_length": len(static),
+        })
+        header += b" " * _padding(_PREAMBLE.size + len(header))
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        self._file.write(header)
+        self._file.write(static)
+        self._file.write(b"\0" * _padding(len(static)))
+        self._n_frames = 0
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def n_frames(self) -> int:
+        """Returns the number of frames written so far."""
+        return self._n_frames
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def append(self, positions: np.ndarray, lattice_vectors: Optional[np.ndarray] = None) -> None:
+        """Appends a frame from its arrays.
+
+        Args:
+            positions: `(N, 3)` cartesian positions in the order of `atoms`.
+            lattice_vectors: Row-major matrix of lattice vectors. Required for periodic structures.
+        """
+        positions = np.ascontiguousarray(positions, dtype=_FRAME_DTYPE)
+        if positions.shape != (self._n_atoms, 3):
+            raise ValueError(f"`positions` must have shape `({self._n_atoms}, 3)`")
+        self._file.write(positions.tobytes())
+        if self._periodic:
+            if lattice_vectors is None:
+                raise ValueError("`lattice_vectors` is required for periodic structures")
+            lattice_vectors = np.ascontiguousarray(lattice_vectors, dtype=_FRAME_DTYPE)
+            if lattice_vectors.shape != (3, 3):
+                raise ValueError("`lattice_vectors` must have shape `(3, 3)`")
+            self._file.write(lattice_vectors.tobytes())
+        self._n_frames += 1
+
+    def write(self, structure: Topology) -> None:
+        """Appends the positions (and lattice vectors) of a structure as a new frame."""
+        # read through the private accessors so a shared structure is not copied for every frame
+        lattice_vectors = structure.lattice_vectors.vectors if isinstance(structure, Crystal) else None
+        self.append(structure._positions(), lattice_vectors)
+
+    def flush(self) -> None:
+        """Flushes written frames to disk so they are visible to readers."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Closes the file."""
+        self._file.close()
+
+    #########################
+    #    Special Methods    #
+    #########################
+
+    def __enter__(self) -> 'TrajectoryWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class TrajectoryReader(object):
+    """Reads frames from a trajectory file.
+
+    Frames are accessed by index or iterated lazily and frames appended
+    by a concurrent writer become visible once they are flushed.
+
+    Args:
+        path: Path to the file.
+        columnar: Determines whether atoms of the returned structures are stored in columns.
+    """
+
+    def __init__(self, path: str, columnar: bool = False) -> None:
+        self._file: BinaryIO = open(path, "rb")
+        self._columnar = columnar
+        preamble = self._file.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError("file is too small to be a trajectory")
+        magic, version, length = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError("file is not a trajectory")
+        if version > VERSION:
+            raise ValueError(f"unsupported trajectory format version `{version}`")
+        header: Dict[str, Any] = orjson.loads(self._file.read(length))
+        self._type = _TYPES[header["type"]]
+        self._n_atoms = header["n_atoms"]
+        self._periodic = header["periodic"]
+        self._structure = self._file.read(header["structure_length"])
+        self._start = _PREAMBLE.size + length + len(self._structure) + _padding(len(self._structure))
+        self._frame_size = (self._n_atoms * 3 + (9 if self._periodic else 0)) * _FRAME_DTYPE.itemsize
+
+    ####################
+    #    Properties    #
+    ####################
+
+    @property
+    def structure(self) -> Topology:
+        """Returns a new copy of the static structure as it was when the trajectory was created."""
+        return self._type.from_bytes(self._structure, columnar=self._columnar)
+
+    ########################
+    #    Public Methods    #
+    ########################
+
+    def frame(self, index: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Returns the positions and lattice vectors of a frame without building a structure.
+        The lattice vectors are None for non-periodic structures.
+        """
+        index = self._check_index(index)
+        self._file.seek(self._start + index * self._frame_size)
+        data = np.fromfile(self._file, dtype=_FRAME_DTYPE, count=self._frame_size // _FRAME_DTYPE.itemsize)
+        positions = data[:self._n_atoms * 3].reshape(-1, 3)
+        lattice_vectors = data[self._n_atoms * 3:].reshape(3, 3) if self._periodic else None
+        return positions, lattice_vectors
+
+    def frames(self) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Yields the positions and lattice vectors of every frame in order."""
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def close(self) -> None:
+        """Closes the file."""
+        self._file.close()
+
+    #########################
+    #    Special Methods    #
+    #########################
+
+    def __enter__(self) -> 'TrajectoryReader':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __getitem__(self, index: int) -> Topology:
+        positions, lattice_vectors = self.frame(index)
+        res = self.structure
+        res.positions = positions
+        if isinstance(res, Crystal) and lattice_vectors is not None:
+            res.lattice_vectors.vectors = lattice_vectors
+        return res
+
+    def __iter__(self) -> Iterator[Topology]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __len__(self) -> int:
+        # a partially written trailing frame is ignored
+        return max(os.fstat(self._file.fileno()).st_size - self._start, 0) // self._frame_size
+
+    #########################
+    #    Private Methods    #
+    #########################
+
+    def _check_index(self, index: int) -> int:
+        n_frames = len(self)
+        if index < 0:
+            index += n_frames
+        if not 0 <= index < n_frames:
+            raise IndexError("frame index out of range")
+        return index
@@ -1,8 +1,8 @@
-import copy
-
 import numpy as np
+import pytest
 
-from atompack.crystal import (Basis, Crystal, LatticeParameters, Transform, UnitCell)
+from atompack.crystal import (Basis, Crystal, LatticeParameters, MillerIndex, Plane, Transform, UnitCell)
+from atompack.crystal.batch import build_crystals, build_unit_cells
 from atompack.symmetry import Spacegroup
 
 ###############
@@ -10,6 +10,11 @@ from atompack.symmetry import Spacegroup
 ###############
 
 
+# supercell sizes of the cubic unit cell giving roughly 10^3, 10^4, 10^5 and 10^6 atoms
+SCALING_SIZES = [6, 13, 29, 63]
+SCALING_IDS = ["1e3", "1e4", "1e5", "1e6"]
+
+
 def get_cubic_unit_cell():
     basis = Basis.primitive("X")
     lattparams = LatticeParameters.cubic(10)
@@ -22,9 +27,9 @@ def get_cubic_unit_cell():
 ###################################
 
 
-def bench_crystal_supercell(crystal, transform):
-    # copy here to prevent exponential growth
-    return transform.apply(copy.deepcopy(crystal))
+def bench_crystal_supercell(unit_cell, transform):
+    # each crystal shares the unit cell's atoms until the transform copies them
+    return transform.apply(Crystal(unit_cell))
 
 
 def bench_crystal_from_json(json_data):
@@ -35,8 +40,85 @@ def bench_crystal_to_json(crystal):
     return crystal.to_json()
 
 
-def bench_crystal_deepcopy(crystal):
-    return copy.deepcopy(crystal)
+def bench_crystal_from_bytes(binary_data):
+    return Crystal.from_bytes(binary_data, columnar=True)
+
+
+def bench_crystal_to_bytes(crystal):
+    return crystal.to_bytes()
+
+
+def bench_crystal_clone(crystal):
+    return crystal.clone()
+
+
+def bench_crystal_neighbor_list(crystal, cutoff):
+    return crystal.neighbor_list(cutoff)
+
+
+def bench_build_unit_cells(specs, processes):
+    return list(build_unit_cells(specs, processes=processes, chunksize=64, binary=True))
+
+
+def bench_build_crystals(specs, transform, processes):
+    # crystals are decoded in the calling process, which must keep up with the workers
+    return list(build_crystals(specs, transform, processes=processes, chunksize=16, columnar=True))
+
+
+def bench_transform_cut(transform, crystal):
+    return transform.apply(crystal)
+
+
+def bench_transform_orient_supercell(transform, unit_cell):
+    return transform.apply(Crystal(unit_cell))
+
+
+def bench_transform_project(transform, unit_cell):
+    return transform.apply(Crystal(unit_cell))
+
+
+def bench_transform_apply(transforms, unit_cell):
+    crystal = Crystal(unit_cell)
+    for transform in transforms:
+        crystal = transform.apply(crystal)
+    return crystal
+
+
+def bench_select_region(crystal, mask, arrays):
+    if arrays:
+        return crystal.select_arrays(mask)
+    return crystal.select_atoms(*np.flatnonzero(mask).tolist())
+
+
+def bench_spatial_grid(crystal):
+    # drop the cached grid so every round builds it
+    crystal._spatial_grid = None
+    return crystal.spatial_grid
+
+
+def bench_insert_remove_loop(crystal, positions, incremental):
+    # each step inserts a trial atom, counts its neighbors and removes it again
+    res = 0
+    for position in positions:
+        index = crystal.insert_arrays(position, "Y")
+        res += len(crystal.spatial_grid.sphere(position, 5.0))
+        crystal.remove_arrays(index)
+        if not incremental:
+            crystal._spatial_grid = None
+    return res
+
+
+def bench_sphere_query(crystal, center, radius, grid):
+    if grid:
+        return crystal.spatial_grid.sphere(center, radius)
+    # scan every atom
+    vectors = crystal.positions - center
+    return np.flatnonzero(np.einsum("ij,ij->i", vectors, vectors) <= radius * radius)
+
+
+def bench_lattice_vectors_wrap(lattice_vectors, positions):
+    # copy here so every round wraps the same points
+    return lattice_vectors.wrap(positions.copy())
 
 
 ############################
@@ -46,17 +128,28 @@ def bench_crystal_deepcopy(crystal):
 
 def test_crystal_supercell(benchmark):
     unit_cell = get_cubic_unit_cell()
-    crystal = Crystal(unit_cell)
     transform = Transform().supercell((5, 5, 5))
     res = benchmark.pedantic(
         bench_crystal_supercell,
-        (crystal, transform),
+        (unit_cell, transform),
         rounds=10,
         iterations=100,
     )
     assert len(res.atoms) == 500
 
 
+def test_crystal_supercell_large(benchmark):
+    unit_cell = get_cubic_unit_cell()
+    transform = Transform().supercell((50, 50, 50))
+    res = benchmark.pedantic(
+        bench_crystal_supercell,
+        (unit_cell, transform),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res.atoms) == 500000
+
+
 def test_crystal_to_json(benchmark):
     unit_cell = get_cubic_unit_cell()
     crystal = Crystal(unit_cell)
@@ -83,13 +176,268 @@ def test_crystal_from_json(benchmark):
     assert len(crystal.atoms) == len(res.atoms)
 
 
-def test_crystal_deepcopy(benchmark):
+@pytest.mark.parametrize("size", SCALING_SIZES, ids=SCALING_IDS)
+def test_crystal_to_json_scaling(benchmark, size):
+    unit_cell = get_cubic_unit_cell()
+    crystal = Transform().supercell((size, size, size)).apply(Crystal(unit_cell))
+    res = benchmark.pedantic(
+        bench_crystal_to_json,
+        (crystal,),
+        rounds=3,
+        iterations=1,
+    )
+    assert res.startswith(b'{"type":"Crystal"')
+
+
+@pytest.mark.parametrize("size", SCALING_SIZES, ids=SCALING_IDS)
+def test_crystal_from_json_scaling(benchmark, size):
+    unit_cell = get_cubic_unit_cell()
+    crystal = Transform().supercell((size, size, size)).apply(Crystal(unit_cell))
+    json_data = crystal.to_json()
+    res = benchmark.pedantic(
+        bench_crystal_from_json,
+        (json_data,),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res.atoms) == 4 * size**3
+
+
+def test_crystal_to_bytes(benchmark):
+    unit_cell = get_cubic_unit_cell()
+    crystal = Transform().supercell((50, 50, 50)).apply(Crystal(unit_cell))
+    res = benchmark.pedantic(
+        bench_crystal_to_bytes,
+        (crystal,),
+        rounds=3,
+        iterations=1,
+    )
+    new_crystal = Crystal.from_bytes(res, columnar=True)
+    assert len(new_crystal.positions) == len(crystal.positions)
+
+
+def test_crystal_from_bytes(benchmark):
+    unit_cell = get_cubic_unit_cell()
+    crystal = Transform().supercell((50, 50, 50)).apply(Crystal(unit_cell))
+    binary_data = crystal.to_bytes()
+    res = benchmark.pedantic(
+        bench_crystal_from_bytes,
+        (binary_data,),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res.positions) == len(crystal.positions)
+
+
+def test_crystal_clone(benchmark):
     unit_cell = get_cubic_unit_cell()
     crystal = Crystal(unit_cell)
     res = benchmark.pedantic(
-        bench_crystal_deepcopy,
+        bench_crystal_clone,
         (crystal,),
         rounds=100,
         iterations=1000,
     )
     assert len(res.atoms) == 4
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+@pytest.mark.parametrize("size", SCALING_SIZES[:2], ids=SCALING_IDS[:2])
+def test_crystal_clone_scaling(benchmark, size, columnar):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=columnar)
+    crystal = Transform().supercell((size, size, size)).apply(Crystal(unit_cell))
+    res = benchmark.pedantic(
+        bench_crystal_clone,
+        (crystal,),
+        rounds=10,
+        iterations=1,
+    )
+    assert len(res.atoms) == len(crystal.atoms)
+
+
+def test_crystal_neighbor_list(benchmark):
+    unit_cell = get_cubic_unit_cell()
+    crystal = Transform().supercell((25, 25, 25)).apply(Crystal(unit_cell))
+    res = benchmark.pedantic(
+        bench_crystal_neighbor_list,
+        (crystal, 7.5),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res.indices) == 12 * len(crystal.atoms)
+
+
+def test_lattice_vectors_wrap(benchmark):
+    unit_cell = get_cubic_unit_cell()
+    crystal = Transform().supercell((63, 63, 63)).apply(Crystal(unit_cell))
+    # shift every atom half a cell so half of them leave the volume
+    positions = crystal.positions + crystal.lattice_vectors.vectors.sum(axis=0) / 2
+    res = benchmark.pedantic(
+        bench_lattice_vectors_wrap,
+        (crystal.lattice_vectors, positions),
+        rounds=3,
+        iterations=1,
+    )
+    assert np.all(crystal.lattice_vectors.contain(res))
+
+
+# one serial run and one on every available CPU
+@pytest.mark.parametrize("processes", [1, None], ids=["serial", "parallel"])
+def test_build_unit_cells(benchmark, processes):
+    basis = Basis([("X", np.array([0.1, 0.2, 0.3]))])
+    specs = [(basis, LatticeParameters.cubic(10), Spacegroup(number)) for number in range(1, 231)] * 5
+    res = benchmark.pedantic(
+        bench_build_unit_cells,
+        (specs, processes),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res) == len(specs)
+
+
+# the time should fall as processes are added up to the number of available CPUs
+@pytest.mark.parametrize("processes", [1, 2, 4], ids=["1", "2", "4"])
+def test_build_crystals(benchmark, processes):
+    basis = Basis([("X", np.array([0.1, 0.2, 0.3]))])
+    specs = [(basis, LatticeParameters.cubic(10), Spacegroup(number)) for number in range(1, 231)] * 2
+    transform = Transform().supercell((2, 2, 2))
+    res = benchmark.pedantic(
+        bench_build_crystals,
+        (specs, transform, processes),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res) == len(specs)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+@pytest.mark.parametrize("size", SCALING_SIZES[1:3], ids=SCALING_IDS[1:3])
+def test_transform_cut(benchmark, size, columnar):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=columnar)
+    crystal = Transform().supercell((size, size, size)).apply(Crystal(unit_cell))
+    transform = Transform().cut(Plane.from_miller_index(MillerIndex((1, 1, 1))))
+    res = benchmark.pedantic(
+        bench_transform_cut,
+        # cut a fresh copy every round
+        setup=lambda: ((transform, crystal.clone()), {}),
+        rounds=3,
+        iterations=1,
+    )
+    assert 0 < len(res.atoms) < len(crystal.atoms)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_transform_orient_supercell(benchmark, columnar):
+    from atompack.crystal.orientation import Orientation
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=columnar)
+    orientation = Orientation.from_rotvec([0.0, 0.0, np.pi / 4])
+    transform = Transform().orient(orientation).supercell((29, 29, 29))
+    res = benchmark.pedantic(
+        bench_transform_orient_supercell,
+        (transform, unit_cell),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res.atoms) == 4 * 29**3
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_transform_project_orthogonal(benchmark, columnar):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=columnar)
+    # a high index plane whose smallest orthogonal cell holds 2730 unit cells
+    plane = Plane.from_miller_index(MillerIndex((7, 5, 11)))
+    transform = Transform().project(plane, orthogonalize=True)
+    res = benchmark.pedantic(
+        bench_transform_project,
+        (transform, unit_cell),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res.atoms) == 4 * 2730
+
+
+@pytest.mark.parametrize("fused", [False, True], ids=["sequential", "fused"])
+def test_transform_supercell_cut(benchmark, fused):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=True)
+    plane = Plane.from_miller_index(MillerIndex((1, 1, 1)))
+    if fused:
+        transforms = [Transform().supercell((29, 29, 29)).cut(plane)]
+    else:
+        transforms = [Transform().supercell((29, 29, 29)), Transform().cut(plane)]
+    res = benchmark.pedantic(
+        bench_transform_apply,
+        (transforms, unit_cell),
+        rounds=3,
+        iterations=1,
+    )
+    assert 0 < len(res.atoms) < 4 * 29**3
+
+
+@pytest.mark.parametrize("arrays", [False, True], ids=["atoms", "arrays"])
+def test_crystal_select_region(benchmark, arrays):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=True)
+    crystal = Transform().supercell((SCALING_SIZES[-1],) * 3).apply(Crystal(unit_cell))
+    # a slab holding 10% of the atoms
+    positions = crystal.positions
+    mask = positions[:, 2] < np.quantile(positions[:, 2], 0.1)
+    res = benchmark.pedantic(
+        bench_select_region,
+        (crystal, mask, arrays),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res[0] if arrays else res) == np.count_nonzero(mask)
+
+
+@pytest.mark.parametrize("size", SCALING_SIZES[1:], ids=SCALING_IDS[1:])
+def test_spatial_grid(benchmark, size):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=True)
+    crystal = Transform().supercell((size, size, size)).apply(Crystal(unit_cell))
+    res = benchmark.pedantic(
+        bench_spatial_grid,
+        (crystal,),
+        rounds=3,
+        iterations=1,
+    )
+    assert len(res) == len(crystal.atoms)
+
+
+@pytest.mark.parametrize("grid", [False, True], ids=["scan", "grid"])
+def test_sphere_query(benchmark, grid):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=True)
+    crystal = Transform().supercell((SCALING_SIZES[-1],) * 3).apply(Crystal(unit_cell))
+    center = crystal.lattice_vectors.vectors.sum(axis=0) / 2
+    # build the grid outside of the timed rounds
+    _ = crystal.spatial_grid
+    res = benchmark.pedantic(
+        bench_sphere_query,
+        (crystal, center, 25.0, grid),
+        rounds=10,
+        iterations=1,
+    )
+    assert 0 < len(res) < 1000
+
+
+@pytest.mark.parametrize("incremental", [False, True], ids=["rebuild", "incremental"])
+def test_insert_remove_loop(benchmark, incremental):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=True)
+    crystal = Transform().supercell((SCALING_SIZES[2],) * 3).apply(Crystal(unit_cell))
+    positions = np.random.default_rng(0).random((100, 3)) @ crystal.lattice_vectors.vectors
+    _ = crystal.spatial_grid
+    res = benchmark.pedantic(
+        bench_insert_remove_loop,
+        (crystal, positions, incremental),
+        rounds=3,
+        iterations=1,
+    )
+    assert res > len(positions)
+    assert len(crystal.atoms) == 4 * SCALING_SIZES[2]**3
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+###############
+#    Setup    #
+###############
+
+# modules which are slow to import and must not be loaded by `import atompack.crystal`
+DEFERRED_MODULES = ("scipy", "pkg_resources")
+
+# run from the repository root so the working copy is imported
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(statement):
+    """Returns the cumulative import time in microseconds of every module reported by `python -X importtime`."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                         check=True,
+                         cwd=ROOT,
+                         stderr=subprocess.PIPE,
+                         universal_newlines=True)
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+###################################
+#    Benchmark Implementations    #
+###################################
+
+
+def bench_import(statement):
+    return subprocess.run([sys.executable, "-c", statement], check=True, cwd=ROOT)
+
+
+############################
+#    Benchmark Wrappers    #
+############################
+
+
+def test_import_crystal(benchmark):
+    benchmark.pedantic(
+        bench_import,
+        ("import atompack.crystal",),
+        rounds=10,
+        iterations=1,
+    )
+    times = import_time("import atompack.crystal")
+    benchmark.extra_info["import_time_us"] = times["atompack.crystal"]
+    for name in DEFERRED_MODULES:
+        assert name not in times
+
+
+def test_import_first_spacegroup(benchmark):
+    statement = "from atompack.symmetry import Spacegroup; Spacegroup('Fm-3m').operations"
+    benchmark.pedantic(
+        bench_import,
+        (statement,),
+        rounds=10,
+        iterations=1,
+    )
+    times = import_time(statement)
+    for name in DEFERRED_MODULES:
+        assert name not in times
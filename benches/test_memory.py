@@ -0,0 +1,95 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from atompack.atom import Atom
+from atompack.bond import Bond
+from atompack.crystal import (Basis, Crystal, LatticeParameters, Transform, UnitCell)
+from atompack.symmetry import Spacegroup
+
+###############
+#    Setup    #
+###############
+
+# number of atoms measured by each benchmark
+N_ATOMS = 10**6
+
+# supercell size of the cubic unit cell giving roughly 10^6 atoms
+SUPERCELL_SIZE = 63
+
+
+def allocated(function, *args):
+    """Returns the result of a function and the number of bytes it allocated which are still held."""
+    tracemalloc.start()
+    try:
+        res = function(*args)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return res, size
+
+
+###################################
+#    Benchmark Implementations    #
+###################################
+
+
+def bench_atoms(positions, extras):
+    if extras:
+        return [Atom("X", position, charge=0.0) for position in positions]
+    return [Atom("X", position) for position in positions]
+
+
+def bench_bonds(n):
+    return [Bond((i, i + 1)) for i in range(n)]
+
+
+def bench_crystal(columnar):
+    basis = Basis.primitive("X")
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(10), Spacegroup(225), columnar=columnar)
+    return Transform().supercell((SUPERCELL_SIZE,) * 3).apply(Crystal(unit_cell))
+
+
+############################
+#    Benchmark Wrappers    #
+############################
+
+
+@pytest.mark.parametrize("extras", [False, True], ids=["slots", "extras"])
+def test_memory_atoms(benchmark, extras):
+    positions = np.zeros((N_ATOMS, 3))
+    res, size = allocated(bench_atoms, positions, extras)
+    benchmark.extra_info["bytes_per_atom"] = size / len(res)
+    del res
+    benchmark.pedantic(
+        bench_atoms,
+        (positions, extras),
+        rounds=1,
+        iterations=1,
+    )
+
+
+def test_memory_bonds(benchmark):
+    res, size = allocated(bench_bonds, N_ATOMS)
+    benchmark.extra_info["bytes_per_bond"] = size / len(res)
+    del res
+    benchmark.pedantic(
+        bench_bonds,
+        (N_ATOMS,),
+        rounds=1,
+        iterations=1,
+    )
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_memory_crystal(benchmark, columnar):
+    res, size = allocated(bench_crystal, columnar)
+    benchmark.extra_info["bytes_per_atom"] = size / len(res.atoms)
+    del res
+    benchmark.pedantic(
+        bench_crystal,
+        (columnar,),
+        rounds=1,
+        iterations=1,
+    )
@@ -12,8 +12,9 @@ setup(name="atompack",
       author_email="seatonullberg@gmail.com",
       url="https://github.com/seatonullberg/atompack",
       license="MIT License",
+      python_requires=">=3.7",
       packages=find_packages(),
-      package_data={'': ['data/*.json']},
+      package_data={'': ['data/*.json', 'data/*.npz']},
       include_package_data=True,
       extras_require={"dev": [
           "isort",
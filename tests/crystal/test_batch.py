@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from atompack.crystal.batch import build_crystals, build_unit_cells
+from atompack.crystal.components import Basis, LatticeParameters
+from atompack.crystal.crystal import Crystal, UnitCell
+from atompack.crystal.transform import Transform
+from atompack.symmetry import Spacegroup
+
+SPACEGROUPS = [1, 2, 15, 62, 139, 166, 194, 221, 225, 229]
+
+#######################
+#    Test Fixtures    #
+#######################
+
+
+@pytest.fixture
+def specs():
+    """Returns the spec of an arbitrary unit cell in each of `SPACEGROUPS`."""
+    basis = Basis([("X", np.array([0.1, 0.2, 0.3])), ("Y", np.array([0.5, 0.5, 0.5]))])
+    return [(basis, LatticeParameters.cubic(3.0 + i / 10), Spacegroup(number)) for i, number in enumerate(SPACEGROUPS)]
+
+
+#####################
+#    Batch Tests    #
+#####################
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_build_unit_cells(specs, processes):
+    res = list(build_unit_cells(specs, processes=processes, chunksize=3))
+    assert len(res) == len(specs)
+    for unit_cell, (basis, lattice_parameters, spacegroup) in zip(res, specs):
+        target = UnitCell(basis, lattice_parameters, spacegroup)
+        assert isinstance(unit_cell, UnitCell)
+        assert unit_cell.spacegroup.international_number == spacegroup.international_number
+        assert np.array_equal(unit_cell.species, target.species)
+        assert np.allclose(unit_cell.positions, target.positions)
+
+
+def test_build_unit_cells_binary(specs):
+    res = list(build_unit_cells(specs[:2], processes=1, binary=True))
+    assert all(isinstance(data, bytes) for data in res)
+    assert UnitCell.from_bytes(res[0]).lattice_parameters.a == 3.0
+
+
+def test_build_crystals(specs):
+    transform = Transform().supercell((2, 2, 2))
+    res = list(build_crystals(specs, transform=transform, processes=2, columnar=True))
+    for crystal, (basis, lattice_parameters, spacegroup) in zip(res, specs):
+        target = transform.apply(Crystal(UnitCell(basis, lattice_parameters, spacegroup)))
+        assert isinstance(crystal, Crystal)
+        assert crystal.columnar
+        assert np.allclose(crystal.positions, target.positions)
+        assert np.allclose(crystal.lattice_vectors.vectors, target.lattice_vectors.vectors)
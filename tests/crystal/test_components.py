@@ -59,6 +59,25 @@ def test_basis_apply_spacegroup_complex_monoclinic():
         assert np.allclose(target_site, res_site)
 
 
+def test_basis_apply_spacegroup_periodic_images():
+    # sites which differ by a full lattice translation or by less than the tolerance
+    basis = Basis([
+        ("X", np.array([0.0, 0.0, 0.0])),
+        ("X", np.array([1.0, 0.0, -1.0])),
+        ("X", np.array([0.0, 1E-9, 0.0])),
+        ("X", np.array([-0.5, 0.5, 0.5])),
+        ("X", np.array([0.5, 0.5, 0.5])),
+    ])
+    res = basis.apply_spacegroup(Spacegroup(1))
+    assert len(res) == 2
+    assert np.allclose(res[0][1], np.zeros(3))
+    assert np.allclose(res[1][1], np.array([0.5, 0.5, 0.5]))
+    # every site is wrapped into the unit cell
+    res = Basis.primitive("X").apply_spacegroup(Spacegroup(167))
+    for _, site in res:
+        assert np.all((site >= 0) & (site < 1))
+
+
 def test_basis_to_from_json():
     basis = Basis.primitive("X")
     json_data = basis.to_json()
@@ -88,6 +107,27 @@ def test_lattice_parameters_unused_kwargs():
     assert params.alpha == params.beta == params.gamma == np.pi / 2
 
 
+def test_lattice_parameters_hexagonal_matrix():
+    params = LatticeParameters.hexagonal(4.0, 2.5)
+    matrix = params.matrix
+    assert np.allclose(np.linalg.norm(matrix, axis=1), [4.0, 4.0, 2.5])
+    assert np.allclose(np.matmul(matrix, matrix.T), params.metric_tensor)
+    assert np.isclose(params.volume, 4.0 * 4.0 * np.sqrt(3) / 2 * 2.5)
+    assert np.allclose(np.matmul(params.matrix, params.reciprocal.T), np.identity(3))
+
+
+def test_lattice_parameters_cache_invalidation():
+    params = LatticeParameters.cubic(2.0)
+    assert np.isclose(params.volume, 8.0)
+    metric_tensor = params.metric_tensor
+    # cached values are reused and read-only
+    assert params.metric_tensor is metric_tensor
+    assert not metric_tensor.flags.writeable
+    params.a = 4.0
+    assert np.isclose(params.volume, 16.0)
+    assert params.metric_tensor[0, 0] == 16.0
+
+
 ##############################
 #    LatticeVectors Tests    #
 ##############################
@@ -120,6 +160,72 @@ def test_lattice_vectors_wrap(test_input, expectation):
     assert np.allclose(res, expectation)
 
 
+def test_lattice_vectors_contain_batch():
+    vectors = LatticeVectors(np.identity(3))
+    points = np.array([[0.5, 0.5, 0.5], [1.5, 0.5, 0.5], [0.0, 0.0, -0.5]])
+    res = vectors.contain(points)
+    assert res.shape == (3,)
+    assert list(res) == [True, False, False]
+
+
+def test_lattice_vectors_wrap_batch():
+    vectors = LatticeVectors(np.identity(3))
+    points = np.array([[1.1, 1.1, 1.1], [-0.1, 0.5, 0.5], [0.5, 0.5, 0.5]])
+    res = vectors.wrap(points)
+    # the points are wrapped in place
+    assert res is points
+    assert np.allclose(points, [[0.1, 0.1, 0.1], [0.9, 0.5, 0.5], [0.5, 0.5, 0.5]])
+
+
+def test_lattice_vectors_wrap_triclinic():
+    # hexagonal cell whose second vector leans into negative x
+    vectors = LatticeVectors(np.array([[1.0, 0.0, 0.0], [-0.5, np.sqrt(3) / 2, 0.0], [0.0, 0.0, 1.0]]))
+    # inside the cell despite a negative x coordinate
+    inside = np.array([-0.25, 0.5, 0.5])
+    assert vectors.contain(inside)
+    assert np.allclose(vectors.wrap(inside.copy()), inside)
+    # one full lattice vector outside the cell
+    outside = inside + vectors.vectors[1]
+    assert not vectors.contain(outside)
+    assert np.allclose(vectors.wrap(outside), inside)
+
+
+def test_lattice_vectors_fractional_cartesian():
+    params = LatticeParameters.triclinic(3.0, 4.0, 5.0, 1.2, 1.4, 1.6)
+    vectors = LatticeVectors.from_lattice_parameters(params)
+    assert np.isclose(vectors.volume, params.volume)
+    assert np.allclose(vectors.metric_tensor, params.metric_tensor)
+    points = np.random.default_rng(0).random((10, 3)) * 5
+    fractional = vectors.to_fractional(points)
+    assert np.allclose(np.matmul(fractional, vectors.vectors), points)
+    assert np.allclose(vectors.to_cartesian(fractional), points)
+    assert np.allclose(params.to_fractional(points), fractional)
+
+
+def test_lattice_vectors_cache_invalidation():
+    vectors = LatticeVectors(np.identity(3))
+    assert np.allclose(vectors.inverse, np.identity(3))
+    vectors.vectors = vectors.vectors * 2
+    assert np.allclose(vectors.inverse, np.identity(3) / 2)
+    assert np.isclose(vectors.volume, 8.0)
+    assert np.allclose(vectors.reciprocal, np.identity(3) / 2)
+
+
+def test_lattice_vectors_read_only():
+    matrix = np.identity(3)
+    vectors = LatticeVectors(matrix)
+    # the caller's array is copied
+    matrix[0, 0] = 2
+    assert np.isclose(vectors.volume, 1.0)
+    # writes in place raise rather than leaving derived quantities stale
+    with pytest.raises(ValueError):
+        vectors.vectors[0, 0] = 2
+    with pytest.raises(ValueError):
+        vectors.vectors *= 2
+    assert np.allclose(vectors.inverse, np.identity(3))
+    assert type(vectors.vectors) is np.ndarray
+
+
 def test_lattice_vectors_to_from_json():
     vectors = LatticeVectors(np.identity(3))
     json_data = vectors.to_json()
@@ -1,8 +1,10 @@
 import numpy as np
+import pytest
 
 from atompack.crystal.components import Basis, LatticeParameters
 from atompack.crystal.crystal import Crystal, UnitCell
 from atompack.crystal.spatial import MillerIndex
+from atompack.crystal.transform import Transform
 from atompack.symmetry import Spacegroup
 
 ########################
@@ -73,6 +75,19 @@ def test_unit_cell_to_from_json():
     assert res.atoms[0].specie == unit_cell.atoms[0].specie
 
 
+def test_unit_cell_to_from_bytes():
+    basis = Basis.primitive("X")
+    params = LatticeParameters.cubic(10)
+    spg = Spacegroup("F m -3 m")
+    unit_cell = UnitCell(basis, params, spg)
+    res = UnitCell.from_bytes(unit_cell.to_bytes())
+    assert res.basis[0][0] == unit_cell.basis[0][0]
+    assert res.lattice_parameters.a == unit_cell.lattice_parameters.a
+    assert res.spacegroup == unit_cell.spacegroup
+    assert np.array_equal(res.positions, unit_cell.positions)
+    assert np.array_equal(res.species, unit_cell.species)
+
+
 #######################
 #    Crystal Tests    #
 #######################
@@ -91,3 +106,166 @@ def test_crystal_to_from_json():
         crystal.lattice_vectors.vectors,
     )
     assert len(res.atoms) == len(crystal.atoms) == 2
+
+
+def test_crystal_to_from_json_columnar():
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    crystal = Crystal(UnitCell(basis, lattparams, spg, columnar=True))
+    res = Crystal.from_json(crystal.to_json())
+    assert np.array_equal(res.positions, crystal.positions)
+    assert np.array_equal(res.species, crystal.species)
+
+
+def test_crystal_to_from_bytes():
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    crystal = Crystal(UnitCell(basis, lattparams, spg))
+    crystal = Transform().supercell((2, 2, 2)).apply(crystal)
+    crystal.perceive_bonds(tolerance=0.0)
+    res = Crystal.from_bytes(crystal.to_bytes(), columnar=True)
+    assert res.columnar
+    assert np.array_equal(res.lattice_vectors.vectors, crystal.lattice_vectors.vectors)
+    assert np.array_equal(res.positions, crystal.positions)
+    assert np.array_equal(res.species, crystal.species)
+    assert len(res.bonds) == len(crystal.bonds) > 0
+    assert res.unit_cell.spacegroup == crystal.unit_cell.spacegroup
+
+
+def test_crystal_to_from_bytes_unit_cell():
+    unit_cell = UnitCell(Basis.primitive("Fe"), LatticeParameters.cubic(2.85), Spacegroup("I m -3 m"))
+    unit_cell.atoms[0].position = np.full(3, 0.5)
+    res = Crystal.from_bytes(Crystal(unit_cell).to_bytes())
+    # the unit cell is decoded rather than rebuilt from its spacegroup
+    assert np.array_equal(res.unit_cell.positions, unit_cell.positions)
+    assert np.array_equal(res.unit_cell.species, unit_cell.species)
+    assert res.unit_cell.lattice_parameters.a == unit_cell.lattice_parameters.a
+
+
+def test_crystal_to_from_file_mmap(tmp_path):
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    crystal = Crystal(UnitCell(basis, lattparams, spg))
+    crystal = Transform().supercell((3, 3, 3)).apply(crystal)
+    path = str(tmp_path / "crystal.bin")
+    crystal.to_file(path)
+    res = Crystal.from_file(path, mmap=True)
+    assert res.columnar
+    assert np.array_equal(res.positions, crystal.positions)
+    assert np.array_equal(res.lattice_vectors.vectors, crystal.lattice_vectors.vectors)
+    assert len(res.unit_cell.atoms) == 2
+
+
+def test_crystal_perceive_bonds():
+    # each atom of an FCC crystal bonds to its 12 nearest neighbors across periodic boundaries
+    basis = Basis.primitive("Cu")
+    lattparams = LatticeParameters.cubic(3.6)
+    spg = Spacegroup("F m -3 m")
+    crystal = Crystal(UnitCell(basis, lattparams, spg))
+    crystal = Transform().supercell((3, 3, 3)).apply(crystal)
+    assert crystal.perceive_bonds() == 108 * 12 // 2
+    assert len(crystal.bonds) == 108 * 12 // 2
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_crystal_copy_on_write(columnar):
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    unit_cell = UnitCell(basis, lattparams, spg, columnar=columnar)
+    positions = unit_cell.positions.copy()
+    crystal = Crystal(unit_cell)
+    other = Crystal(unit_cell)
+    # storage is shared until the first mutation
+    assert crystal._columns is unit_cell._columns
+    assert crystal._graph is unit_cell._graph
+    crystal = Transform().supercell((2, 2, 2)).apply(crystal)
+    assert len(crystal.atoms) == 16
+    assert len(unit_cell.atoms) == len(other.atoms) == 2
+    # mutating atoms of one structure leaves the others untouched
+    other.atoms[0].position = np.ones(3)
+    other.atoms[0]["charge"] = 1
+    assert np.array_equal(unit_cell.positions, positions)
+    assert "charge" not in unit_cell.atoms[0]
+    unit_cell.positions = positions + 1
+    assert np.array_equal(crystal.positions[:2], positions)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_crystal_copy_on_write_references(columnar):
+    unit_cell = UnitCell(Basis.primitive("Fe"), LatticeParameters.cubic(2.85), Spacegroup("I m -3 m"), columnar=columnar)
+    expectation = unit_cell.positions.copy()
+    # references taken before the atoms are shared are detached from them
+    position = unit_cell.atoms[0].position
+    positions = unit_cell.positions
+    crystal = Crystal(unit_cell)
+    position[:] = 7
+    positions[1] = 9
+    assert np.array_equal(crystal.positions, expectation)
+    assert np.array_equal(unit_cell.positions, expectation)
+    # reading does not copy the shared atoms
+    assert len(crystal.atoms) == 2 and len(crystal.bonds) == 0
+    assert [atom.specie for atom in crystal.atoms] == ["Fe", "Fe"]
+    assert np.array_equal([atom.position for atom in crystal.atoms], expectation)
+    assert np.array_equal(crystal.positions, expectation)
+    assert crystal._columns is unit_cell._columns
+    assert crystal._graph is unit_cell._graph
+    if columnar:
+        # arrays viewing shared atoms are read-only
+        with pytest.raises(ValueError):
+            crystal.positions[0] = 1
+        with pytest.raises(ValueError):
+            crystal.atoms[0].position[:] = 1
+    crystal.atoms[0].position = np.ones(3)
+    assert np.array_equal(crystal.positions[0], np.ones(3))
+    assert np.array_equal(unit_cell.positions, expectation)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_crystal_clone(columnar):
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    unit_cell = UnitCell(basis, lattparams, spg, columnar=columnar)
+    crystal = Transform().supercell((2, 2, 2)).apply(Crystal(unit_cell))
+    res = crystal.clone()
+    assert res.columnar == columnar
+    assert np.array_equal(res.positions, crystal.positions)
+    assert np.array_equal(res.lattice_vectors.vectors, crystal.lattice_vectors.vectors)
+    # immutable metadata is shared while everything else is copied
+    assert res.unit_cell.basis is unit_cell.basis
+    assert res.unit_cell.spacegroup is unit_cell.spacegroup
+    assert res.unit_cell is not unit_cell
+    res.remove_atoms(0)
+    res.lattice_vectors.vectors = res.lattice_vectors.vectors * 2
+    res.unit_cell.lattice_parameters.a = 3.0
+    assert len(crystal.atoms) == 16
+    assert np.allclose(crystal.lattice_vectors.vectors, np.identity(3) * 5.7)
+    assert unit_cell.lattice_parameters.a == 2.85
+
+
+def test_crystal_spatial_grid():
+    unit_cell = UnitCell(Basis.primitive("X"), LatticeParameters.cubic(10), Spacegroup(225))
+    crystal = Transform().supercell((2, 2, 2)).apply(Crystal(unit_cell))
+    # the atom at the origin and its images at the far corners of the cell
+    assert crystal.spatial_grid.sphere([19.0, 19.0, 19.0], 2.0).tolist() == [0]
+    assert len(crystal.spatial_grid.nearest([0.0, 0.0, 0.0], 13)[0]) == 13
+    # the grid follows changes of the lattice vectors
+    crystal.lattice_vectors.vectors = crystal.lattice_vectors.vectors * 2
+    assert len(crystal.spatial_grid.sphere([19.0, 19.0, 19.0], 2.0)) == 0
+    assert crystal.spatial_grid.sphere([39.0, 39.0, 39.0], 2.0).tolist() == [0]
+
+
+def test_crystal_clone_shared():
+    unit_cell = UnitCell(Basis.primitive("Fe"), LatticeParameters.cubic(2.85), Spacegroup("I m -3 m"))
+    crystal = Crystal(unit_cell)
+    res = crystal.clone()
+    # an unmodified clone shares the atoms of its own unit cell copy-on-write
+    assert res._graph is res.unit_cell._graph
+    assert res._graph is not crystal._graph
+    res.atoms[0].position = np.ones(3)
+    assert np.allclose(res.unit_cell.positions[0], 0)
+    assert np.allclose(crystal.positions[0], 0)
@@ -54,6 +54,15 @@ def test_miller_index_equality():
 ###########################
 
 
+def test_orientation_lazy_import():
+    import atompack.crystal
+    from atompack.crystal.orientation import Orientation as _Orientation
+    assert atompack.crystal.Orientation is _Orientation
+    assert Orientation is _Orientation
+    with pytest.raises(AttributeError):
+        _ = atompack.crystal.Missing
+
+
 def test_orientation_miller_indices():
     plane = MillerIndex((1, 0, 0))
     direction = MillerIndex((1, 2, 0))
@@ -1,6 +1,9 @@
 import numpy as np
+import pytest
 
-from atompack.crystal import (Basis, Crystal, LatticeParameters, Transform, UnitCell)
+from atompack.bond import Bond
+from atompack.crystal import (Basis, Crystal, LatticeParameters, MillerIndex, Plane, Transform, UnitCell)
+from atompack.crystal.orientation import Orientation
 from atompack.symmetry import Spacegroup
 
 
@@ -30,3 +33,222 @@ def test_transform_supercell():
     transform.apply(crystal)
     assert len(crystal.atoms) == 72
     assert np.allclose(crystal.lattice_vectors.vectors, target_vectors * np.array(supercell_size)**2, atol=1E-6)
+
+
+def test_transform_supercell_positions():
+    # complex basis of arbitrary species
+    basis = Basis([
+        ("X", np.array([0.0, 0.0, 0.0])),
+        ("Y", np.array([0.5, 0.5, 0.5])),
+    ])
+    lattparams = LatticeParameters.orthorhombic(1.0, 2.0, 3.0)
+    spg = Spacegroup(1)
+    unit_cell = UnitCell(basis, lattparams, spg)
+    crystal = Crystal(unit_cell)
+    vectors = crystal.lattice_vectors.vectors.copy()
+    templates = [(atom.specie, atom.position.copy()) for atom in crystal.atoms]
+    # build the expected atoms with explicit loops
+    target = list(templates)
+    for x in range(2):
+        for y in range(3):
+            for z in range(2):
+                if x == y == z == 0:
+                    continue
+                offset = np.matmul(np.array([x, y, z]), vectors)
+                target += [(specie, position + offset) for specie, position in templates]
+    crystal = Transform().supercell((2, 3, 2)).apply(crystal)
+    assert len(crystal.atoms) == len(target) == 24
+    for atom, (specie, position) in zip(crystal.atoms, target):
+        assert atom.specie == specie
+        assert np.allclose(atom.position, position)
+
+
+def test_transform_supercell_columnar():
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    graph_crystal = Crystal(UnitCell(basis, lattparams, spg))
+    columnar_crystal = Crystal(UnitCell(basis, lattparams, spg, columnar=True))
+    transform = Transform().supercell((2, 3, 4))
+    graph_crystal = transform.apply(graph_crystal)
+    columnar_crystal = transform.apply(columnar_crystal)
+    assert columnar_crystal.columnar
+    assert len(columnar_crystal.atoms) == len(graph_crystal.atoms) == 48
+    assert np.allclose(columnar_crystal.positions, graph_crystal.positions)
+    assert np.array_equal(columnar_crystal.species, graph_crystal.species)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_transform_cut(columnar):
+    basis = Basis.primitive("X")
+    lattparams = LatticeParameters.cubic(2.0)
+    spg = Spacegroup("F m -3 m")
+    crystal = Transform().supercell((4, 4, 4)).apply(Crystal(UnitCell(basis, lattparams, spg, columnar=columnar)))
+    positions = crystal.positions
+    # the (111) plane through the far corners of the supercell
+    plane = Plane.from_miller_index(MillerIndex((1, 1, 1)))
+    crystal = Transform().cut(plane).apply(crystal)
+    keep = positions.sum(axis=1) <= 8.0 + 1E-6
+    assert len(crystal.atoms) == np.count_nonzero(keep) < len(positions)
+    assert np.allclose(crystal.positions, positions[keep])
+    # atoms beyond a plane through the middle of the supercell
+    plane = Plane(np.array([[0.5, 0.0, 0.0], [0.5, 1.0, 0.0], [0.5, 0.0, 1.0]]))
+    crystal = Transform().cut(plane).apply(crystal)
+    assert np.all(crystal.positions[:, 0] <= 4.0 + 1E-6)
+    assert np.count_nonzero(crystal.positions[:, 0] == 4.0) > 0
+
+
+def test_transform_cut_collinear():
+    crystal = Crystal(UnitCell(Basis.primitive("X"), LatticeParameters.cubic(2.0), Spacegroup(225)))
+    plane = Plane(np.array([[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [1.0, 1.0, 1.0]]))
+    with pytest.raises(ValueError):
+        Transform().cut(plane).apply(crystal)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_transform_orient(columnar):
+    basis = Basis.primitive("Fe")
+    lattparams = LatticeParameters.cubic(2.85)
+    spg = Spacegroup("I m -3 m")
+    crystal = Crystal(UnitCell(basis, lattparams, spg, columnar=columnar))
+    orientation = Orientation.from_rotvec([0.0, 0.0, np.pi / 4])
+    crystal = Transform().orient(orientation).apply(crystal)
+    target_vectors = orientation.apply(np.identity(3) * 2.85)
+    assert np.allclose(crystal.lattice_vectors.vectors, target_vectors)
+    assert np.allclose(crystal.positions[1], [0.0, 1.425 * np.sqrt(2), 1.425])
+
+
+def test_transform_orient_supercell():
+    basis = Basis([("X", np.array([0.0, 0.0, 0.0])), ("Y", np.array([0.25, 0.5, 0.75]))])
+    lattparams = LatticeParameters.triclinic(2.0, 3.0, 4.0, *np.radians([80.0, 95.0, 110.0]))
+    unit_cell = UnitCell(basis, lattparams, Spacegroup(1))
+    orientation = Orientation.from_rotvec([0.3, -0.2, 0.5])
+    supercell_size = (2, 3, 1)
+    # the rotated supercell is built directly from the rotated unit cell
+    res = Transform().orient(orientation).supercell(supercell_size).apply(Crystal(unit_cell))
+    target = Transform().supercell(supercell_size).apply(Crystal(unit_cell))
+    assert len(res.atoms) == 12
+    assert np.allclose(res.positions, orientation.apply(target.positions))
+    assert np.allclose(res.lattice_vectors.vectors, orientation.apply(target.lattice_vectors.vectors))
+    assert np.allclose(target.lattice_vectors.vectors,
+                       lattparams.matrix * np.array(supercell_size)[:, np.newaxis])
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+@pytest.mark.parametrize("hkl,n_atoms", [((0, 0, 1), 4), ((1, 1, 0), 8), ((1, 1, 1), 24), ((1, 2, 3), 168)])
+def test_transform_project_orthogonal(columnar, hkl, n_atoms):
+    basis = Basis.primitive("X")
+    lattparams = LatticeParameters.cubic(2.0)
+    crystal = Crystal(UnitCell(basis, lattparams, Spacegroup(225), columnar=columnar))
+    plane = Plane.from_miller_index(MillerIndex(hkl))
+    crystal = Transform().project(plane, orthogonalize=True).apply(crystal)
+    vectors = crystal.lattice_vectors.vectors
+    assert len(crystal.atoms) == n_atoms
+    # the cell is orthogonal with the plane normal along z
+    assert np.allclose(vectors, np.diag(np.diag(vectors)), atol=1E-6)
+    assert np.isclose(vectors[2, 2], 2.0 * np.linalg.norm(hkl))
+    assert np.all(crystal.lattice_vectors.contain(crystal.positions))
+    # no atom is duplicated at a periodic image
+    assert len(crystal.neighbor_list(1.0).indices) == 0
+    assert len(crystal.neighbor_list(1.5).indices) == 12 * n_atoms
+
+
+def test_transform_project():
+    basis = Basis([("X", np.array([0.0, 0.0, 0.0])), ("Y", np.array([0.5, 0.5, 0.5]))])
+    lattparams = LatticeParameters.triclinic(3.0, 3.5, 4.0, *np.radians([80.0, 95.0, 110.0]))
+    unit_cell = UnitCell(basis, lattparams, Spacegroup(1))
+    plane = Plane.from_miller_index(MillerIndex((1, 2, 1)))
+    crystal = Transform().project(plane).apply(Crystal(unit_cell))
+    vectors = crystal.lattice_vectors.vectors
+    # the volume and contents of the cell are unchanged
+    assert np.array_equal(np.sort(crystal.species), ["X", "Y"])
+    assert np.isclose(np.linalg.det(vectors), np.linalg.det(lattparams.matrix))
+    # the first two lattice vectors lie in the xy-plane
+    assert np.allclose(vectors[:2, 2], 0)
+    assert np.all(crystal.lattice_vectors.contain(crystal.positions))
+    # the distances between atoms are preserved
+    original = Crystal(unit_cell).neighbor_list(5.0).distances
+    assert np.allclose(np.sort(crystal.neighbor_list(5.0).distances), np.sort(original))
+
+
+def test_transform_project_hexagonal():
+    basis = Basis.primitive("X")
+    lattparams = LatticeParameters.hexagonal(2.5, 4.0)
+    unit_cell = UnitCell(basis, lattparams, Spacegroup(194))
+    plane = Plane.from_miller_index(MillerIndex((1, 0, 0)))
+    crystal = Transform().project(plane, orthogonalize=True).apply(Crystal(unit_cell))
+    # the orthohexagonal cell holds twice the atoms
+    assert len(crystal.atoms) == 2 * len(unit_cell.atoms)
+    assert np.allclose(crystal.lattice_vectors.vectors, np.diag([2.5, 4.0, 2.5 * np.sqrt(3)]))
+
+
+def _add_step(transform, name, args):
+    if name == "supercell":
+        return transform.supercell(args)
+    if name == "orient":
+        return transform.orient(Orientation.from_rotvec(args))
+    if name == "project":
+        return transform.project(Plane.from_miller_index(MillerIndex(args)), orthogonalize=True)
+    return transform.cut(Plane.from_miller_index(MillerIndex(args)))
+
+
+def _sorted_positions(crystal):
+    positions = np.round(crystal.positions, 6)
+    return positions[np.lexsort(positions.T)]
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+@pytest.mark.parametrize("steps", [
+    [("supercell", (4, 4, 4)), ("cut", (1, 1, 1))],
+    [("cut", (1, 1, 1)), ("supercell", (2, 3, 2))],
+    [("supercell", (2, 2, 2)), ("cut", (1, 1, 0)), ("supercell", (2, 1, 1)), ("cut", (0, 1, 1))],
+    [("project", (1, 1, 1)), ("supercell", (2, 2, 1)), ("cut", (1, 1, 0))],
+    [("orient", (0.3, -0.2, 0.5)), ("supercell", (3, 1, 2)), ("project", (1, 1, 0)), ("cut", (1, 0, 1))],
+], ids=["supercell-cut", "cut-supercell", "alternating", "project-supercell-cut", "orient-project"])
+def test_transform_fused(columnar, steps):
+    unit_cell = UnitCell(Basis.primitive("X"), LatticeParameters.cubic(2.0), Spacegroup(225), columnar=columnar)
+    fused = Transform()
+    sequential = Crystal(unit_cell)
+    for name, args in steps:
+        _add_step(fused, name, args)
+        sequential = _add_step(Transform(), name, args).apply(sequential)
+    # one pass generates the same crystal as applying each step in turn
+    res = fused.apply(Crystal(unit_cell))
+    assert len(res.atoms) == len(sequential.atoms)
+    assert np.allclose(res.lattice_vectors.vectors, sequential.lattice_vectors.vectors)
+    assert np.allclose(_sorted_positions(res), _sorted_positions(sequential))
+
+
+def test_transform_plan_reuse():
+    unit_cell = UnitCell(Basis.primitive("X"), LatticeParameters.cubic(2.0), Spacegroup(225))
+    transform = Transform().supercell((3, 3, 3)).cut(Plane.from_miller_index(MillerIndex((1, 1, 1))))
+    plan = transform.compile(Crystal(unit_cell).lattice_vectors.vectors)
+    assert np.array_equal(plan.matrix, np.diag([3, 3, 3]))
+    # the same plan is used for every crystal with the same lattice
+    crystals = [transform.apply(Crystal(unit_cell)) for _ in range(3)]
+    assert transform.compile(unit_cell.lattice_parameters.matrix) is plan
+    assert len({len(crystal.atoms) for crystal in crystals}) == 1
+    with pytest.raises(ValueError):
+        plan.apply(crystals[0])
+    # only the plan for the most recent lattice vectors is kept
+    assert transform.compile(np.eye(3) * 3.0) is not plan
+    plan = transform.compile(unit_cell.lattice_parameters.matrix)
+    assert transform.compile(unit_cell.lattice_parameters.matrix) is plan
+    # modifying the transform discards compiled plans
+    transform.supercell((2, 1, 1))
+    assert transform.compile(unit_cell.lattice_parameters.matrix) is not plan
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_transform_supercell_bonds(columnar):
+    basis = Basis([("X", np.array([0.1, 0.1, 0.1])), ("Y", np.array([0.3, 0.1, 0.1]))])
+    unit_cell = UnitCell(basis, LatticeParameters.cubic(5.0), Spacegroup(1), columnar=columnar)
+    crystal = Crystal(unit_cell)
+    crystal.insert_bond(Bond((0, 1), order=2))
+    crystal = Transform().supercell((2, 2, 2)).apply(crystal)
+    # each image keeps the bond between its own atoms
+    assert len(crystal.bonds) == 8
+    for bond in crystal.bonds:
+        a, b = crystal.select_atoms(*bond.indices)
+        assert np.isclose(np.linalg.norm(a.position - b.position), 1.0)
+        assert bond["order"] == 2
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from atompack.atom import Atom
 
@@ -17,3 +18,42 @@ def test_atom_to_from_json():
     assert res.specie == atom.specie
     assert np.allclose(res.position, atom.position)
     assert res["test_value"] == atom["test_value"]
+
+
+def test_atom_to_from_dict():
+    atom = Atom("X", np.zeros(3), test_value="test")
+    data = atom.to_dict()
+    assert data["type"] == "Atom"
+    res = Atom.from_dict(data)
+    assert res.specie == atom.specie
+    assert np.allclose(res.position, atom.position)
+    assert res["test_value"] == atom["test_value"]
+    # the input dict is not consumed
+    assert data["type"] == "Atom"
+
+
+def test_atom_copy():
+    atom = Atom("X", np.zeros(3), tags=["a"])
+    res = atom.copy()
+    res.position += 1
+    res["tags"].append("b")
+    assert np.allclose(atom.position, np.zeros(3))
+    assert atom["tags"] == ["a"]
+    assert res.specie == "X"
+
+
+def test_atom_extras():
+    atom = Atom("X", np.zeros(3))
+    # atoms without extra properties do not allocate a dict
+    assert not hasattr(atom, "__dict__")
+    assert atom._extras is None
+    assert list(atom) == ["specie", "position"]
+    atom["charge"] = -1.0
+    assert dict(atom) == {"specie": "X", "position": atom.position, "charge": -1.0}
+    assert atom.get("spin") is None
+    del atom["charge"]
+    assert atom._extras is None
+    with pytest.raises(KeyError):
+        del atom["specie"]
+    with pytest.raises(KeyError):
+        _ = atom["charge"]
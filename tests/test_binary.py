@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from atompack import binary
+
+#############################
+#    Binary Format Tests    #
+#############################
+
+
+def test_binary_encode_decode():
+    header = {"type": "Test", "specie_table": ["X", "Y"]}
+    positions = np.arange(12, dtype=float).reshape(4, 3)
+    species = np.array([0, 1, 1, 0])
+    bonds = np.array([[0, 1], [2, 3]])
+    res = binary.encode(header, positions, species, bonds)
+    new_header, new_positions, new_species, new_bonds = binary.decode(res)
+    assert new_header == dict(header, n_atoms=4, n_bonds=2)
+    assert np.array_equal(new_positions, positions)
+    assert np.array_equal(new_species, species)
+    assert np.array_equal(new_bonds, bonds)
+
+
+def test_binary_decode_zero_copy():
+    positions = np.ones((5, 3))
+    buffer = bytearray(binary.encode({}, positions, np.zeros(5), np.zeros((0, 2))))
+    _, res, _, _ = binary.decode(buffer)
+    # the decoded array is a view into the buffer
+    res[0, 0] = 2.0
+    _, res, _, _ = binary.decode(buffer)
+    assert res[0, 0] == 2.0
+    # immutable buffers produce read-only arrays
+    _, res, _, _ = binary.decode(bytes(buffer))
+    assert not res.flags.writeable
+
+
+def test_binary_size_concatenated():
+    first = binary.encode({"type": "First"}, np.ones((3, 3)), np.zeros(3), np.array([[0, 1]]))
+    second = binary.encode({"type": "Second"}, np.zeros((1, 3)), np.zeros(1), np.zeros((0, 2)))
+    buffer = first + second
+    assert binary.size(buffer) == len(first)
+    header, positions, _, _ = binary.decode(memoryview(buffer)[binary.size(buffer):])
+    assert header["type"] == "Second"
+    assert np.array_equal(positions, np.zeros((1, 3)))
+
+
+def test_binary_decode_invalid():
+    with pytest.raises(ValueError):
+        _ = binary.decode(b"ATOM")
+    with pytest.raises(ValueError):
+        _ = binary.decode(b"NOTATOMPACK" + bytes(32))
+    with pytest.raises(ValueError):
+        _ = binary.encode({}, np.zeros((2, 3)), np.zeros(1), np.zeros((0, 2)))
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from atompack.bond import Bond
 
@@ -15,3 +16,17 @@ def test_bond_to_from_json():
     res = Bond.from_json(json_data)
     assert res.indices == bond.indices
     assert res["test_value"] == bond["test_value"]
+
+
+def test_bond_extras():
+    bond = Bond((0, 1))
+    # bonds without extra properties do not allocate a dict
+    assert not hasattr(bond, "__dict__")
+    assert len(bond) == 1
+    bond["order"] = 2
+    assert dict(bond) == {"indices": (0, 1), "order": 2}
+    assert bond.copy()["order"] == 2
+    del bond["order"]
+    assert bond.to_dict() == {"indices": (0, 1), "type": "Bond"}
+    with pytest.raises(KeyError):
+        del bond["indices"]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from atompack.changes import INSERTED, MOVED, REMOVED, ChangeLog
+
+#########################
+#    ChangeLog Tests    #
+#########################
+
+
+def test_change_log_since():
+    log = ChangeLog()
+    log.record(INSERTED, np.arange(4))
+    log.record(MOVED, np.array([1, 2]))
+    log.record(REMOVED, np.array([2, 3]))
+    # a removed index which is reused is listed as removed and inserted
+    log.record(INSERTED, np.array([3]))
+    assert log.version == 4
+    changes = log.since(1)
+    assert changes.inserted.tolist() == [3]
+    assert changes.removed.tolist() == [2, 3]
+    assert changes.moved.tolist() == [1]
+    assert len(changes) == 4
+    # atoms inserted and removed since the earlier version are not reported
+    changes = log.since(0)
+    assert changes.inserted.tolist() == [0, 1, 3]
+    assert len(changes.removed) == len(changes.moved) == 0
+    with pytest.raises(ValueError):
+        _ = log.since(5)
+    with pytest.raises(ValueError):
+        log.record("renamed", np.array([0]))
+
+
+def test_change_log_capacity():
+    log = ChangeLog()
+    log.record(INSERTED, np.arange(10))
+    log.record(MOVED, np.arange(1 << 15))
+    log.record(MOVED, np.arange(1 << 15))
+    # the oldest change is forgotten once the log is full
+    assert log.since(0) is None
+    assert log.since(1).moved.tolist() == list(range(1 << 15))
+    # changes larger than the log are never replayed
+    log.record(MOVED, np.arange((1 << 16) + 1))
+    assert log.since(3) is None
+    assert len(log.since(log.version)) == 0
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from atompack.atom import Atom
+from atompack.columns import AtomColumns, AtomSequence, AtomView
+
+#######################
+#    Test Fixtures    #
+#######################
+
+
+@pytest.fixture
+def columns():
+    """Returns a store with two rows of different species."""
+    res = AtomColumns()
+    res.write([0, 1], [
+        Atom("X", np.zeros(3), charge=1),
+        Atom("Y", np.ones(3)),
+    ])
+    return res
+
+
+###########################
+#    AtomColumns Tests    #
+###########################
+
+
+def test_atom_columns_write(columns):
+    assert columns.size == 2
+    assert columns.specie_table == ["X", "Y"]
+    assert np.array_equal(columns.species, [0, 1])
+    assert np.allclose(columns.positions, [[0, 0, 0], [1, 1, 1]])
+    assert columns.keys(0) == ["specie", "position", "charge"]
+    assert columns.keys(1) == ["specie", "position"]
+
+
+def test_atom_columns_to_dicts(columns):
+    res = columns.to_dicts([1, 0])
+    assert [atom["specie"] for atom in res] == ["Y", "X"]
+    assert np.allclose(res[0]["position"], np.ones(3))
+    assert "charge" not in res[0]
+    assert res[1]["charge"] == 1
+    assert Atom.from_dict(res[1])["charge"] == 1
+
+
+def test_atom_columns_reserve(columns):
+    columns.reserve(100)
+    assert columns.capacity >= 100
+    assert columns.size == 2
+    assert columns.get_property("charge", 0) == 1
+
+
+def test_atom_columns_copy_rows(columns):
+    columns.copy_rows([0, 1, 0], [2, 3, 4])
+    assert columns.size == 5
+    assert np.array_equal(columns.species, [0, 1, 0, 1, 0])
+    assert columns.get_property("charge", 4) == 1
+    with pytest.raises(KeyError):
+        _ = columns.get_property("charge", 3)
+
+
+def test_atom_columns_property_promotion(columns):
+    # an integer column is promoted to float
+    columns.set_property("charge", [1], [0.5])
+    assert columns.get_property("charge", 0) == 1.0
+    assert columns.get_property("charge", 1) == 0.5
+    # a numeric column is promoted to object
+    columns.set_property("charge", [1], ["high"])
+    assert columns.get_property("charge", 1) == "high"
+
+
+def test_atom_columns_detach(columns):
+    atom = columns.detach(0)
+    atom.position += 1
+    assert type(atom) is Atom
+    assert atom["charge"] == 1
+    assert np.allclose(columns.positions[0], np.zeros(3))
+
+
+########################
+#    AtomView Tests    #
+########################
+
+
+def test_atom_view_mutability(columns):
+    view = AtomView(columns, 1)
+    view.specie = "Z"
+    view.position += 1
+    view["charge"] = -1
+    assert columns.specie_table == ["X", "Y", "Z"]
+    assert np.allclose(columns.positions[1], [2, 2, 2])
+    assert list(view) == ["specie", "position", "charge"]
+    assert view["charge"] == -1
+    del view["charge"]
+    assert len(view) == 2
+    with pytest.raises(KeyError):
+        del view["specie"]
+
+
+def test_atom_view_to_json(columns):
+    view = AtomView(columns, 0)
+    res = Atom.from_json(view.to_json())
+    assert res.specie == view.specie
+    assert np.allclose(res.position, view.position)
+    assert res["charge"] == view["charge"]
+
+
+############################
+#    AtomSequence Tests    #
+############################
+
+
+def test_atom_sequence(columns):
+    atoms = AtomSequence(columns)
+    assert len(atoms) == 2
+    assert atoms[-1].specie == "Y"
+    assert [atom.specie for atom in atoms] == ["X", "Y"]
+    assert [atom.specie for atom in atoms[1:]] == ["Y"]
+    with pytest.raises(IndexError):
+        _ = atoms[2]
+    # explicit rows
+    atoms = AtomSequence(columns, np.array([1]))
+    assert len(atoms) == 1
+    assert atoms[0].specie == "Y"
@@ -0,0 +1,120 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from atompack.grid import SpatialGrid
+
+###############
+#    Setup    #
+###############
+
+LATTICE_VECTORS = [
+    None,
+    np.diag([10.0, 15.0, 20.0]),
+    np.array([[10.0, 0.0, 0.0], [3.0, 9.0, 0.0], [-2.0, 1.0, 8.0]]),
+]
+
+
+def images(positions, lattice_vectors):
+    """Returns every image of each position within three cells with shape `(N, M, 3)`."""
+    if lattice_vectors is None:
+        return positions[:, None]
+    shifts = np.array(list(itertools.product(range(-3, 4), repeat=3))) @ lattice_vectors
+    return positions[:, None] + shifts
+
+
+def random_positions(n, lattice_vectors):
+    rng = np.random.default_rng(0)
+    if lattice_vectors is None:
+        return rng.random((n, 3)) * 12
+    return rng.random((n, 3)) @ lattice_vectors
+
+
+###########################
+#    SpatialGrid Tests    #
+###########################
+
+
+@pytest.mark.parametrize("lattice_vectors", LATTICE_VECTORS)
+def test_spatial_grid_sphere(lattice_vectors):
+    positions = random_positions(200, lattice_vectors)
+    grid = SpatialGrid(positions, lattice_vectors)
+    distances = np.linalg.norm(images(positions, lattice_vectors) - [4.0, 5.0, 6.0], axis=2).min(axis=1)
+    for radius in (0.5, 2.0, 7.0):
+        assert grid.sphere([4.0, 5.0, 6.0], radius).tolist() == np.flatnonzero(distances <= radius).tolist()
+
+
+@pytest.mark.parametrize("lattice_vectors", LATTICE_VECTORS)
+def test_spatial_grid_box(lattice_vectors):
+    positions = random_positions(200, lattice_vectors)
+    grid = SpatialGrid(positions, lattice_vectors)
+    lower, upper = np.array([-1.0, 2.0, 3.0]), np.array([4.0, 8.0, 5.0])
+    points = images(positions, lattice_vectors)
+    inside = np.all((points >= lower) & (points <= upper), axis=2)
+    assert grid.box(lower, upper).tolist() == np.flatnonzero(inside.any(axis=1)).tolist()
+
+
+@pytest.mark.parametrize("lattice_vectors", LATTICE_VECTORS)
+def test_spatial_grid_slab(lattice_vectors):
+    positions = random_positions(200, lattice_vectors)
+    grid = SpatialGrid(positions, lattice_vectors)
+    normal = np.array([1.0, -2.0, 0.5])
+    projections = positions @ normal / np.linalg.norm(normal)
+    expectation = np.flatnonzero((projections >= -3.0) & (projections <= 1.0))
+    assert grid.slab(normal, -3.0, 1.0).tolist() == expectation.tolist()
+
+
+@pytest.mark.parametrize("lattice_vectors", LATTICE_VECTORS)
+def test_spatial_grid_nearest(lattice_vectors):
+    positions = random_positions(200, lattice_vectors)
+    grid = SpatialGrid(positions, lattice_vectors)
+    point = np.array([-5.0, 20.0, 1.0])
+    distances = np.linalg.norm(images(positions, lattice_vectors) - point, axis=2).min(axis=1)
+    indices, res = grid.nearest(point, 10)
+    assert indices.tolist() == np.argsort(distances)[:10].tolist()
+    assert np.allclose(res, np.sort(distances)[:10])
+    with pytest.raises(ValueError):
+        _ = grid.nearest(point, 201)
+
+
+@pytest.mark.parametrize("lattice_vectors", LATTICE_VECTORS)
+def test_spatial_grid_update(lattice_vectors):
+    positions = random_positions(400, lattice_vectors)
+    grid = SpatialGrid(positions[:200], lattice_vectors)
+    # remove every other atom and insert the rest one at a time
+    grid.remove(np.arange(0, 200, 2))
+    for i in range(200, 400):
+        grid.insert(positions[i:i + 1], [i])
+    expectation = SpatialGrid(positions, lattice_vectors)
+    expectation.remove(np.arange(0, 200, 2))
+    assert len(grid) == len(expectation) == 300
+    assert np.array_equal(grid.sphere([4.0, 5.0, 6.0], 3.0), expectation.sphere([4.0, 5.0, 6.0], 3.0))
+    assert np.array_equal(grid.box([0.0, 0.0, 0.0], [5.0, 5.0, 5.0]), expectation.box([0.0, 0.0, 0.0], [5.0, 5.0, 5.0]))
+    assert np.array_equal(grid.slab([0.0, 1.0, 1.0], 2.0, 6.0), expectation.slab([0.0, 1.0, 1.0], 2.0, 6.0))
+    assert np.array_equal(grid.nearest([1.0, 2.0, 3.0], 5)[0], expectation.nearest([1.0, 2.0, 3.0], 5)[0])
+    # removed indices may be reused
+    grid.insert([[1.0, 2.0, 3.0]], [0])
+    assert grid.nearest([1.0, 2.0, 3.0])[0].tolist() == [0]
+    with pytest.raises(ValueError):
+        grid.insert([[1.0, 2.0, 3.0]], [1])
+    with pytest.raises(ValueError):
+        grid.remove([2])
+
+
+def test_spatial_grid_indices():
+    # atoms in a plane are binned along two axes only
+    positions = np.array([[0.0, 0.0, 1.0], [1.0, 0.0, 1.0], [0.0, 1.0, 1.0]])
+    grid = SpatialGrid(positions, indices=np.array([3, 5, 8]))
+    assert grid.box([-0.5, -0.5, 0.0], [0.5, 1.5, 2.0]).tolist() == [3, 8]
+    assert grid.nearest([1.0, 0.1, 1.0])[0].tolist() == [5]
+    with pytest.raises(ValueError):
+        _ = SpatialGrid(positions, indices=np.arange(2))
+
+
+def test_spatial_grid_empty():
+    grid = SpatialGrid(np.zeros((0, 3)))
+    assert len(grid) == 0
+    assert len(grid.sphere([0.0, 0.0, 0.0], 1.0)) == 0
+    assert len(grid.box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])) == 0
+    assert len(grid.slab([0.0, 0.0, 1.0], 0.0, 1.0)) == 0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from atompack.atom import Atom
+from atompack.molecule import Molecule
+
+########################
+#    Molecule Tests    #
+########################
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_molecule_perceive_bonds(columnar):
+    # water molecule
+    molecule = Molecule(columnar=columnar)
+    molecule.insert_atoms(
+        Atom("O", np.array([0.0, 0.0, 0.0])),
+        Atom("H", np.array([0.757, 0.586, 0.0])),
+        Atom("H", np.array([-0.757, 0.586, 0.0])),
+    )
+    assert molecule.perceive_bonds() == 2
+    assert sorted(bond.indices for bond in molecule.bonds) == [(0, 1), (0, 2)]
+    # existing bonds are not duplicated
+    assert molecule.perceive_bonds() == 0
+    assert len(molecule.bonds) == 2
+
+
+def test_molecule_perceive_bonds_custom_radii():
+    molecule = Molecule()
+    molecule.insert_atoms(Atom("X", np.zeros(3)), Atom("X", np.array([0.0, 0.0, 1.5])))
+    # unknown species require explicit radii
+    with pytest.raises(ValueError):
+        _ = molecule.perceive_bonds()
+    assert molecule.perceive_bonds(tolerance=0.0, radii={"X": 0.7}) == 0
+    assert molecule.perceive_bonds(tolerance=0.0, radii={"X": 0.8}) == 1
@@ -0,0 +1,93 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from atompack.crystal import (Basis, Crystal, LatticeParameters, Transform, UnitCell)
+from atompack.neighbors import NeighborList
+from atompack.symmetry import Spacegroup
+
+###############
+#    Setup    #
+###############
+
+
+def brute_force(positions, cutoff, lattice_vectors=None):
+    """Returns the sorted (index, vector) neighbors of each atom by checking every pair and image."""
+    shifts = np.zeros((1, 3))
+    if lattice_vectors is not None:
+        shifts = np.array(list(itertools.product(range(-3, 4), repeat=3))) @ lattice_vectors
+    res = []
+    for i, origin in enumerate(positions):
+        neighbors = []
+        for j, position in enumerate(positions):
+            for shift in shifts:
+                vector = position + shift - origin
+                if np.dot(vector, vector) < cutoff**2 and not (i == j and not shift.any()):
+                    neighbors.append((j, tuple(np.round(vector, 6))))
+        res.append(sorted(neighbors))
+    return res
+
+
+def as_sorted_lists(neighbor_list):
+    res = []
+    for i in range(len(neighbor_list)):
+        lo, hi = neighbor_list.indptr[i], neighbor_list.indptr[i + 1]
+        vectors = [tuple(v) for v in np.round(neighbor_list.vectors[lo:hi], 6)]
+        res.append(sorted(zip(neighbor_list.indices[lo:hi].tolist(), vectors)))
+    return res
+
+
+############################
+#    NeighborList Tests    #
+############################
+
+
+@pytest.mark.parametrize("lattice_vectors,cutoff", [
+    (None, 0.3),
+    (np.diag([1.0, 1.5, 2.0]), 0.6),
+    (np.array([[1.0, 0.0, 0.0], [0.4, 0.9, 0.0], [0.2, 0.3, 1.1]]), 0.5),
+    (np.array([[1.0, 0.0, 0.0], [0.5, 0.8, 0.0], [0.1, 0.1, 0.7]]), 1.2),
+])
+def test_neighbor_list_brute_force(lattice_vectors, cutoff):
+    rng = np.random.default_rng(0)
+    positions = rng.random((30, 3))
+    if lattice_vectors is not None:
+        positions = positions @ lattice_vectors
+    res = NeighborList.from_positions(positions, cutoff, lattice_vectors)
+    assert len(res) == len(positions)
+    assert res.indptr[-1] == len(res.indices) == len(res.vectors)
+    assert np.all(res.distances < cutoff)
+    assert as_sorted_lists(res) == brute_force(positions, cutoff, lattice_vectors)
+
+
+def test_neighbor_list_empty():
+    res = NeighborList.from_positions(np.zeros((0, 3)), 1.0)
+    assert len(res) == 0
+    assert len(res.indices) == 0
+
+
+def test_neighbor_list_invalid():
+    with pytest.raises(ValueError):
+        _ = NeighborList.from_positions(np.zeros((1, 3)), 0.0)
+    with pytest.raises(ValueError):
+        _ = NeighborList.from_positions(np.zeros((1, 3)), 1.0, np.zeros((3, 3)))
+
+
+def test_neighbor_list_pairs():
+    positions = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [5.0, 0.0, 0.0]])
+    res = NeighborList.from_positions(positions, 1.5)
+    assert np.array_equal(res.pairs(), [[0, 1], [1, 0]])
+
+
+def test_crystal_neighbor_list():
+    # every atom of an FCC crystal has 12 nearest neighbors
+    basis = Basis.primitive("Cu")
+    lattparams = LatticeParameters.cubic(3.6)
+    spg = Spacegroup("F m -3 m")
+    crystal = Crystal(UnitCell(basis, lattparams, spg))
+    crystal = Transform().supercell((3, 3, 3)).apply(crystal)
+    res = crystal.neighbor_list(3.0)
+    assert len(res) == 108
+    assert np.all(np.diff(res.indptr) == 12)
+    assert np.allclose(res.distances, 3.6 / np.sqrt(2))
@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from atompack.symmetry import Spacegroup
+from atompack.symmetry import (Spacegroup, _load_spacegroups, _normalize_symbol, _parse_genpos)
 
 ##########################
 #    Spacegroup Tests    #
@@ -30,6 +31,28 @@ def test_spacegroup_init_invalid():
         _ = Spacegroup([])
 
 
+@pytest.mark.parametrize("test_input,expectation", [
+    ("F m -3 m", 225),
+    ("Fm-3m", 225),
+    ("fm-3m", 225),
+    ("  F m  -3 m ", 225),
+    ("P 1 21/c 1", 14),
+    ("P21/c", 14),
+    ("P2_1/c", 14),
+    ("P 1", 1),
+    ("P-1", 2),
+])
+def test_spacegroup_init_symbol_variants(test_input, expectation):
+    assert Spacegroup(test_input).international_number == expectation
+
+
+def test_spacegroup_index_unambiguous():
+    # every normalized full symbol resolves to its own spacegroup
+    for group in _load_spacegroups():
+        spg = Spacegroup(_normalize_symbol(group["hermann_mauguin"]))
+        assert spg.international_number == group["international_number"]
+
+
 def test_spacegroup_to_from_json():
     spg = Spacegroup(1)
     json_data = spg.to_json()
@@ -49,3 +72,49 @@ def test_spacegroup_equality():
     assert Spacegroup(international_number) != Spacegroup(international_number + 1)
     # invalid comparison
     assert Spacegroup(international_number) != international_number
+
+
+@pytest.mark.parametrize("test_input,expectation", [
+    ("x,y,z", (np.identity(3), np.zeros(3))),
+    ("-y,x-y,z+1/3", (np.array([[0, -1, 0], [1, -1, 0], [0, 0, 1]]), np.array([0, 0, 1 / 3]))),
+    ("-x+y+2/3,-x+1/3,-z+5/6", (np.array([[-1, 1, 0], [-1, 0, 0], [0, 0, -1]]), np.array([2 / 3, 1 / 3, 5 / 6]))),
+    ("z-1/2, x+1, -y-3/4", (np.array([[0, 0, 1], [1, 0, 0], [0, -1, 0]]), np.array([-1 / 2, 1, -3 / 4]))),
+])
+def test_parse_genpos(test_input, expectation):
+    rotation, translation = _parse_genpos(test_input)
+    assert np.allclose(rotation, expectation[0])
+    assert np.allclose(translation, expectation[1])
+
+
+@pytest.mark.parametrize("test_input", ["x,y", "x,y,__import__('os')", "x*2,y,z"])
+def test_parse_genpos_invalid(test_input):
+    with pytest.raises(ValueError):
+        _ = _parse_genpos(test_input)
+
+
+def test_spacegroup_operations():
+    spg = Spacegroup("F m -3 m")
+    rotations, translations = spg.operations
+    assert rotations.shape == (len(spg.genpos), 3, 3)
+    assert translations.shape == (len(spg.genpos), 3)
+    # the first operation is always the identity
+    assert np.array_equal(rotations[0], np.identity(3))
+    assert np.array_equal(translations[0], np.zeros(3))
+    # operations are cached
+    assert spg.operations[0] is rotations
+
+
+def test_spacegroup_operations_match_genpos():
+    # the pre-parsed operations must agree with the general position expressions
+    for number in range(1, 231):
+        spg = Spacegroup(number)
+        rotations, translations = spg.operations
+        assert len(rotations) == len(spg.genpos)
+        for genpos, rotation, translation in zip(spg.genpos, rotations, translations):
+            _rotation, _translation = _parse_genpos(genpos)
+            assert np.array_equal(rotation, _rotation)
+            assert np.allclose(translation, _translation)
+
+
+def test_spacegroup_operations_shared():
+    assert Spacegroup(225).operations[0] is Spacegroup("Fm-3m").operations[0]
@@ -3,6 +3,8 @@ import pytest
 
 from atompack.atom import Atom
 from atompack.bond import Bond
+from atompack.columns import AtomColumns
+from atompack.molecule import Molecule
 from atompack.topology import Topology
 
 N_ATOMS = 10
@@ -13,15 +15,16 @@ N_BONDS = 5
 #######################
 
 
-@pytest.fixture
-def topology():
+@pytest.fixture(params=[False, True], ids=["graph", "columnar"])
+def topology(request):
     """Returns a pre-populated Topology of `N_ATOMS` and `N_BONDS`.
     The first atom is bonded to the next `N_BONDS` atoms.
     The remaining atoms are not bonded.
+    The fixture is repeated for both the graph and columnar backends.
     """
     atoms = [Atom("TEST", np.zeros(3)) for _ in range(N_ATOMS)]
     bonds = [Bond((0, i + 1)) for i in range(N_BONDS)]
-    res = Topology()
+    res = Topology(columns=AtomColumns() if request.param else None)
     res.insert_atoms(*atoms)
     # TODO: fix this in later release of retworkx
     for bond in bonds:
@@ -94,4 +97,216 @@ def test_topology_to_from_json(topology):
         assert new_topology.bonds[i].indices == topology.bonds[i].indices
 
 
+def test_topology_to_from_json_after_removal(topology):
+    topology.remove_atoms(N_BONDS + 1)
+    topology.insert_bond(Bond((N_BONDS + 2, N_BONDS + 3)))
+    new_topology = Topology.from_json(topology.to_json())
+    assert len(new_topology.atoms) == N_ATOMS - 1
+    # bond indices follow the order of `atoms`
+    assert sorted(bond.indices for bond in new_topology.bonds)[-1] == (N_BONDS + 1, N_BONDS + 2)
+
+
+def test_topology_positions(topology):
+    # translate every atom at once
+    topology.positions += np.ones(3)
+    assert topology.positions.shape == (N_ATOMS, 3)
+    for atom in topology.atoms:
+        assert np.allclose(atom.position, np.ones(3))
+
+
+def test_topology_positions_after_removal(topology):
+    topology.remove_atoms(1)
+    topology.positions = np.arange(3 * (N_ATOMS - 1)).reshape(-1, 3)
+    assert np.allclose(topology.atoms[1].position, [3, 4, 5])
+    assert np.array_equal(topology.species, np.array(["TEST"] * (N_ATOMS - 1)))
+
+
+def test_topology_remove_atoms_detached(topology):
+    atom = topology.remove_atoms(0)[0]
+    # the removed atom must not be overwritten by a later insertion
+    topology.insert_atoms(Atom("X", np.ones(3)))
+    assert atom.specie == "TEST"
+    assert np.allclose(atom.position, np.zeros(3))
+
+
+def test_topology_insert_arrays(topology):
+    positions = np.arange(9, dtype=float).reshape(3, 3)
+    indices = topology.insert_arrays(positions, ["X", "Y", "X"])
+    assert indices.tolist() == [N_ATOMS, N_ATOMS + 1, N_ATOMS + 2]
+    assert np.array_equal(topology.positions[N_ATOMS:], positions)
+    assert topology.species[N_ATOMS:].tolist() == ["X", "Y", "X"]
+    # a single specie is shared by every atom
+    indices = topology.insert_arrays(positions, "Z")
+    assert [atom.specie for atom in topology.select_atoms(*indices.tolist())] == ["Z"] * 3
+    # the inserted positions do not alias the input
+    positions[0] = -1
+    assert np.allclose(topology.positions[N_ATOMS], [0, 1, 2])
+
+
+def test_topology_select_arrays(topology):
+    topology.positions = np.arange(N_ATOMS * 3, dtype=float).reshape(N_ATOMS, 3)
+    topology.select_atoms(2)[0].specie = "X"
+    positions, species = topology.select_arrays(np.array([2, 4]))
+    assert np.array_equal(positions, topology.positions[[2, 4]])
+    assert species.tolist() == ["X", "TEST"]
+    # boolean masks follow the order of `atoms`
+    topology.remove_atoms(0)
+    mask = topology.positions[:, 0] < 9
+    positions, species = topology.select_arrays(mask)
+    assert np.array_equal(positions, topology.positions[:2])
+    assert species.tolist() == ["TEST", "X"]
+    # the returned arrays are copies
+    positions[:] = -1
+    assert np.all(topology.positions >= 0)
+
+
+def test_topology_select_arrays_invalid(topology):
+    with pytest.raises(IndexError):
+        _ = topology.select_arrays(np.array([0, N_ATOMS + 1]))
+    with pytest.raises(IndexError):
+        _ = topology.select_arrays(np.ones(N_ATOMS + 1, dtype=bool))
+    topology.remove_atoms(3)
+    with pytest.raises(IndexError):
+        _ = topology.select_arrays(np.array([3]))
+
+
+def test_topology_remove_arrays(topology):
+    topology.positions = np.arange(N_ATOMS * 3, dtype=float).reshape(N_ATOMS, 3)
+    expected = topology.positions[[0, N_ATOMS - 1]]
+    positions, species = topology.remove_arrays(np.array([0, N_ATOMS - 1]))
+    assert np.array_equal(positions, expected)
+    assert species.tolist() == ["TEST", "TEST"]
+    assert len(topology.atoms) == N_ATOMS - 2
+    # bonds of removed atoms are removed as well
+    assert len(topology.bonds) == 0
+    positions, _ = topology.remove_arrays(np.ones(N_ATOMS - 2, dtype=bool))
+    assert len(positions) == N_ATOMS - 2
+    assert len(topology.atoms) == 0
+
+
+def test_topology_spatial_grid(topology):
+    topology.positions = np.arange(N_ATOMS * 3, dtype=float).reshape(N_ATOMS, 3)
+    grid = topology.spatial_grid
+    assert topology.spatial_grid is grid
+    assert grid.sphere([3.0, 4.0, 5.0], 1.0).tolist() == [1]
+    # the grid reports atom indices and is updated in place after atoms are removed
+    topology.remove_atoms(0)
+    assert topology.spatial_grid is grid
+    assert topology.spatial_grid.nearest([0.0, 0.0, 0.0])[0].tolist() == [1]
+    # or inserted
+    index = topology.insert_atoms(Atom("X", np.full(3, -1.0)))[0]
+    assert topology.spatial_grid.nearest([0.0, 0.0, 0.0])[0].tolist() == [index]
+    # or positions are assigned
+    topology.positions = topology.positions[::-1].copy()
+    assert topology.spatial_grid.nearest([0.0, 0.0, 0.0])[0].tolist() == [N_ATOMS - 1]
+    # or atoms are moved
+    grid = topology.spatial_grid
+    topology.move_atoms(np.array([5]), [[0.1, 0.0, 0.0]])
+    assert topology.spatial_grid.nearest([0.0, 0.0, 0.0])[0].tolist() == [5]
+    assert topology.spatial_grid is grid
+    # clones have their own grid
+    res = topology.clone()
+    res.remove_atoms(5)
+    assert topology.spatial_grid.nearest([0.0, 0.0, 0.0])[0].tolist() == [5]
+    assert res.spatial_grid.nearest([0.0, 0.0, 0.0])[0].tolist() != [5]
+
+
+def test_topology_changes(topology):
+    version = topology.version
+    topology.remove_atoms(3)
+    topology.move_atoms(np.array([4, 5]), np.ones((2, 3)))
+    index = topology.insert_atoms(Atom("X", np.zeros(3)))[0]
+    changes = topology.changes(version)
+    assert changes.removed.tolist() == [3]
+    assert changes.moved.tolist() == [4, 5]
+    assert changes.inserted.tolist() == [index]
+    assert np.allclose(topology.select_arrays(np.array([4, 5]))[0], 1)
+    # removing an inserted atom cancels the insertion
+    topology.remove_atoms(index)
+    assert len(topology.changes(version).inserted) == 0
+    assert len(topology.changes(topology.version)) == 0
+    # a clone starts a new log
+    assert topology.clone().version == 0
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_topology_to_from_bytes(topology, columnar):
+    topology.select_atoms(3)[0]["charge"] = -1.0
+    topology.select_bond((0, 2))["order"] = 2
+    # vacant indices are renumbered
+    topology.remove_atoms(N_ATOMS - 1)
+    res = Topology.from_bytes(topology.to_bytes(), columnar=columnar)
+    assert res.columnar is columnar
+    assert np.array_equal(res.positions, topology.positions)
+    assert np.array_equal(res.species, topology.species)
+    assert res.atoms[3]["charge"] == -1.0
+    assert len(res.atoms[4]) == 2
+    assert [bond.indices for bond in res.bonds] == [bond.indices for bond in topology.bonds]
+    assert res.select_bond((0, 2))["order"] == 2
+    with pytest.raises(TypeError):
+        _ = Molecule.from_bytes(topology.to_bytes())
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_topology_to_from_file(topology, tmp_path, mmap):
+    path = str(tmp_path / "topology.bin")
+    topology.to_file(path)
+    res = Topology.from_file(path, mmap=mmap)
+    assert res.columnar is mmap
+    assert len(res.atoms) == N_ATOMS
+    assert len(res.bonds) == N_BONDS
+    assert np.array_equal(res.positions, topology.positions)
+    # modifications are not written back to the file
+    res.select_atoms(0)[0].position += 1
+    assert np.array_equal(Topology.from_file(path, mmap=mmap).positions, topology.positions)
+
+
+def test_topology_clone(topology):
+    topology.select_atoms(2)[0]["tags"] = ["a"]
+    topology.select_bond((0, 1))["order"] = 1
+    res = topology.clone()
+    assert type(res) is Topology
+    assert res.columnar == topology.columnar
+    assert np.array_equal(res.positions, topology.positions)
+    assert [bond.indices for bond in res.bonds] == [bond.indices for bond in topology.bonds]
+    # the clone is independent of the original
+    res.select_atoms(0)[0].position += 1
+    res.select_atoms(2)[0]["tags"].append("b")
+    res.select_bond((0, 1))["order"] = 2
+    res.remove_atoms(3)
+    assert np.allclose(topology.positions, 0)
+    assert topology.select_atoms(2)[0]["tags"] == ["a"]
+    assert topology.select_bond((0, 1))["order"] == 1
+    assert len(topology.atoms) == N_ATOMS
+
+
+def test_topology_clone_after_removal(topology):
+    topology.remove_atoms(2)
+    res = topology.clone()
+    # indices of the remaining atoms are preserved
+    assert res._graph.node_indexes() == topology._graph.node_indexes()
+    assert res.select_bond((0, 3)).indices == (0, 3)
+    with pytest.raises(IndexError):
+        _ = res.select_atoms(2)
+
+
+def test_topology_lazy_graph():
+    positions = np.arange(3 * N_ATOMS, dtype=float).reshape(-1, 3)
+    data = Topology(columns=AtomColumns.from_arrays(positions, np.zeros(N_ATOMS, dtype=np.int32), ["X"])).to_bytes()
+    res = Topology.from_bytes(data, columnar=True)
+    # atoms and bonds are available without creating the graph
+    assert res._Topology__graph is None
+    assert len(res.atoms) == N_ATOMS
+    assert len(res.bonds) == 0
+    assert np.allclose(res.atoms[-1].position, positions[-1])
+    assert res.select_atoms(2)[0].specie == "X"
+    with pytest.raises(IndexError):
+        _ = res.select_atoms(N_ATOMS)
+    assert res._Topology__graph is None
+    # the graph is created by the first modification
+    res.remove_atoms(0)
+    assert len(res.atoms) == N_ATOMS - 1
+    assert np.allclose(res.atoms[0].position, positions[1])
+
+
 # TODO: tests for bond operations will be added after the retworkx update
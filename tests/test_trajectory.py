@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from atompack.atom import Atom
+from atompack.bond import Bond
+from atompack.crystal.components import Basis, LatticeParameters
+from atompack.crystal.crystal import Crystal, UnitCell
+from atompack.symmetry import Spacegroup
+from atompack.topology import Topology
+from atompack.trajectory import TrajectoryReader, TrajectoryWriter
+
+N_FRAMES = 5
+
+#######################
+#    Test Fixtures    #
+#######################
+
+
+@pytest.fixture
+def crystal_trajectory(tmp_path):
+    """Returns the path to a trajectory of an FCC crystal which expands by 1% each frame."""
+    unit_cell = UnitCell(Basis.primitive("X"), LatticeParameters.cubic(10), Spacegroup(225))
+    crystal = Crystal(unit_cell)
+    path = str(tmp_path / "crystal.traj")
+    with TrajectoryWriter(path, crystal) as writer:
+        for _ in range(N_FRAMES):
+            crystal.positions = crystal.positions * 1.01
+            crystal.lattice_vectors.vectors = crystal.lattice_vectors.vectors * 1.01
+            writer.write(crystal)
+    return path
+
+
+##########################
+#    Trajectory Tests    #
+##########################
+
+
+def test_trajectory_random_access(crystal_trajectory):
+    with TrajectoryReader(crystal_trajectory) as reader:
+        assert len(reader) == N_FRAMES
+        res = reader[2]
+        assert isinstance(res, Crystal)
+        assert len(res.atoms) == 4
+        assert np.allclose(res.positions[1], np.array([0.0, 5.0, 5.0]) * 1.01**3)
+        assert np.allclose(res.lattice_vectors.vectors, np.identity(3) * 10 * 1.01**3, atol=1E-6)
+        assert np.allclose(reader[-1].positions, reader[N_FRAMES - 1].positions)
+        with pytest.raises(IndexError):
+            _ = reader[N_FRAMES]
+
+
+def test_trajectory_iteration(crystal_trajectory):
+    with TrajectoryReader(crystal_trajectory, columnar=True) as reader:
+        frames = list(reader)
+        arrays = list(reader.frames())
+    assert len(frames) == len(arrays) == N_FRAMES
+    for i, (frame, (positions, lattice_vectors)) in enumerate(zip(frames, arrays)):
+        assert frame.columnar
+        assert np.allclose(frame.positions, positions)
+        assert np.allclose(lattice_vectors, np.identity(3) * 10 * 1.01**(i + 1), atol=1E-6)
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["graph", "columnar"])
+def test_trajectory_shared_storage(tmp_path, columnar):
+    unit_cell = UnitCell(Basis.primitive("X"), LatticeParameters.cubic(10), Spacegroup(225), columnar=columnar)
+    crystal = Crystal(unit_cell)
+    with TrajectoryWriter(str(tmp_path / "crystal.traj"), crystal) as writer:
+        writer.write(crystal)
+        writer.write(crystal)
+    # writing frames only reads the crystal so it keeps sharing the atoms of its unit cell
+    assert crystal._columns is unit_cell._columns
+    assert crystal._graph is unit_cell._graph
+
+
+def test_trajectory_topology(tmp_path):
+    topology = Topology()
+    topology.insert_atoms(Atom("H", np.zeros(3)), Atom("O", np.ones(3)))
+    topology.insert_bond(Bond((0, 1)))
+    path = str(tmp_path / "topology.traj")
+    writer = TrajectoryWriter(path, topology)
+    writer.append(np.zeros((2, 3)))
+    writer.flush()
+    reader = TrajectoryReader(path)
+    assert len(reader) == 1
+    # frames are visible to an open reader once flushed
+    writer.append(np.ones((2, 3)))
+    writer.flush()
+    assert len(reader) == 2
+    res = reader[1]
+    assert [atom.specie for atom in res.atoms] == ["H", "O"]
+    assert res.bonds[0].indices == (0, 1)
+    assert np.allclose(res.positions, np.ones((2, 3)))
+    assert reader.frame(1)[1] is None
+    with pytest.raises(ValueError):
+        writer.append(np.zeros((3, 3)))
+    writer.close()
+    reader.close()
+
+
+def test_trajectory_invalid(tmp_path):
+    path = tmp_path / "invalid.traj"
+    path.write_bytes(b"ATOMPACK" + bytes(16))
+    with pytest.raises(ValueError):
+        _ = TrajectoryReader(str(path))